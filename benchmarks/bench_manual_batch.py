@@ -0,0 +1,76 @@
+import argparse
+import sys
+import time
+
+from utils.manual_batch import calculate_manual_pay_batch, calculate_manual_pay_sweep, sweep_axes
+from utils.manual_calculator import calculate_manual_pay
+
+# 수동 계산 what-if 벤치마크: /manual-calculate를 조합마다 호출 vs /manual-calculate/batch sweep
+
+"""코드 요약:
+시급 10,030 ~ 20,000원(1원 단위) × 근무요일 1~7일 × 세금 옵션 3종 ≈ 21만 조합을
+- "하나씩" : 조합 + 중복 입력(앞쪽 --duplicates개)마다 calculate_manual_pay 호출
+- "batch"  : 같은 입력 리스트를 calculate_manual_pay_batch 한 번
+- "sweep"  : calculate_manual_pay_sweep 한 번 (입력 dict 없이 축 값만으로 계산)
+으로 계산한 시간과, 결과가 calculate_manual_pay와 같은지 출력
+inputs 방식은 입력/결과 dict를 만드는 비용이 대부분이라 중복이 적으면 하나씩과 비슷하고, sweep에서 차이가 큼
+
+실행: 프로젝트 루트에서 `python -m benchmarks.bench_manual_batch [--stop 20000]`"""
+
+BASE = {
+    "payType": "시급", "payAmount": 10030, "workHour": 6, "workMinute": 30,
+    "workingDays": ["월", "화", "수"], "overtimeHour": 1, "overtimeMinute": 15,
+    "includeWeeklyAllowance": True, "taxOption": "insurance", "nightWork": True,
+}
+DAYS = ["월", "화", "수", "목", "금", "토", "일"]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--start", type=int, default=10030)
+    parser.add_argument("--stop", type=int, default=20000)
+    parser.add_argument("--duplicates", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    sweep = {
+        "payAmount": list(range(args.start, args.stop + 1)),
+        "workingDays": [DAYS[:n] for n in range(1, 8)],
+        "taxOption": ["none", "insurance", "income"],
+    }
+
+    t0 = time.perf_counter()
+    result = calculate_manual_pay_sweep(BASE, sweep)
+    t_sweep = time.perf_counter() - t0
+    count = result["count"]
+
+    # 같은 조합을 입력 dict로 (하나씩 / batch 비교용)
+    axes = sweep_axes(BASE, sweep)
+    combos = []
+    for amount in axes["payAmount"]:
+        for days in axes["workingDays"]:
+            for tax in axes["taxOption"]:
+                combos.append(dict(BASE, payAmount=amount, workingDays=days, taxOption=tax))
+
+    inputs = combos + combos[: args.duplicates]
+    t0 = time.perf_counter()
+    expected = [calculate_manual_pay(data) for data in inputs]
+    t_one = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batch = calculate_manual_pay_batch(inputs)
+    t_batch = time.perf_counter() - t0
+
+    sweep_mismatches = sum(
+        any(result["results"][key][i] != row[key] for key in row) for i, row in enumerate(expected[:count])
+    )
+    print(f"조합 수: {count}, 입력 수: {len(inputs)} (중복 {len(inputs) - count}개)")
+    print(f"{'방식':<8} {'시간(ms)':>10}")
+    print(f"{'하나씩':<8} {t_one * 1000:10.1f}")
+    print(f"{'batch':<8} {t_batch * 1000:10.1f}   ({t_one / t_batch:.1f}배)")
+    print(f"{'sweep':<8} {t_sweep * 1000:10.1f}   ({t_one / t_sweep:.1f}배, 중복 없이 조합만)")
+    print(f"결과가 다른 입력: batch {sum(a != b for a, b in zip(batch, expected))}, sweep {sweep_mismatches}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import argparse
+import copy
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from benchmarks.synthetic import generate_entries
+from utils.calculator import compile_entries, intern_rows, profile_stats
+
+# payInfo 공유(interning) 벤치마크: 한 달치 i_entry에서 디코딩 횟수 / 메모리 / 시간 비교
+
+"""코드 요약:
+사용자마다 시급이 다르고(사용자별 프로필), 일부 row는 공휴일 근무(Holiday=True)인 한 달치 entry를 만든 뒤
+Supabase 응답 본문(JSON)을 json.loads한 상태에서 시작해서
+- "row마다"   : 예전처럼 row마다 payInfo를 디코딩해서 dict로 들고 있음
+- "interning" : fetch 단계의 intern_rows → 같은 payInfo는 PayProfile 하나를 공유
+payInfo가 text 컬럼(JSON 문자열)일 때와 jsonb(dict)일 때 각각
+json.loads 호출 수, rows가 차지하는 메모리(tracemalloc), 변환 + compile_entries 시간을 출력
+
+실행: 프로젝트 루트에서 `python -m benchmarks.bench_payinfo_intern [--users 300]`"""
+
+
+def build_month(n_users: int, seed: int) -> list:
+    rows = generate_entries(n_users=n_users, weeks=5, shifts_per_week=5, start_date="2025-04-28", seed=seed)
+    for row in rows:
+        u = int(row["userId"].split("-")[1])
+        pay_info = dict(row["payInfo"])
+        pay_info["hourPrice"] = 10030 + (u % 40) * 250  # 사용자별 시급
+        pay_info["Holiday"] = row["date"] in ("2025-05-05", "2025-05-06")  # 어린이날 / 대체공휴일 근무
+        row["payInfo"] = pay_info
+    return [row for row in rows if row["date"] <= "2025-05-31"]
+
+
+def decode_per_row(rows: list) -> list:
+    for row in rows:
+        raw = row["payInfo"]
+        row["payInfo"] = json.loads(raw) if isinstance(raw, str) else raw
+    return rows
+
+
+def measure(body: bytes, convert) -> tuple:
+    """응답 본문 → json.loads → convert(rows) 후 rows가 잡고 있는 메모리와 시간"""
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    rows = convert(json.loads(body))
+    compile_entries(rows)
+    elapsed = time.perf_counter() - t0
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, current, elapsed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    month = build_month(args.users, args.seed)
+    n = len(month)
+    print(f"entries: {n} (사용자 {args.users}명, 2025-05)")
+    print(f"{'payInfo 형식':<14} {'방식':<10} {'json.loads':>10} {'메모리(KB)':>11} {'시간(ms)':>9}")
+
+    for kind in ("text(JSON)", "jsonb(dict)"):
+        rows = copy.deepcopy(month)
+        if kind.startswith("text"):
+            for row in rows:
+                row["payInfo"] = json.dumps(row["payInfo"])
+        body = json.dumps(rows).encode()
+        text_rows = n if kind.startswith("text") else 0
+
+        _, mem_old, t_old = measure(body, decode_per_row)
+        before = profile_stats()
+        _, mem_new, t_new = measure(body, intern_rows)
+        decodes = profile_stats()["decodes"] - before["decodes"] if text_rows else 0
+
+        print(f"{kind:<14} {'row마다':<10} {text_rows:>10} {mem_old / 1024:11.0f} {t_old * 1000:9.1f}")
+        print(f"{kind:<14} {'interning':<10} {decodes:>10} {mem_new / 1024:11.0f} {t_new * 1000:9.1f}"
+              f"   (메모리 {100 * (1 - mem_new / mem_old):.0f}% 절약, 디코딩 {text_rows - decodes}회 생략)")
+
+    print(f"공유 프로필 수: {profile_stats()['profiles']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
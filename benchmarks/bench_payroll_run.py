@@ -0,0 +1,73 @@
+import argparse
+import os
+import pickle
+import sys
+import time
+
+from benchmarks.synthetic import generate_entries
+from utils.calculator import compile_entries
+from utils.payroll_run import pack_chunks, partition_by_user, run_payroll
+
+# 월말 정산 병렬 실행 벤치마크: 워커 1 / 2 / 4 / 8개
+
+"""코드 요약:
+합성 데이터(기본 100만 entry = 사용자 5,000명 × 4주 × 주 50건)를 한 번 만들어 두고
+run_payroll을 워커 수만 바꿔서 실행 → 시간과 워커 1개 대비 속도 향상 출력
+모든 워커 수에서 결과가 같은지도 확인
+(속도 향상은 실행하는 머신의 CPU 코어 수를 넘을 수 없음)
+
+실행: 프로젝트 루트에서 `python -m benchmarks.bench_payroll_run [--entries 1000000]`"""
+
+
+def build_records(n_entries: int, weeks: int = 4, shifts_per_week: int = 50) -> list:
+    # dict row를 한꺼번에 만들면 메모리가 커지므로 사용자 묶음 단위로 만들고 바로 ShiftRecord로 변환
+    per_user = weeks * shifts_per_week
+    n_users = max(1, n_entries // per_user)
+    records = []
+    batch = 500
+    for first in range(0, n_users, batch):
+        rows = generate_entries(n_users=min(batch, n_users - first), weeks=weeks,
+                                shifts_per_week=shifts_per_week, seed=first)
+        for row in rows:
+            row["userId"] = f"u{first}-{row['userId']}"
+        records.extend(compile_entries(rows))
+    return records
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--mode", default="standard")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    records = build_records(args.entries)
+    print(f"합성 entry {len(records):,}개 생성 {time.perf_counter() - t0:.1f}s, CPU 코어 {os.cpu_count()}개")
+
+    # 프로세스 사이로 보내는 데이터 크기: dict row pickle vs PackedShifts pickle (앞 1만 개 기준)
+    sample = records[:10_000]
+    as_dicts = [{"userId": r.user_id, "date": r.date, "start": r.start, "end": r.end, "hours": r.hours,
+                 "wage": r.wage, "flags": r.flags, "week": r.week_key} for r in sample]
+    packed = pack_chunks(partition_by_user(sample), len(sample))
+    print(f"entry 1만 개 pickle 크기: dict {len(pickle.dumps(as_dicts)) / 1e6:.2f} MB, "
+          f"PackedShifts {sum(len(pickle.dumps(p)) for p in packed) / 1e6:.2f} MB")
+
+    baseline = None
+    reference = None
+    for workers in [int(w) for w in args.workers.split(",")]:
+        t0 = time.perf_counter()
+        results = run_payroll(records, mode=args.mode, workers=workers)
+        elapsed = time.perf_counter() - t0
+        if reference is None:
+            reference = results
+        elif results != reference:
+            print(f"❌ workers={workers} 결과가 다름")
+            return 1
+        baseline = baseline or elapsed
+        print(f"workers={workers}: {elapsed:7.2f}s   속도 향상 x{baseline / elapsed:.2f}   사용자 {len(results):,}명")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from benchmarks.fake_supabase import FAKE_KEY, FakeSupabase
+from benchmarks.synthetic import generate_entries
+
+# Supabase 조회 보호(utils/resilience.py) 확인: 지연 꼬리 / 오류 / 장애를 주입한 가짜 서버로 측정
+
+"""코드 요약:
+같은 프로세스에 가짜 PostgREST 서버(FakeSupabase)를 띄우고 장애를 주입한 뒤
+사용자별 범위 조회(iter_entries_for_date_range_async)를 동시에 여러 개 보내서 비교
+- tail   : 일부 응답만 --slow-latency초 늦게 → hedged 요청 끔 / 켬의 p50 / p99
+- errors : 일부 응답을 503으로 → 재시도 끔 / 켬의 성공률
+- outage : 모든 요청 실패 → circuit이 열린 뒤 요청이 서버까지 가지 않고 바로 실패하는지 (서버 요청 수, 실패 시간)
+- stale  : 장애 중 with_stale_fallback이 마지막 정상 결과를 stale로 돌려주는지
+
+실행: 프로젝트 루트에서 `python -m benchmarks.bench_resilience`"""
+
+START_DATE = "2025-05-05"
+END_DATE = "2025-06-01"
+
+
+def _percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[max(int(len(values) * q) - 1, 0)]
+
+
+async def _fetch_users(user_ids: list) -> tuple:
+    """사용자마다 범위 조회 하나씩 동시에 → (지연 리스트(초), 실패 수)"""
+    from utils.async_supabase import iter_entries_for_date_range_async
+    from utils.resilience import FetchError
+
+    latencies, failures = [], 0
+
+    async def one(user_id):
+        nonlocal failures
+        t0 = time.perf_counter()
+        try:
+            async for _ in iter_entries_for_date_range_async(START_DATE, END_DATE, user_id=user_id):
+                pass
+        except FetchError:
+            failures += 1
+            return
+        latencies.append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(one(user_id) for user_id in user_ids))
+    return latencies, failures
+
+
+def bench_tail(fake: FakeSupabase, user_ids: list, args):
+    from utils.resilience import ResilientFetcher, set_fetcher
+
+    fake.slow_rate, fake.error_rate = args.slow_rate, 0.0
+    print(f"[tail] 응답 {args.slow_rate:.0%}가 {args.slow_latency * 1000:.0f} ms 더 늦음")
+    for name, hedge_after in (("hedge off", 0.0), (f"hedge {args.hedge_after * 1000:.0f}ms", args.hedge_after)):
+        fetcher = ResilientFetcher(timeout=args.slow_latency * 4, hedge_after=hedge_after)
+        set_fetcher(fetcher)
+        latencies, _ = asyncio.run(_fetch_users(user_ids))
+        print(
+            f"  {name:>12}: p50 {statistics.median(latencies) * 1000:8.1f} ms   "
+            f"p99 {_percentile(latencies, 0.99) * 1000:8.1f} ms   hedged {fetcher.hedges}"
+        )
+
+
+def bench_errors(fake: FakeSupabase, user_ids: list, args):
+    from utils.resilience import CircuitBreaker, ResilientFetcher, set_fetcher
+
+    fake.slow_rate, fake.error_rate = 0.0, args.error_rate
+    print(f"[errors] 응답 {args.error_rate:.0%}가 503")
+    for retries in (0, 2):
+        # 오류 비율만 보려고 circuit은 열리지 않게
+        set_fetcher(ResilientFetcher(retries=retries, breaker=CircuitBreaker(failures=10 ** 9)))
+        latencies, failures = asyncio.run(_fetch_users(user_ids))
+        print(f"  retries={retries}: 성공 {len(latencies)}/{len(user_ids)}   실패 {failures}")
+    fake.error_rate = 0.0
+
+
+def bench_outage(fake: FakeSupabase, user_ids: list, args):
+    from utils.resilience import CircuitBreaker, ResilientFetcher, set_fetcher
+
+    print("[outage] 모든 요청 실패")
+    fetcher = ResilientFetcher(retries=0, breaker=CircuitBreaker(failures=5, reset_after=60))
+    set_fetcher(fetcher)
+    fake.fail_next = 10 ** 9
+    before = fake.requests
+
+    async def sequential():
+        times = []
+        for user_id in user_ids:
+            t0 = time.perf_counter()
+            await _fetch_users([user_id])
+            times.append(time.perf_counter() - t0)
+        return times
+
+    times = asyncio.run(sequential())
+    fake.fail_next = 0
+    print(
+        f"  요청 {len(user_ids)}개 → 서버까지 간 요청 {fake.requests - before}개, circuit {fetcher.breaker.state}, "
+        f"열린 뒤 실패 시간 {statistics.median(times[10:] or times) * 1000:.3f} ms"
+    )
+
+
+def bench_stale(fake: FakeSupabase):
+    from utils.resilience import CircuitBreaker, LastGoodStore, ResilientFetcher, set_fetcher, with_stale_fallback
+    from utils.async_supabase import iter_entries_for_date_range_async
+
+    print("[stale] 정상 계산 뒤 장애")
+    set_fetcher(ResilientFetcher(retries=0, breaker=CircuitBreaker(failures=10 ** 9)))
+    store = LastGoodStore()
+    key = ("bench", START_DATE, END_DATE, "standard")
+
+    async def count_rows():
+        return {"rows": len([row async for row in iter_entries_for_date_range_async(START_DATE, END_DATE)])}
+
+    async def run():
+        fresh = await with_stale_fallback(key, count_rows(), store)
+        fake.fail_next = 10 ** 9
+        stale = await with_stale_fallback(key, count_rows(), store)
+        fake.fail_next = 0
+        return fresh, stale
+
+    (fresh, fresh_age), (stale, stale_age) = asyncio.run(run())
+    print(f"  정상: {fresh} (stale={fresh_age is not None})   장애: {stale} (stale={stale_age is not None})")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200, help="동시에 조회할 사용자 수")
+    parser.add_argument("--latency", type=float, default=0.01, help="기본 응답 지연(초)")
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=0.5)
+    parser.add_argument("--hedge-after", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rows = generate_entries(n_users=args.users, weeks=4, shifts_per_week=5, start_date=START_DATE)
+    user_ids = list(dict.fromkeys(row["userId"] for row in rows))
+    with FakeSupabase({"i_entry": rows}, latency=args.latency, slow_latency=args.slow_latency, seed=args.seed) as fake:
+        os.environ["SUPABASE_URL"] = fake.url
+        os.environ["SUPABASE_KEY"] = FAKE_KEY
+
+        bench_tail(fake, user_ids, args)
+        bench_errors(fake, user_ids, args)
+        bench_outage(fake, user_ids, args)
+        bench_stale(fake)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
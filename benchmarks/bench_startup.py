@@ -0,0 +1,100 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.fake_supabase import FAKE_KEY, FakeSupabase
+from benchmarks.synthetic import generate_entries
+
+# 시작 시간 벤치마크: import 시간 + 첫 /calculate 응답까지 걸리는 시간
+
+"""코드 요약:
+매번 새 파이썬 프로세스를 띄워서 측정 (이미 import된 모듈 캐시 영향 제거)
+1. `import main` 에 걸리는 시간 + import 중에 print/네트워크 호출이 없는지 검사
+2. 프로세스 시작 → 로컬 가짜 Supabase로 첫 /calculate 응답까지 걸리는 시간
+기준치(--max-import-ms)를 넘거나 import 중 부수효과가 있으면 exit code 1 → 회귀 방지용
+
+실행: 프로젝트 루트에서 `python -m benchmarks.bench_startup`"""
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_SCRIPT = """
+import time
+t0 = time.perf_counter()
+import main
+elapsed = time.perf_counter() - t0
+import sys
+sys.stderr.write(f"IMPORT_MS={elapsed * 1000:.3f}\\n")
+"""
+
+FIRST_REQUEST_SCRIPT = """
+import time
+t0 = time.perf_counter()
+import main
+from fastapi.testclient import TestClient
+client = TestClient(main.app)
+res = client.get("/calculate", params={"start_date": "2025-05-01", "end_date": "2025-05-31"})
+elapsed = time.perf_counter() - t0
+import sys
+assert res.status_code == 200, res.text
+sys.stderr.write(f"FIRST_MS={elapsed * 1000:.3f}\\n")
+"""
+
+
+def _run(script: str, env: dict, marker: str) -> tuple:
+    proc = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    value = None
+    for line in proc.stderr.splitlines():
+        if line.startswith(marker + "="):
+            value = float(line.split("=", 1)[1])
+    return value, proc.stdout
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=None, help="import 시간이 이 값을 넘으면 실패")
+    args = parser.parse_args(argv)
+
+    rows = generate_entries(n_users=20, weeks=5, shifts_per_week=5)
+    failed = False
+
+    with FakeSupabase({"i_entry": rows}) as fake:
+        env = dict(os.environ, SUPABASE_URL=fake.url, SUPABASE_KEY=FAKE_KEY, PYTHONDONTWRITEBYTECODE="1")
+
+        import_ms = []
+        for _ in range(args.repeat):
+            before = fake.requests
+            ms, stdout = _run(IMPORT_SCRIPT, env, "IMPORT_MS")
+            import_ms.append(ms)
+            if stdout.strip():
+                print("❌ import 중 print 발생:", stdout.strip()[:200])
+                failed = True
+            if fake.requests != before:
+                print("❌ import 중 Supabase 요청 발생:", fake.requests - before)
+                failed = True
+
+        first_ms = [_run(FIRST_REQUEST_SCRIPT, env, "FIRST_MS")[0] for _ in range(args.repeat)]
+
+    import_median = statistics.median(import_ms)
+    print(f"import main          median {import_median:8.1f} ms  (min {min(import_ms):.1f})")
+    print(f"첫 /calculate 응답    median {statistics.median(first_ms):8.1f} ms  (min {min(first_ms):.1f})")
+
+    if args.max_import_ms is not None and import_median > args.max_import_ms:
+        print(f"❌ import 시간이 기준치 {args.max_import_ms} ms 초과")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from utils.calculator import NIGHT_END_MINUTES, NIGHT_START_MINUTES, centihours, pay_amount, parse_time_minutes
+
+# 시간 파싱 / 금액 계산 마이크로벤치마크: strptime + float 경로 vs 변환표 + 정수 경로
+
+"""코드 요약:
+- "strptime" : 예전 calculate_work_hours / calculate_night_pay 방식
+               row마다 datetime.strptime, timedelta, "22:00" 리터럴도 매번 파싱, float 시간 × 시급
+- "변환표"   : parse_time_minutes(1440칸 dict) + centihours + pay_amount (정수 분 / 1/100시간 / 정수 금액)
+각 방식으로 (근무시간, 기본급, 야간수당, 연장수당)을 계산하는 데 걸린 row당 시간(µs)과
+두 방식의 금액이 몇 row에서 다른지(float 버림 오차) 출력
+
+실행: 프로젝트 루트에서 `python -m benchmarks.bench_time_parsing [--rows 200000]`"""
+
+WAGES = (10030, 10030, 12000, 9860, 15000)
+
+
+def _random_shifts(n: int, seed: int) -> list:
+    rnd = random.Random(seed)
+    shifts = []
+    for _ in range(n):
+        start = rnd.randrange(0, 1440, 5)
+        end = (start + rnd.randrange(60, 13 * 60, 5)) % 1440
+        shifts.append((f"{start // 60:02d}:{start % 60:02d}", f"{end // 60:02d}:{end % 60:02d}", rnd.choice(WAGES)))
+    return shifts
+
+
+def pay_strptime(start: str, end: str, wage: int) -> tuple:
+    fmt = "%H:%M"
+    start_dt = datetime.strptime(start, fmt)
+    end_dt = datetime.strptime(end, fmt)
+    if end_dt < start_dt:
+        end_dt += timedelta(days=1)
+    hours = round((end_dt - start_dt).total_seconds() / 3600, 2)
+
+    night_start = datetime.strptime("22:00", fmt)
+    night_end = night_start + timedelta(hours=8)
+    overlap = (min(end_dt, night_end) - max(start_dt, night_start)).total_seconds()
+    night = int(overlap / 3600 * wage * 0.5) if overlap > 0 else 0
+
+    base = int(hours * wage)
+    overtime = int(max(0, hours - 8) * wage * 0.5)
+    return hours, base, night, overtime
+
+
+def pay_table(start: str, end: str, wage: int) -> tuple:
+    start_minutes = parse_time_minutes(start)
+    end_minutes = parse_time_minutes(end)
+    if end_minutes < start_minutes:
+        end_minutes += 1440
+    work = centihours(end_minutes - start_minutes)
+
+    overlap = min(end_minutes, NIGHT_END_MINUTES) - max(start_minutes, NIGHT_START_MINUTES)
+    night = pay_amount(overlap, wage, 120) if overlap > 0 else 0
+
+    base = pay_amount(work, wage, 100)
+    overtime = pay_amount(max(0, work - 800), wage, 200)
+    return work / 100, base, night, overtime
+
+
+def _time(fn, shifts: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for start, end, wage in shifts:
+            fn(start, end, wage)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    shifts = _random_shifts(args.rows, args.seed)
+
+    old = _time(pay_strptime, shifts, args.repeat)
+    new = _time(pay_table, shifts, args.repeat)
+    print(f"{'방식':<10} {'합계(ms)':>10} {'µs/row':>8}")
+    print(f"{'strptime':<10} {old * 1000:10.1f} {old / args.rows * 1e6:8.2f}")
+    print(f"{'변환표':<10} {new * 1000:10.1f} {new / args.rows * 1e6:8.2f}   ({old / new:.1f}배)")
+
+    # 근무시간은 두 방식이 같아야 하고, 금액 차이는 float 버림 오차에서만 생김
+    hours_diff = money_diff = 0
+    for shift in shifts:
+        a, b = pay_strptime(*shift), pay_table(*shift)
+        hours_diff += a[0] != b[0]
+        money_diff += a[1:] != b[1:]
+    print(f"근무시간 다른 row: {hours_diff}, 금액이 다른 row(float 오차): {money_diff} / {args.rows}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
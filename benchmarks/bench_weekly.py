@@ -0,0 +1,53 @@
+import argparse
+import sys
+import time
+
+from benchmarks.synthetic import generate_entries
+from utils.calculator import calculate_custom_pay, calculate_final_pay, compile_entries
+
+# 주 단위 집계 벤치마크: 한 주에 entry가 10개 → 10,000개로 늘 때 시간이 어떻게 늘어나는지
+
+"""코드 요약:
+- "row마다 주 전체 재합산" : 예전 방식처럼 calculate_final_pay(row, weekly_rows 리스트)를 row마다 호출 → O(n²)
+- "summarize_week"        : calculate_custom_pay (주마다 한 번 집계 후 row마다 O(1)) → O(n)
+entry당 시간(µs)이 n에 상관없이 일정하면 선형
+
+실행: 프로젝트 루트에서 `python -m benchmarks.bench_weekly`"""
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10,100,1000,10000")
+    parser.add_argument("--quadratic-max", type=int, default=2000, help="O(n²) 방식은 이 크기까지만 측정")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'entries/주':>10} {'재합산(ms)':>12} {'µs/entry':>10} {'집계(ms)':>10} {'µs/entry':>10}")
+    for n in [int(x) for x in args.sizes.split(",")]:
+        # 한 사람이 한 주(월요일 시작)에 n개의 근무 기록을 남긴 상황
+        records = compile_entries(generate_entries(n_users=1, weeks=1, shifts_per_week=n, seed=n))
+
+        linear = _time(lambda: calculate_custom_pay(records), args.repeat)
+
+        if n <= args.quadratic_max:
+            quadratic = _time(lambda: [calculate_final_pay(r, records) for r in records], args.repeat)
+            quad_cols = f"{quadratic * 1000:12.2f} {quadratic / n * 1e6:10.2f}"
+        else:
+            quad_cols = f"{'-':>12} {'-':>10}"
+
+        print(f"{n:>10} {quad_cols} {linear * 1000:10.2f} {linear / n * 1e6:10.2f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,357 @@
+import json
+import multiprocessing
+import random
+import re
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit
+
+# 로컬 가짜 Supabase(PostgREST) 서버
+
+"""코드 요약:
+실제 Supabase 대신 127.0.0.1에 띄워서 벤치마크/부하테스트에서 쓰는 최소한의 PostgREST 흉내
+지원하는 것:
+- GET/HEAD /rest/v1/<table>
+- select=컬럼 목록 (프로젝션)
+- 필터: eq, neq, gt, gte, lt, lte, in.(...), is.null, not.<필터>, or=(...) / and(...) 중첩
+- order=컬럼.asc|desc, limit, offset
+- Prefer: count=exact → Content-Range 헤더
+- requests 카운터 (import 시점에 네트워크를 안 쓰는지 확인하는 용도)
+- latency: 응답마다 지정한 초만큼 대기 (실제 DB 왕복 시간 흉내)
+- 장애 주입 (utils/resilience.py 확인용)
+  - slow_rate / slow_latency: 일부 응답만 slow_latency초 더 늦게 (지연 꼬리)
+  - error_rate / error_status: 일부 응답을 error_status(기본 503) 오류로
+  - fail_next = n: 다음 n개 요청을 전부 오류로 (circuit breaker 확인용)
+  - seed: 위 비율을 재현 가능하게
+- (date, id) 순서 keyset 페이지 조회는 date 정렬 인덱스에서 시작 위치를 이분 탐색
+  → 100만 row 테이블도 페이지마다 전체를 훑지 않음 (row를 바꾸면 reindex() 호출)
+
+사용 예:
+    with FakeSupabase({"i_entry": rows}) as fake:
+        os.environ["SUPABASE_URL"] = fake.url
+        os.environ["SUPABASE_KEY"] = FAKE_KEY
+
+부하 테스트처럼 서버 쪽 CPU가 측정 대상 프로세스의 GIL을 같이 쓰면 안 될 때는
+FakeSupabaseProcess로 별도 프로세스에 띄움 (사용법 동일)
+"""
+
+# supabase.create_client의 JWT 형식 검사만 통과하면 되는 가짜 키
+FAKE_KEY = "fake.fake.fake"
+
+_OPS = ("eq", "neq", "gt", "gte", "lt", "lte", "in")
+
+# build_entry_page_query의 keyset 조건 "(date.gt.X,and(date.eq.X,id.gt.N))"
+_KEYSET_RE = re.compile(r"^\(date\.gt\.([^,()]+),and\(date\.eq\.\1,")
+
+
+def _split_top_level(text: str) -> list[str]:
+    # "a,b(c,d),e" → ["a", "b(c,d)", "e"] (괄호 안의 콤마는 무시)
+    parts, depth, current = [], 0, ""
+    for ch in text:
+        if ch == "," and depth == 0:
+            parts.append(current)
+            current = ""
+            continue
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        current += ch
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _coerce(raw: str, sample):
+    # 필터 값(문자열)을 row 값의 타입에 맞춰 비교 가능하게 변환
+    if isinstance(sample, bool):
+        return raw == "true"
+    if isinstance(sample, int):
+        try:
+            return int(raw)
+        except ValueError:
+            return raw
+    if isinstance(sample, float):
+        try:
+            return float(raw)
+        except ValueError:
+            return raw
+    return raw
+
+
+def _compare(value, op: str, raw: str) -> bool:
+    if value is None:
+        return False
+    if op == "in":
+        items = raw.strip("()").split(",")
+        return value in [_coerce(i.strip('"'), value) for i in items]
+    target = _coerce(raw, value)
+    try:
+        if op == "eq":
+            return value == target
+        if op == "neq":
+            return value != target
+        if op == "gt":
+            return value > target
+        if op == "gte":
+            return value >= target
+        if op == "lt":
+            return value < target
+        if op == "lte":
+            return value <= target
+    except TypeError:
+        return str(value) > raw if op in ("gt", "gte") else False
+    return False
+
+
+def _parse_condition(text: str):
+    # "date.gte.2025-05-01" / "and(a.eq.1,b.gt.2)" / "or(...)" → 판정 함수
+    if text.startswith(("and(", "or(")):
+        kind, inner = text.split("(", 1)
+        return _parse_group(kind, inner[:-1])
+    column, op, raw = text.split(".", 2)
+    return lambda row: _compare(row.get(column), op, raw)
+
+
+def _parse_group(kind: str, inner: str):
+    conditions = [_parse_condition(part) for part in _split_top_level(inner)]
+    if kind == "and":
+        return lambda row: all(c(row) for c in conditions)
+    return lambda row: any(c(row) for c in conditions)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # 기본값 5로는 동시 연결이 많을 때 SYN 재전송 지연이 생김
+
+
+class FakeSupabase:
+    def __init__(self, tables: dict = None, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 slow_rate: float = 0.0, slow_latency: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, seed: int = None):
+        self.tables = tables if tables is not None else {}
+        self.latency = latency
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.fail_next = 0
+        self.errors = 0
+        self.slow = 0
+        self._random = random.Random(seed)
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._indexes = {}
+        self._server = _Server((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeSupabase":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reindex(self, table: str = None):
+        """rows를 직접 바꾼 뒤 호출 (date 정렬 인덱스를 다시 만듦)"""
+        if table is None:
+            self._indexes.clear()
+        else:
+            self._indexes.pop(table, None)
+
+    def _date_index(self, table: str) -> tuple:
+        """(date, id) 순서로 정렬한 rows와 date 리스트 (rows 개수가 바뀌면 다시 만듦)"""
+        rows = self.tables.get(table, [])
+        index = self._indexes.get(table)
+        if index is None or index[0] is not rows or index[1] != len(rows):
+            dated = sorted((r for r in rows if r.get("date") is not None), key=lambda r: (r["date"], r.get("id")))
+            index = (rows, len(rows), dated, [r["date"] for r in dated])
+            with self._lock:
+                self._indexes[table] = index
+        return index[2], index[3]
+
+    def query(self, table: str, params: list, need_total: bool = True) -> tuple[list[dict], Optional[int]]:
+        """
+        PostgREST 쿼리 파라미터를 rows에 적용 (HTTP 없이도 호출 가능)
+        → (결과 rows, limit/offset 적용 전 전체 row 수), keyset 페이지 경로는 전체 수를 안 세서 None
+        """
+        rows = self.tables.get(table, [])
+        select = None
+        order = []
+        limit = offset = None
+        conditions = []
+        lower = upper = None  # date 하한 (gte / keyset 조건) / 상한 (lte)
+
+        for key, value in params:
+            if key == "select":
+                select = None if value == "*" else [c.strip() for c in value.split(",")]
+            elif key == "order":
+                for part in value.split(","):
+                    column, _, direction = part.partition(".")
+                    order.append((column, direction.startswith("desc")))
+            elif key == "limit":
+                limit = int(value)
+            elif key == "offset":
+                offset = int(value)
+            elif key in ("or", "and"):
+                conditions.append(_parse_group(key, value[1:-1]))  # "(a,b)" → "a,b"
+                keyset = _KEYSET_RE.match(value) if key == "or" else None
+                if keyset:
+                    lower = max(lower or "", keyset.group(1))
+            else:
+                op, _, raw = value.partition(".")
+                negate = op == "not"
+                if negate:
+                    op, _, raw = raw.partition(".")
+                if op in _OPS:
+                    conditions.append(lambda row, k=key, o=op, r=raw, n=negate: _compare(row.get(k), o, r) != n)
+                elif op == "is" and raw == "null":
+                    conditions.append(lambda row, k=key, n=negate: (row.get(k) is None) != n)
+                if key == "date" and op == "gte":
+                    lower = max(lower or "", raw)
+                if key == "date" and op == "lte":
+                    upper = raw if upper is None else min(upper, raw)
+
+        if (lower is not None and not need_total and limit is not None and not offset
+                and order == [("date", False), ("id", False)]):
+            # keyset 페이지: 정렬된 인덱스에서 하한 위치부터 limit개 찾으면 멈춤 (결과 순서는 같음)
+            dated, dates = self._date_index(table)
+            result = []
+            for i in range(bisect_left(dates, lower), len(dated)):
+                row = dated[i]
+                if upper is not None and dates[i] > upper:
+                    break
+                if all(c(row) for c in conditions):
+                    result.append(row)
+                    if len(result) >= limit:
+                        break
+            if select:
+                result = [{c: r.get(c) for c in select} for r in result]
+            return result, None
+
+        result = [r for r in rows if all(c(r) for c in conditions)]
+        for column, desc in reversed(order):
+            result.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+        total = len(result)
+        if offset:
+            result = result[offset:]
+        if limit is not None:
+            result = result[:limit]
+        if select:
+            result = [{c: r.get(c) for c in select} for r in result]
+        return result, total
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # 헤더/본문을 따로 써도 40ms 지연이 생기지 않게
+
+            def log_message(self, *args):
+                pass
+
+            def _error(self, status: int, message: str):
+                body = json.dumps({"message": message}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _respond(self, with_body: bool):
+                with fake._lock:
+                    fake.requests += 1
+                    slow = fake.slow_rate and fake._random.random() < fake.slow_rate
+                    fail = fake.fail_next > 0 or (fake.error_rate and fake._random.random() < fake.error_rate)
+                    if fake.fail_next > 0:
+                        fake.fail_next -= 1
+                    fake.slow += bool(slow)
+                    fake.errors += bool(fail)
+                if fake.latency or slow:
+                    time.sleep(fake.latency + (fake.slow_latency if slow else 0.0))
+                if fail:
+                    self._error(fake.error_status, "injected failure")
+                    return
+                parts = urlsplit(self.path)
+                table = parts.path.rsplit("/", 1)[-1]
+                if table not in fake.tables:
+                    self._error(404, f"relation {table} does not exist")
+                    return
+
+                need_total = "count=" in self.headers.get("Prefer", "")
+                rows, total = fake.query(table, parse_qsl(parts.query, keep_blank_values=True), need_total)
+                body = json.dumps(rows).encode()
+                with fake._lock:
+                    fake.bytes_sent += len(body)
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                if need_total:
+                    end = max(len(rows) - 1, 0)
+                    self.send_header("Content-Range", f"0-{end}/{total}")
+                self.send_header("Content-Length", str(len(body) if with_body else 0))
+                self.end_headers()
+                if with_body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._respond(with_body=True)
+
+            def do_HEAD(self):
+                self._respond(with_body=False)
+
+        return Handler
+
+
+def _serve_in_process(tables: dict, latency: float, ready, options: dict):
+    fake = FakeSupabase(tables, latency=latency, **options)
+    ready.send(fake.url)
+    fake._server.serve_forever()
+
+
+class FakeSupabaseProcess:
+    """FakeSupabase를 별도 프로세스에서 실행 (requests 카운터 / fail_next는 지원하지 않음)"""
+
+    def __init__(self, tables: dict = None, latency: float = 0.0, **options):
+        self.tables = tables if tables is not None else {}
+        self.latency = latency
+        self.options = options  # slow_rate, error_rate 등 FakeSupabase 장애 주입 인자
+        self.url = None
+        self._process = None
+
+    def start(self) -> "FakeSupabaseProcess":
+        parent, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_serve_in_process, args=(self.tables, self.latency, child, self.options), daemon=True
+        )
+        self._process.start()
+        self.url = parent.recv()
+        return self
+
+    def stop(self):
+        self._process.terminate()
+        self._process.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
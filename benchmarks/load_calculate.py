@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI, Query
+
+from benchmarks.fake_supabase import FAKE_KEY, FakeSupabaseProcess
+from benchmarks.synthetic import generate_entries
+
+# /calculate 부하 테스트: 동기(스레드풀) 경로 vs 비동기(공유 connection pool) 경로
+
+"""코드 요약:
+별도 프로세스로 띄운 로컬 가짜 PostgREST 서버에 응답 지연(--latency)을 넣고,
+같은 프로세스 안에서 ASGI 앱에 동시 요청(--concurrency)을 쏘아서 처리량과 p50/p99 지연을 비교
+- sync  : 예전 방식 (def 엔드포인트 + 동기 get_entries_for_date_range → 스레드풀 스레드가 DB 왕복 내내 점유)
+- async : 지금 main.app (async def + get_entries_for_date_range_async)
+
+실행: 프로젝트 루트에서 `python -m benchmarks.load_calculate`"""
+
+PARAMS = {"start_date": "2025-05-01", "end_date": "2025-05-31"}
+
+
+def build_sync_app() -> FastAPI:
+    from utils.calculator import calculate_custom_pay, compile_entries, get_entries_for_date_range
+
+    app = FastAPI()
+
+    @app.get("/calculate")
+    def calculate(start_date: str = Query(...), end_date: str = Query(...), mode: str = Query("standard")):
+        entries = compile_entries(get_entries_for_date_range(start_date, end_date))
+        return calculate_custom_pay(entries, mode=mode)
+
+    return app
+
+
+async def run_load(app, total: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=120) as client:
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                t0 = time.perf_counter()
+                res = await client.get("/calculate", params=PARAMS)
+                res.raise_for_status()
+                latencies.append(time.perf_counter() - t0)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="가짜 DB 응답 지연(초)")
+    parser.add_argument("--users", type=int, default=2, help="범위 안 데이터 크기 (사용자 수)")
+    args = parser.parse_args(argv)
+
+    rows = generate_entries(n_users=args.users, weeks=4, shifts_per_week=5)
+    with FakeSupabaseProcess({"i_entry": rows}, latency=args.latency) as fake:
+        os.environ["SUPABASE_URL"] = fake.url
+        os.environ["SUPABASE_KEY"] = FAKE_KEY
+
+        import main as app_module
+
+        print(f"요청 {args.requests}개, 동시성 {args.concurrency}, DB 지연 {args.latency * 1000:.0f} ms")
+        for name, app in (("sync", build_sync_app()), ("async", app_module.app)):
+            stats = asyncio.run(run_load(app, args.requests, args.concurrency))
+            print(f"{name:>6}: {stats['rps']:8.1f} req/s   p50 {stats['p50_ms']:8.1f} ms   p99 {stats['p99_ms']:8.1f} ms")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from benchmarks.fake_supabase import FAKE_KEY, FakeSupabaseProcess
+from benchmarks.synthetic import generate_entries
+
+# 벤치마크 모음: 단계 함수 / calculate_custom_pay / calculate_manual_pay / API 엔드포인트 → JSON 리포트
+
+"""코드 요약:
+커밋마다 같은 조건으로 돌려서 리포트(JSON)를 비교하기 위한 벤치마크 묶음
+- steps    : calculator의 단계 함수(step1~9, 16)를 row / 주 단위로 호출한 시간 (row당 µs)
+- custom   : calculate_custom_pay standard / preview (python, numpy가 있으면 numpy 엔진도)
+- manual   : calculate_manual_pay 한 번씩 / calculate_manual_pay_batch
+- endpoints: 가짜 Supabase(별도 프로세스)를 띄워 놓고 main.app의 /calculate, /calculate/batch, /calculate/export를
+             HTTP 요청 그대로 호출 (페이지 조회 + 계산 + 응답 직렬화까지, 결과 캐시는 끔)
+크기(--sizes)마다 synthetic.generate_entries로 4주치 row를 만들어서 측정 (사용자 수 = 크기 / (4주 × 주당 근무 수))
+
+리포트 형식:
+{"meta": {커밋, 파이썬/numpy 버전, 인자, 시각},
+ "results": [{"group", "name", "size", "best_s", "median_s", "per_row_us", "runs"}, ...]}
+--compare 이전리포트.json → 같은 (name, size)끼리 시간 비율 출력, --threshold보다 느려진 항목이 있으면 exit 1
+
+실행: 프로젝트 루트에서 `python -m benchmarks.suite --sizes 1000,100000 --output bench.json`
+100만 row는 row dict만 1GB 넘게 쓰므로 메모리가 넉넉한 머신에서"""
+
+GROUPS = ("steps", "custom", "manual", "endpoints")
+START_DATE = "2025-05-05"
+END_DATE = "2025-06-01"  # START_DATE부터 4주
+WEEKS = 4
+
+
+def _measure(fn, repeat: int) -> list:
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+class Report:
+    def __init__(self, args):
+        self.results = []
+        self.meta = {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": _numpy_version(),
+            "platform": platform.platform(),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "args": vars(args),
+        }
+
+    def add(self, group: str, name: str, size: int, times: list, rows: int):
+        best = min(times)
+        result = {
+            "group": group,
+            "name": name,
+            "size": size,
+            "best_s": best,
+            "median_s": statistics.median(times),
+            "per_row_us": best / rows * 1e6 if rows else None,
+            "runs": len(times),
+        }
+        self.results.append(result)
+        per_row = f"{result['per_row_us']:10.3f}" if rows else f"{'':>10}"
+        print(f"{group:<10} {name:<40} {size:>8} {best * 1000:12.2f} {per_row}", flush=True)
+
+    def to_dict(self) -> dict:
+        return {"meta": self.meta, "results": self.results}
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _numpy_version():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy.__version__
+
+
+def build_rows(size: int, args) -> list:
+    """size개 row (4주, 사용자 수는 size에 맞춰서)"""
+    per_user = WEEKS * args.shifts_per_week
+    n_users = max(1, -(-size // per_user))
+    rows = generate_entries(
+        n_users=n_users,
+        weeks=WEEKS,
+        shifts_per_week=args.shifts_per_week,
+        start_date=START_DATE,
+        overnight_share=args.overnight_share,
+        payinfo_as_json=args.payinfo == "json",
+        seed=args.seed,
+    )
+    return rows[:size]
+
+
+def bench_steps(report: Report, rows: list, repeat: int):
+    from utils import calculator as calc
+
+    records = calc.compile_entries(rows)
+    size = len(rows)
+    report.add("steps", "compile_entries", size, _measure(lambda: calc.compile_entries(rows), repeat), size)
+    report.add(
+        "steps", "step1 calculate_work_hours", size,
+        _measure(lambda: [calc.calculate_work_hours(r["startTime"], r["endTime"]) for r in rows], repeat), size,
+    )
+
+    per_row = (
+        ("step2 calculate_base_pay_from_row", calc.calculate_base_pay_from_row),
+        ("step3 calculate_night_pay", calc.calculate_night_pay),
+        ("step4 calculate_overtime_pay", calc.calculate_overtime_pay),
+        ("step7 calculate_holiday_pay", calc.calculate_holiday_pay),
+        ("step16 calculate_final_pay_preview", calc.calculate_final_pay_preview),
+    )
+    for name, fn in per_row:
+        report.add("steps", name, size, _measure(lambda fn=fn: [fn(r) for r in records], repeat), size)
+
+    # 주 단위 함수는 (사용자, 주)별 묶음으로 (calculate_custom_pay의 주 묶음과 같은 크기)
+    weeks = defaultdict(list)
+    for record in records:
+        weeks[(record.user_id, record.week_key)].append(record)
+    weeks = list(weeks.values())
+    summaries = [calc.summarize_week(week) for week in weeks]
+
+    report.add(
+        "steps", "step12 group_entries_by_week", size,
+        _measure(lambda: calc.group_entries_by_week(records), repeat), size,
+    )
+    per_week = (
+        ("step5 get_weekly_hours", calc.get_weekly_hours),
+        ("step6 calculate_weekly_allowance", calc.calculate_weekly_allowance),
+        ("step12-1 summarize_week", calc.summarize_week),
+        ("step8 calculate_tax_deduction", lambda week: calc.calculate_tax_deduction(100000, week)),
+    )
+    for name, fn in per_week:
+        report.add("steps", name, size, _measure(lambda fn=fn: [fn(week) for week in weeks], repeat), size)
+
+    def final_pay():
+        for week in summaries:
+            for record in week.records:
+                calc.calculate_final_pay(record, week)
+
+    report.add("steps", "step9 calculate_final_pay", size, _measure(final_pay, repeat), size)
+
+
+def bench_custom(report: Report, rows: list, repeat: int):
+    from utils.calculator import calculate_custom_pay
+
+    engines = ["python"] + (["numpy"] if _numpy_version() else [])
+    for engine in engines:
+        for mode in ("standard", "preview"):
+            report.add(
+                "custom", f"calculate_custom_pay {mode} {engine}", len(rows),
+                _measure(lambda: calculate_custom_pay(rows, mode=mode, engine=engine), repeat), len(rows),
+            )
+
+
+def manual_inputs(n: int, seed: int) -> list:
+    import random
+
+    rnd = random.Random(seed)
+    days = ["월", "화", "수", "목", "금", "토", "일"]
+    return [
+        {
+            "payType": rnd.choice(["시급", "일급", "월급"]),
+            "payAmount": rnd.choice([10030, 11000, 12500, 15000, 100000, 2500000]),
+            "workHour": rnd.randrange(1, 12),
+            "workMinute": rnd.choice([0, 15, 30, 45]),
+            "workingDays": days[: rnd.randrange(1, 8)],
+            "overtimeHour": rnd.randrange(0, 4),
+            "overtimeMinute": rnd.choice([0, 30]),
+            "includeWeeklyAllowance": rnd.random() < 0.5,
+            "taxOption": rnd.choice(["none", "insurance", "income"]),
+            "nightWork": rnd.random() < 0.3,
+        }
+        for _ in range(n)
+    ]
+
+
+def bench_manual(report: Report, size: int, repeat: int, seed: int):
+    from utils.manual_batch import calculate_manual_pay_batch
+    from utils.manual_calculator import calculate_manual_pay
+
+    inputs = manual_inputs(size, seed)
+    report.add(
+        "manual", "calculate_manual_pay", size,
+        _measure(lambda: [calculate_manual_pay(data) for data in inputs], repeat), size,
+    )
+    report.add(
+        "manual", "calculate_manual_pay_batch", size,
+        _measure(lambda: calculate_manual_pay_batch(inputs), repeat), size,
+    )
+
+
+def bench_endpoints(report: Report, rows: list, repeat: int):
+    from fastapi.testclient import TestClient
+
+    size = len(rows)
+    first_users = list(dict.fromkeys(r["userId"] for r in rows))[:100]
+
+    with FakeSupabaseProcess({"i_entry": rows}) as fake:
+        del rows[:]  # 서버 프로세스가 들고 있으므로 이쪽 사본은 버림
+        gc.collect()
+        os.environ["SUPABASE_URL"] = fake.url
+        os.environ["SUPABASE_KEY"] = FAKE_KEY
+
+        import main
+
+        params = {"start_date": START_DATE, "end_date": END_DATE}
+        requests = (
+            ("GET /calculate standard", "get", "/calculate", dict(params, mode="standard"), None),
+            ("GET /calculate preview", "get", "/calculate", dict(params, mode="preview"), None),
+            ("GET /calculate/export ndjson", "get", "/calculate/export", dict(params, format="ndjson"), None),
+            ("POST /calculate/batch 100 users", "post", "/calculate/batch", None,
+             dict(params, userIds=first_users, mode="standard")),
+        )
+        with TestClient(main.app) as client:
+            for name, method, path, query, body in requests:
+                def call():
+                    response = client.request(method.upper(), path, params=query, json=body)
+                    response.raise_for_status()
+
+                call()  # 연결 / import 준비
+                report.add("endpoints", name, size, _measure(call, repeat), size)
+
+
+def compare(report: dict, baseline_path: str, threshold: float) -> int:
+    """같은 (name, size)끼리 best_s 비율 출력, threshold배보다 느려진 항목 수 반환"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    old = {(r["name"], r["size"]): r for r in baseline["results"]}
+
+    print(f"\n비교 기준: {baseline['meta'].get('commit')} ({baseline['meta'].get('created')})")
+    print(f"{'항목':<40} {'크기':>8} {'이전(ms)':>10} {'지금(ms)':>10} {'비율':>7}")
+    regressions = 0
+    for result in report["results"]:
+        before = old.get((result["name"], result["size"]))
+        if before is None:
+            continue
+        ratio = result["best_s"] / before["best_s"] if before["best_s"] else float("inf")
+        flag = ""
+        if ratio > threshold:
+            regressions += 1
+            flag = "  ← 느려짐"
+        print(f"{result['name']:<40} {result['size']:>8} {before['best_s'] * 1000:10.2f} "
+              f"{result['best_s'] * 1000:10.2f} {ratio:7.2f}{flag}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="row 수 (쉼표로 구분)")
+    parser.add_argument("--groups", default=",".join(GROUPS), help=f"측정할 묶음 ({', '.join(GROUPS)})")
+    parser.add_argument("--shifts-per-week", type=int, default=5)
+    parser.add_argument("--overnight-share", type=float, default=0.2)
+    parser.add_argument("--payinfo", choices=["dict", "json"], default="dict", help="payInfo를 dict(jsonb) / JSON 문자열(text)로")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--endpoint-repeat", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="JSON 리포트 저장 경로")
+    parser.add_argument("--compare", help="비교할 이전 JSON 리포트")
+    parser.add_argument("--threshold", type=float, default=1.2, help="이 비율보다 느려지면 회귀로 표시")
+    args = parser.parse_args(argv)
+
+    groups = [g for g in args.groups.split(",") if g]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown groups: {', '.join(sorted(unknown))}")
+
+    # 결과 캐시 / 주 단위 저장소 / 누적합 인덱스는 끄고 매번 계산하는 경로를 잼
+    os.environ["PAY_CACHE_BACKEND"] = "none"
+    os.environ["PAY_WEEK_STORE"] = "none"
+    os.environ["PAY_RANGE_INDEX"] = "0"
+
+    report = Report(args)
+    print(f"{'묶음':<10} {'항목':<40} {'크기':>8} {'best(ms)':>12} {'µs/row':>10}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        if "manual" in groups:
+            bench_manual(report, size, args.repeat, args.seed)
+        if not {"steps", "custom", "endpoints"} & set(groups):
+            continue
+        rows = build_rows(size, args)
+        if "steps" in groups:
+            bench_steps(report, rows, args.repeat)
+        if "custom" in groups:
+            bench_custom(report, rows, args.repeat)
+        if "endpoints" in groups:
+            bench_endpoints(report, rows, args.endpoint_repeat)
+        del rows
+        gc.collect()
+
+    result = report.to_dict()
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n리포트 저장: {args.output}")
+
+    if args.compare:
+        regressions = compare(result, args.compare, args.threshold)
+        if regressions:
+            print(f"\n{args.threshold}배보다 느려진 항목: {regressions}개")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
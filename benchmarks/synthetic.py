@@ -0,0 +1,65 @@
+import json
+import random
+from datetime import date, timedelta
+
+# 벤치마크용 가짜 i_entry 데이터 생성기
+
+"""코드 요약:
+seed를 고정하면 항상 같은 i_entry row 리스트가 나옴
+→ 실제 Supabase 없이 calculator / API 성능을 재현 가능하게 측정하기 위함
+각 row에는 실제 테이블처럼 "id", "userId", "date", "startTime", "endTime", "payInfo" 포함"""
+
+PAY_PROFILES = [
+    {"hourPrice": 10030, "wHoliday": True, "Holiday": False, "overtime": True, "night": False, "duty": "4대보험"},
+    {"hourPrice": 11000, "wHoliday": True, "Holiday": False, "overtime": True, "night": True, "duty": "4대보험"},
+    {"hourPrice": 12500, "wHoliday": False, "Holiday": False, "overtime": False, "night": False, "duty": "3.3%"},
+    {"hourPrice": 15000, "wHoliday": True, "Holiday": True, "overtime": True, "night": True, "duty": "4대보험"},
+]
+
+
+def generate_entries(
+    n_users: int = 1,
+    weeks: int = 4,
+    shifts_per_week: int = 5,
+    start_date: str = "2025-05-05",
+    overnight_share: float = 0.2,
+    payinfo_as_json: bool = False,
+    seed: int = 42,
+) -> list[dict]:
+    """
+    n_users명 × weeks주 × 주당 shifts_per_week개의 근무 row 생성
+    - overnight_share 비율만큼 자정을 넘기는 야간 근무
+    - payinfo_as_json=True면 payInfo를 JSON 문자열로 (Supabase에서 text 컬럼으로 올 때와 동일)
+    """
+    rng = random.Random(seed)
+    first_day = date.fromisoformat(start_date)
+    rows = []
+    entry_id = 1
+
+    for u in range(n_users):
+        user_id = f"user-{u:06d}"
+        profile = PAY_PROFILES[u % len(PAY_PROFILES)]
+        for w in range(weeks):
+            for s in range(shifts_per_week):
+                day = first_day + timedelta(days=w * 7 + (s % 7))
+                if rng.random() < overnight_share:
+                    start_h = rng.randint(18, 23)
+                    end_h = (start_h + rng.randint(6, 10)) % 24
+                else:
+                    start_h = rng.randint(6, 14)
+                    end_h = start_h + rng.randint(3, 9)
+                start_m = rng.choice([0, 15, 30, 45])
+                end_m = rng.choice([0, 10, 20, 30, 40, 50])
+
+                pay_info = dict(profile)
+                rows.append({
+                    "id": entry_id,
+                    "userId": user_id,
+                    "date": day.isoformat(),
+                    "startTime": f"{start_h:02d}:{start_m:02d}",
+                    "endTime": f"{end_h:02d}:{end_m:02d}",
+                    "payInfo": json.dumps(pay_info) if payinfo_as_json else pay_info,
+                })
+                entry_id += 1
+
+    return rows
@@ -1,11 +1,85 @@
-from fastapi import FastAPI, Query
+import asyncio
+import contextvars
+import hmac
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import Body, FastAPI, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 
-from utils.calculator import calculate_custom_pay, get_entries_for_date_range
+from utils.async_supabase import (
+    close_async_client,
+    fetch_entry_version_async,
+    iter_entries_for_date_range_async,
+    iter_entries_for_users_async,
+    open_async_client,
+)
+from utils.calculator import (
+    DEFAULT_PAGE_SIZE,
+    StreamingPayCalculator,
+    UserPayCalculator,
+    calculate_custom_pay,
+    to_shift_record,
+)
+from utils.etag import (
+    NOT_MODIFIED,
+    VERSION_COLUMN,
+    disable_etag,
+    etag_enabled,
+    etag_matches,
+    etag_stats,
+    get_validator,
+    make_etag,
+    remember_result_validator,
+    result_generation,
+    result_validator,
+    set_validator,
+    validator_generation,
+)
+from utils.live_preview import LivePreview, default_range, is_relevant_change, local_now, next_minute_delay
+from utils.manual_batch import calculate_manual_pay_batch, calculate_manual_pay_sweep, expand_pay_amount_range
 from utils.manual_calculator import calculate_manual_pay  # 🔹 수동 계산 함수 import
-from schemas import ManualPayInput  # 🔹 Pydantic 모델 import
+from utils.metrics import StageTimingMiddleware, render_prometheus, span
+from utils.precompute import get_snapshot_store, snapshot_stats, start_precompute, stop_precompute
+from utils.pay_export import EXPORT_MEDIA_TYPES, PayExporter
+from utils.profiling import PROFILING_ENABLED, ProfilingMiddleware, check_profile_token, get_profile_store
+from utils.range_index import RANGE_INDEX_ENABLED, get_range_index
+from utils.resilience import CircuitOpenError, FetchError, get_fetcher, serve_stale, with_stale_fallback
+from utils.result_cache import (
+    add_change_listener,
+    cache_key,
+    get_result_cache,
+    handle_entry_change,
+    invalidation_configured,
+    remove_change_listener,
+    start_realtime_invalidation,
+    stop_realtime_invalidation,
+)
+from utils.single_flight import get_single_flight, single_flight_stats
+from utils.week_store import complete_range, get_week_store, plan_range
+from schemas import BatchPayInput, ManualBatchInput, ManualPayInput  # 🔹 Pydantic 모델 import
 
-app = FastAPI()
+# 🔸 앱 시작/종료 시 Supabase 비동기 클라이언트(공유 connection pool) 열고 닫기
+# 🔸 PAY_CACHE_REALTIME=1이면 i_entry 변경 알림(realtime)을 구독해서 결과 캐시 무효화
+# 🔸 PAY_PRECOMPUTE=1이면 이번 달 / 지난 달 결과를 백그라운드에서 미리 계산 (utils/precompute.py)
+#    변경 알림 경로(realtime / webhook)가 없으면 스냅샷이 수정을 놓치므로 시작하지 않음
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await open_async_client()
+    subscription = None
+    if os.getenv("PAY_CACHE_REALTIME") == "1":
+        subscription = await start_realtime_invalidation()
+    if os.getenv("PAY_PRECOMPUTE") == "1" and invalidation_configured():
+        start_precompute()
+    yield
+    await stop_precompute()
+    if subscription is not None:
+        await stop_realtime_invalidation(subscription)
+    await close_async_client()
+
+app = FastAPI(lifespan=lifespan)
 
 # 🔸 CORS 설정 (모든 origin 허용 예시)
 app.add_middleware(
@@ -14,36 +88,445 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Snapshot-Version", "ETag", "Age", "Warning"],
 )
 
+# 🔸 PAY_METRICS=1이면 요청마다 단계별 시간(fetch / decode / parse / group / calc / serialize)을 모아서
+#    Server-Timing 헤더로 붙이고 /metrics 히스토그램에 누적 (utils/metrics.py, 꺼져 있으면 그대로 통과)
+app.add_middleware(StageTimingMiddleware)
+
+# 🔸 PAY_PROFILING=1이면 관리자 요청(X-Profile + X-Profile-Token)이나 일부 트래픽을 프로파일해서 보관
+#    (utils/profiling.py, 결과는 GET /profiles/{id})
+app.add_middleware(ProfilingMiddleware)
+
+
+# Supabase 조회가 재시도 / 시간 제한을 다 써도 실패하면 500 대신 503 (utils/resilience.py)
+@app.exception_handler(FetchError)
+async def fetch_error_handler(request, exc: FetchError):
+    retry_after = int(get_fetcher().breaker.reset_after) if isinstance(exc, CircuitOpenError) else 1
+    return JSONResponse(
+        {"detail": "Supabase is unavailable, please retry later"},
+        status_code=503,
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+def timed_json(content) -> JSONResponse:
+    """응답 직렬화를 "serialize" 단계로 재서 JSONResponse로 반환"""
+    with span("serialize"):
+        return JSONResponse(content)
+
 # 기본 루트 라우터
 @app.get("/")
-def root():
+async def root():
     return {"message": "Hello, FastAPI!"}
 
 # 급여 계산 API (자동 계산 - GET 방식)
 @app.get("/calculate")
-def calculate(
+async def calculate(
     start_date: str = Query(..., description="시작 날짜 (예: 2025-05-01)"),
     end_date: str = Query(..., description="종료 날짜 (예: 2025-05-31)"),
-    mode: str = Query("standard", enum=["standard", "preview"], description="계산 모드: standard 또는 preview")
+    mode: str = Query("standard", enum=["standard", "preview"], description="계산 모드: standard 또는 preview"),
+    engine: str = Query("python", enum=["python", "numpy"], description="계산 엔진: python 또는 numpy (결과 동일)"),
+    user_id: Optional[str] = Query(None, description="특정 사용자만 계산 (없으면 범위 안 전체)"),
+    if_none_match: Optional[str] = Header(None),
 ):
     """
     Supabase에서 i_entry 데이터 불러와 급여 계산 후 결과 반환
+    같은 (user_id, 기간, mode) 결과는 캐시에서 바로 반환 (i_entry가 바뀌면 무효화)
+    같은 계산이 이미 진행 중이면 새로 조회하지 않고 그 결과를 같이 받음 (single-flight)
+    이번 달 / 지난 달 범위는 백그라운드에서 미리 계산한 스냅샷이 있으면 그대로 반환
+    If-None-Match가 있으면 범위 entry 버전을 구해서 같으면 조회 / 계산 없이 304
+    응답에는 그 결과를 계산한 버전의 ETag만 붙임 (utils/etag.py)
+    Supabase 조회가 실패하면 마지막 정상 결과를 Warning / Age 헤더와 함께 반환 (utils/resilience.py)
+    """
+    key = cache_key(user_id, start_date, end_date, mode)
+    cache = get_result_cache()
+    validator = None
+    if if_none_match and etag_enabled():
+        # 버전 쿼리는 조건부 요청일 때만 (그 외 요청에는 추가 왕복 없음)
+        try:
+            validator = await range_validator(user_id, start_date, end_date)
+        except FetchError as exc:
+            # 버전 쿼리부터 실패 → 전체 조회도 같은 장애를 기다리게 되므로 계산하지 않고
+            # 캐시 결과(ETag 없이) → 마지막 정상 결과 → 503 순서로 응답
+            cached = cache.get(key)
+            if cached is not None:
+                return timed_json(cached)
+            stale = serve_stale(key, exc)
+            if stale is None:
+                raise
+            return stale_response(*stale)
+        etag = make_etag(user_id, start_date, end_date, mode, *validator) if validator else None
+        if etag is not None and etag_matches(if_none_match, etag):
+            NOT_MODIFIED.inc(1)
+            return Response(status_code=304, headers={"ETag": etag})
+
+    cached = cache.get(key)
+    if cached is not None:
+        own = result_validator(key)
+        if not validator or own == validator:
+            # 캐시 결과에는 그 결과를 계산한 버전의 ETag (버전을 모르면 ETag 없이)
+            response = timed_json(cached)
+            if own and etag_enabled():
+                response.headers["ETag"] = make_etag(user_id, start_date, end_date, mode, *own)
+            return response
+        # 다른 버전에서 계산한 결과 → 지금 ETag를 붙일 수 없으므로 다시 계산
+
+    # 스냅샷은 변경 알림으로만 지워지므로 알림 경로가 있을 때만 사용
+    snapshot = get_snapshot_store().get(key) if cached is None and invalidation_configured() else None
+    if snapshot is not None:
+        # 스냅샷은 어느 버전에서 계산됐는지 모르므로 ETag 없이 (다음 요청은 다시 버전을 비교)
+        response = timed_json(snapshot.result)
+        response.headers["X-Snapshot-Version"] = str(snapshot.version)
+        return response
+
+    # If-None-Match가 없으면 보관 중인 버전만 씀 (없으면 이번 응답은 ETag 없이)
+    validator = validator or (get_validator(user_id, start_date, end_date) if etag_enabled() else None)
+
+    async def run():
+        generation = cache.generation()  # 계산 도중 i_entry가 바뀌면 캐시에 저장하지 않도록
+        validator_gen = result_generation()
+        result = await compute_pay(start_date, end_date, mode, engine, user_id)
+        cache.set(key, result, generation)
+        if validator:
+            remember_result_validator(key, validator, validator_gen)
+        return result, validator  # 같이 기다린 요청도 계산한 요청이 구한 버전의 ETag를 붙임
+
+    # engine이 달라도 결과는 같지만, numpy 미설치 오류(400)는 numpy 요청끼리만 나누도록 키에 포함
+    # 조회가 실패하면 마지막 정상 결과를 stale 표시해서 반환
+    flight = get_single_flight("calculate").do(key + (engine,), run)
+    (result, used), stale_age = await with_stale_fallback(key, flight)
+    if stale_age is not None:
+        return stale_response((result, used), stale_age)
+    response = timed_json(result)
+    if used:
+        response.headers["ETag"] = make_etag(user_id, start_date, end_date, mode, *used)
+    return response
+
+
+def stale_response(last_good: tuple, age: float) -> JSONResponse:
+    """장애 때 대신 주는 마지막 정상 결과 ((결과, 버전), 경과 초)"""
+    response = timed_json(last_good[0])
+    response.headers["Warning"] = '110 - "Response is Stale"'
+    response.headers["Age"] = str(int(age))
+    return response  # 지금 버전의 ETag를 붙이면 304로 오래된 결과가 계속 쓰이므로 붙이지 않음
+
+
+async def range_validator(user_id: Optional[str], start_date: str, end_date: str) -> Optional[tuple]:
+    """
+    범위 i_entry의 (row 수, 최신 버전) (ETag를 안 쓰거나 버전을 구할 수 없으면 None → ETag 없이 응답)
+    Supabase 장애(FetchError)는 그대로 raise (circuit이 열려 있으면 바로 실패)
+    """
+    if not etag_enabled():
+        return None
+    validator = get_validator(user_id, start_date, end_date)
+    if validator is None:
+        generation = validator_generation()
+        try:
+            validator = await fetch_entry_version_async(start_date, end_date, user_id, VERSION_COLUMN)
+        except FetchError:
+            raise
+        except Exception as exc:  # 버전 컬럼이 없는 테이블 등 → 이 프로세스에서는 ETag 없이 기존처럼
+            disable_etag(repr(exc))
+            return None
+        set_validator(user_id, start_date, end_date, validator, generation)
+    return validator
+
+
+async def in_thread(fn, *args):
+    """
+    CPU 계산을 스레드풀에서 실행 (이벤트 루프에서 돌리면 그동안 다른 요청 / WebSocket / /metrics가 멈춤)
+    현재 요청의 단계 시간 측정(contextvar)이 이어지도록 context를 복사해서 실행
     """
-    entries = get_entries_for_date_range(start_date, end_date)
-    result = calculate_custom_pay(entries, mode=mode)
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(None, context.run, fn, *args)
+
+
+def _add_rows(calc, rows: list):
+    for row in rows:
+        calc.add(row)
+
+
+async def add_rows_in_thread(calc, rows):
+    """async iterator의 row를 한 페이지씩 모아서 스레드풀에서 calc.add"""
+    page = []
+    async for row in rows:
+        page.append(row)
+        if len(page) >= DEFAULT_PAGE_SIZE:
+            await in_thread(_add_rows, calc, page)
+            page = []
+    if page:
+        await in_thread(_add_rows, calc, page)
+
+
+def calculate_shift_records(rows: list, mode: str, engine: str) -> dict:
+    return calculate_custom_pay([to_shift_record(row) for row in rows], mode=mode, engine=engine)
+
+
+async def compute_pay(start_date: str, end_date: str, mode: str, engine: str, user_id: Optional[str]) -> dict:
+    """Supabase에서 범위 entry를 가져와서 calculate_custom_pay와 같은 결과 계산"""
+    if engine == "python" and user_id is not None and RANGE_INDEX_ENABLED:
+        # 사용자별 누적합 인덱스: 처음 한 번 기간 전체를 적재한 뒤엔 바뀐 날만 다시 가져옴
+        index = get_range_index(user_id, start_date, end_date)
+        if not index.loaded:
+            generation = index.generation()  # 가져오는 도중 변경 알림이 오면 loaded로 남기지 않도록
+            rows = iter_entries_for_date_range_async(index.first_date, index.last_date, user_id=user_id)
+            await in_thread(index.load, [row async for row in rows], generation)
+        for day in index.stale_days(start_date, end_date):
+            generation = index.generation()
+            rows = iter_entries_for_date_range_async(day, day, user_id=user_id)
+            await in_thread(index.set_day, day, [row async for row in rows], generation)
+        with span("calc"):
+            return index.query(start_date, end_date, mode)
+
+    store = get_week_store()
+    if engine == "python" and store.enabled:
+        # 주 단위 저장소에 깨끗한 주는 그대로 더하고, 없거나 dirty인 주만 조회해서 다시 계산
+        plan = plan_range(user_id, start_date, end_date, mode, store)
+        rows = []
+        for first, last in plan.fetch_ranges:
+            rows.extend([row async for row in iter_entries_for_date_range_async(first, last, user_id=user_id)])
+        with span("calc"):
+            return await in_thread(complete_range, plan, rows, store)
+
+    # 필요한 컬럼만, (date, id) 순서로 페이지 단위 조회
+    rows = iter_entries_for_date_range_async(start_date, end_date, user_id=user_id)
+
+    if engine == "python":
+        # 날짜순으로 들어오므로 한 주가 끝날 때마다 합산하고 버림 → 메모리는 한 주치만 사용
+        calc = StreamingPayCalculator(mode)
+        await add_rows_in_thread(calc, rows)
+        return await in_thread(calc.result)
+
+    # numpy 엔진은 전체 배열이 필요하므로 ShiftRecord 리스트로 모아서 계산 (row마다 한 번만 파싱)
+    entries = [row async for row in rows]
+    try:
+        result = await in_thread(calculate_shift_records, entries, mode, engine)
+    except RuntimeError as e:  # numpy 미설치 등
+        raise HTTPException(status_code=400, detail=str(e))
     return result
 
+# 급여 계산 API (여러 사용자 일괄 계산 - POST 방식)
+@app.post("/calculate/batch")
+async def calculate_batch(input: BatchPayInput):
+    """
+    여러 사용자의 급여를 한 번에 계산
+    userId in (...) 쿼리 하나로(사용자가 많으면 묶음 단위로) 가져와서 사용자별 → 주별로 합산
+    캐시에 있는 사용자는 조회에서 빼고 캐시 결과 사용
+    """
+    cache = get_result_cache()
+    results = {}
+    missing = []
+    for user_id in dict.fromkeys(input.userIds):
+        results[user_id] = cache.get(cache_key(user_id, input.start_date, input.end_date, input.mode))
+        if results[user_id] is None:
+            missing.append(user_id)
+
+    if missing:
+        generation = cache.generation()
+        calc = UserPayCalculator(missing, mode=input.mode)
+        await add_rows_in_thread(calc, iter_entries_for_users_async(missing, input.start_date, input.end_date))
+        for user_id, result in (await in_thread(calc.results)).items():
+            results[user_id] = result
+            cache.set(cache_key(user_id, input.start_date, input.end_date, input.mode), result, generation)
+
+    return timed_json({"results": results})
+
+# 일별 급여 내역 내보내기 (GET 방식, NDJSON / CSV 스트리밍)
+@app.get("/calculate/export")
+async def calculate_export(
+    start_date: str = Query(..., description="시작 날짜 (예: 2025-01-01)"),
+    end_date: str = Query(..., description="종료 날짜 (예: 2025-12-31)"),
+    mode: str = Query("standard", enum=["standard", "preview"], description="계산 모드: standard 또는 preview"),
+    format: str = Query("ndjson", enum=["ndjson", "csv"], description="내보내기 형식: ndjson 또는 csv"),
+    user_id: Optional[str] = Query(None, description="특정 사용자만 (없으면 범위 안 전체)")
+):
+    """
+    row(근무)마다 base/night/overtime/holiday/gross/tax/net 한 줄, 사용자·주마다 주휴수당 한 줄, 마지막에 합계 한 줄
+    페이지 단위로 가져오면서 한 주가 끝날 때마다 계산해서 바로 내려보냄 (전체 결과를 메모리에 모으지 않음)
+    """
+    exporter = PayExporter(mode, format)
+
+    async def body():
+        yield exporter.header()
+        async for row in iter_entries_for_date_range_async(start_date, end_date, user_id=user_id):
+            chunk = exporter.add(row)
+            if chunk:
+                yield chunk
+        yield exporter.finish()
+
+    filename = f"payroll_{start_date}_{end_date}.{'csv' if format == 'csv' else 'ndjson'}"
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+# 실시간 급여 미리보기 (WebSocket, preview 모드)
+@app.websocket("/calculate/live")
+async def calculate_live(
+    websocket: WebSocket,
+    user_id: str = Query(..., description="사용자 ID"),
+    start_date: Optional[str] = Query(None, description="시작 날짜 (없으면 이번 달 1일)"),
+    end_date: Optional[str] = Query(None, description="종료 날짜 (없으면 오늘)"),
+):
+    """
+    "지금까지 번 돈"(preview)을 /calculate?mode=preview polling 대신 연결 하나로 받음 (utils/live_preview.py)
+    연결 직후 {"type": "snapshot", "totals": ..., "running": [...]} 한 번,
+    이후 분이 바뀌거나 entry가 바뀔 때마다 바뀐 항목만 {"type": "delta", "changes": {...}, "running": [...]}
+    entry가 바뀌면 그 날짜만 다시 조회하고, 시간이 지나면 근무 중인 shift만 다시 계산
+    """
+    await websocket.accept()
+    default_start, default_end = default_range(local_now())
+    session = LivePreview(user_id, start_date or default_start, end_date or default_end)
+
+    # i_entry 변경 알림 → 이 사용자 범위에 해당하는 날짜만 모아 둠 (None = 전체 다시 조회)
+    loop = asyncio.get_running_loop()
+    changed_days = set()
+    changed = asyncio.Event()
+
+    def on_change(changed_user, day):
+        if is_relevant_change(session, changed_user, day):
+            changed_days.add(day)
+            loop.call_soon_threadsafe(changed.set)
+
+    add_change_listener(on_change)
+    receiver = asyncio.ensure_future(websocket.receive_text())  # 클라이언트 메시지는 무시, 끊김 감지용
+    try:
+        rows = iter_entries_for_date_range_async(session.start_date, session.end_date, user_id=user_id)
+        try:
+            session.load([row async for row in rows], local_now())
+        except FetchError:
+            await websocket.close(code=1013)  # Try Again Later
+            return
+        await websocket.send_json(session.snapshot())
+
+        while True:
+            waiter = asyncio.ensure_future(changed.wait())
+            done, _ = await asyncio.wait(
+                {receiver, waiter}, timeout=next_minute_delay(local_now()), return_when=asyncio.FIRST_COMPLETED
+            )
+            waiter.cancel()
+            if receiver in done:
+                receiver.result()  # 끊겼으면 WebSocketDisconnect
+                receiver = asyncio.ensure_future(websocket.receive_text())
+
+            changed.clear()
+            days = set(changed_days)
+            changed_days.clear()
+            now = local_now()
+            try:
+                if None in days:
+                    rows = iter_entries_for_date_range_async(session.start_date, session.end_date, user_id=user_id)
+                    session.load([row async for row in rows], now)
+                for day in sorted(days - {None}):
+                    rows = iter_entries_for_date_range_async(day, day, user_id=user_id)
+                    session.replace_day(day, [row async for row in rows], now)
+            except FetchError:
+                changed_days.update(days)  # Supabase 장애 → 다음 분에 다시 조회, 그동안은 시간 경과만 반영
+            session.tick(now)
+
+            message = session.delta()
+            if message is not None:
+                await websocket.send_json(message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        remove_change_listener(on_change)
+        receiver.cancel()
+
+# 단계별 지연시간 히스토그램 / 카운터 (Prometheus 텍스트 형식, PAY_METRICS=1일 때 쌓임)
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+# 보관 중인 요청 프로파일 목록 / 결과 (관리자 토큰 필요)
+def require_profile_admin(token: Optional[str]):
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="profiling is disabled")
+    if not check_profile_token(token):
+        raise HTTPException(status_code=403, detail="invalid profile token")
+
+
+@app.get("/profiles")
+async def list_profiles(x_profile_token: Optional[str] = Header(None)):
+    require_profile_admin(x_profile_token)
+    return {"profiles": get_profile_store().list()}
+
+
+@app.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    format: str = Query("collapsed", enum=["collapsed", "pstats", "text"], description="collapsed(flamegraph) / pstats / text"),
+    x_profile_token: Optional[str] = Header(None),
+):
+    require_profile_admin(x_profile_token)
+    profile = get_profile_store().get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="profile not found")
+    if format == "pstats":
+        return Response(
+            profile.pstats_bytes(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.pstats"'},
+        )
+    text = profile.collapsed() if format == "collapsed" else profile.text()
+    return PlainTextResponse(text)
+
+# 결과 캐시 상태 (hit/miss 개수 등)
+@app.get("/cache/stats")
+async def cache_stats():
+    stats = get_result_cache().stats()
+    stats["single_flight"] = single_flight_stats()  # 진행 중인 작업에 합류한 요청 수
+    stats["snapshots"] = snapshot_stats()  # 미리 계산한 스냅샷 (PAY_PRECOMPUTE=1)
+    stats["fetch"] = get_fetcher().stats()  # Supabase 조회 재시도 / hedged 요청 / circuit 상태
+    stats["etag"] = etag_stats()  # 조건부 GET 사용 여부 (버전 쿼리 실패로 꺼졌으면 그 이유)
+    return stats
+
+# i_entry 변경 알림 (Supabase Database Webhook 등) → 결과 캐시 무효화
+# PAY_WEBHOOK_SECRET이 설정되어 있고 X-Webhook-Secret 헤더가 같아야 처리 (설정 안 하면 webhook 사용 안 함)
+@app.post("/hooks/i_entry")
+async def entry_changed(payload: dict = Body(...), x_webhook_secret: Optional[str] = Header(None)):
+    secret = os.getenv("PAY_WEBHOOK_SECRET")
+    if not secret:
+        raise HTTPException(status_code=403, detail="webhook is disabled (PAY_WEBHOOK_SECRET is not set)")
+    if not hmac.compare_digest((x_webhook_secret or "").encode(), secret.encode()):
+        raise HTTPException(status_code=401, detail="invalid webhook secret")
+    return {"invalidated": handle_entry_change(payload)}
+
 # 급여 계산 API (수동 계산 - POST 방식)
 @app.post("/manual-calculate")
-def manual_calculate(input: ManualPayInput):
+async def manual_calculate(input: ManualPayInput):
     """
     사용자가 직접 입력한 정보에 기반한 수동 급여 계산 API
     """
     result = calculate_manual_pay(input.dict())
     return result
 
+# 급여 계산 API (수동 계산 여러 개 / 조합 비교 - POST 방식)
+@app.post("/manual-calculate/batch")
+async def manual_calculate_batch(input: ManualBatchInput):
+    """
+    inputs: 입력 여러 개 → "results"에 입력 순서대로 /manual-calculate와 같은 결과
+    base + sweep: base에서 sweep 항목 값들을 모든 조합으로 바꿔서 계산
+    → "sweep": {"axes": 축별 값, "count": 조합 수, "results": 항목별 값 리스트(itertools.product 순서)}
+    """
+    response = {"results": []}
+    try:
+        if input.inputs:
+            response["results"] = calculate_manual_pay_batch([item.dict() for item in input.inputs])
+        if input.sweep is not None:
+            if input.base is None:
+                raise ValueError("sweep requires base")
+            # payAmountRange는 payAmount 값 목록으로 펼침 (크기 확인 후)
+            sweep = expand_pay_amount_range(input.sweep.dict(exclude_none=True))
+            response["sweep"] = calculate_manual_pay_sweep(input.base.dict(), sweep)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # 결과가 수십만 개일 수 있어서 jsonable_encoder를 거치지 않고 바로 직렬화
+    return JSONResponse(response)
+
 
 
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Literal
+from typing import List, Literal, Optional
 
 class ManualPayInput(BaseModel):
     payType: Literal["시급", "일급", "월급"]
@@ -15,3 +15,37 @@ class ManualPayInput(BaseModel):
     includeWeeklyAllowance: bool
     taxOption: Literal["none", "insurance", "income"]
     nightWork: bool
+
+
+class BatchPayInput(BaseModel):
+    userIds: List[str]  # 예: ["76f36c2c-...", "..."]
+    start_date: str  # 예: "2025-05-01"
+    end_date: str  # 예: "2025-05-31"
+    mode: Literal["standard", "preview"] = "standard"
+
+
+class PayAmountRange(BaseModel):
+    start: int
+    stop: int  # 포함
+    step: int = 1
+
+
+class ManualPaySweep(BaseModel):
+    # 바꿔 볼 값 목록 (없으면 base 값 그대로), 모든 조합을 계산
+    payType: Optional[List[Literal["시급", "일급", "월급"]]] = None
+    payAmount: Optional[List[int]] = None
+    payAmountRange: Optional[PayAmountRange] = None  # 예: {"start": 10030, "stop": 20000, "step": 10}
+    workHour: Optional[List[int]] = None
+    workMinute: Optional[List[int]] = None
+    workingDays: Optional[List[List[str]]] = None
+    overtimeHour: Optional[List[int]] = None
+    overtimeMinute: Optional[List[int]] = None
+    includeWeeklyAllowance: Optional[List[bool]] = None
+    taxOption: Optional[List[Literal["none", "insurance", "income"]]] = None
+    nightWork: Optional[List[bool]] = None
+
+
+class ManualBatchInput(BaseModel):
+    inputs: List[ManualPayInput] = []  # 입력 여러 개 → 입력 순서대로 결과
+    base: Optional[ManualPayInput] = None  # 기본 입력 + sweep → 모든 조합 결과
+    sweep: Optional[ManualPaySweep] = None
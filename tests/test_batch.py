@@ -0,0 +1,26 @@
+from benchmarks.synthetic import generate_entries
+from utils.calculator import UserPayCalculator, calculate_custom_pay, calculate_custom_pay_by_user, chunk_user_ids
+
+
+def test_user_calculator_matches_per_user_totals():
+    rows = sorted(generate_entries(n_users=3, weeks=4), key=lambda r: (r["date"], r["id"]))
+    calc = UserPayCalculator()
+    for row in rows:
+        calc.add(row)
+    results = calc.results()
+    for user_id in {row["userId"] for row in rows}:
+        expected = calculate_custom_pay([row for row in rows if row["userId"] == user_id])
+        assert results[user_id] == expected
+
+
+def test_requested_users_without_entries_get_zero_pay():
+    rows = sorted(generate_entries(n_users=2, weeks=2), key=lambda r: (r["date"], r["id"]))
+    user_ids = ["user-999999", "user-000001", "user-000000"]
+    results = calculate_custom_pay_by_user(rows, user_ids)
+    assert list(results) == user_ids  # 요청 순서 유지
+    assert results["user-999999"] == calculate_custom_pay([])
+
+
+def test_chunk_user_ids_dedupes_in_order():
+    assert chunk_user_ids(["a", "b", "a", "c", "d", "b", "e"], chunk_size=2) == [["a", "b"], ["c", "d"], ["e"]]
+    assert chunk_user_ids([], chunk_size=2) == []
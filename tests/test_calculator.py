@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+from benchmarks.synthetic import generate_entries
+from utils.calculator import (
+    MODES,
+    PayProfile,
+    calculate_custom_pay,
+    intern_rows,
+    plain_rows,
+)
+
+
+@pytest.fixture(scope="module")
+def rows():
+    # 야간 / 자정 넘김 근무 포함, 날짜순
+    return sorted(generate_entries(n_users=1, weeks=6, overnight_share=0.3), key=lambda r: (r["date"], r["id"]))
+
+
+def test_fenwick_tree_matches_naive_sums():
+    import random
+
+    from utils.range_index import FenwickTree
+
+    rng = random.Random(7)
+    values = [rng.randint(-50, 50) for _ in range(37)]
+    tree = FenwickTree(values)
+    for _ in range(200):
+        if rng.random() < 0.3:
+            index, delta = rng.randrange(len(values)), rng.randint(-20, 20)
+            values[index] += delta
+            tree.add(index, delta)
+        lo = rng.randrange(len(values) + 1)
+        hi = rng.randrange(lo, len(values) + 1)
+        assert tree.range_sum(lo, hi) == sum(values[lo:hi])
+    assert tree.range_sum(5, 5) == 0
+
+
+def _in_range(rows, start_date, end_date):
+    return [r for r in rows if start_date <= r["date"] <= end_date]
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("start_date, end_date", [
+    ("2025-05-05", "2025-06-15"),  # 주 경계에 맞춤
+    ("2025-05-07", "2025-06-12"),  # 수요일 시작, 목요일 끝
+    ("2025-05-14", "2025-05-16"),  # 한 주 안의 일부
+    ("2025-05-10", "2025-05-12"),  # 주말 ~ 다음 주 월요일
+])
+def test_range_index_matches_calculate_custom_pay(rows, mode, start_date, end_date):
+    from utils.range_index import PayRangeIndex
+
+    index = PayRangeIndex("2025-01-01", "2025-12-31")
+    index.load(rows)
+    assert index.query(start_date, end_date, mode) == calculate_custom_pay(_in_range(rows, start_date, end_date), mode=mode)
+
+
+def test_range_index_set_day_matches_recompute(rows):
+    from utils.range_index import PayRangeIndex
+
+    index = PayRangeIndex("2025-01-01", "2025-12-31")
+    index.load(rows)
+
+    changed = [dict(r) for r in rows]
+    day = "2025-05-21"
+    changed = [r for r in changed if r["date"] != day] + [
+        dict(r, endTime="23:50") for r in rows if r["date"] == day
+    ]
+    changed.sort(key=lambda r: (r["date"], r["id"]))
+
+    index.mark_stale(day)
+    assert index.stale_days() == [day]
+    generation = index.generation()  # 다시 가져오기 직전 (compute_pay와 같은 순서)
+    index.set_day(day, _in_range(changed, day, day), generation)
+    assert index.stale_days() == []
+
+    for start_date, end_date in [("2025-05-05", "2025-06-15"), ("2025-05-20", "2025-05-22")]:
+        for mode in MODES:
+            expected = calculate_custom_pay(_in_range(changed, start_date, end_date), mode=mode)
+            assert index.query(start_date, end_date, mode) == expected
+
+
+def test_range_index_reloads_after_ttl(rows, monkeypatch):
+    from utils import range_index
+
+    range_index.clear_range_indexes()
+    index = range_index.get_range_index("user-000000", "2025-05-01", "2025-05-31")
+    index.load(rows)
+    assert range_index.get_range_index("user-000000", "2025-05-01", "2025-05-31").loaded
+
+    monkeypatch.setattr(range_index, "RANGE_INDEX_TTL", 0)
+    assert not range_index.get_range_index("user-000000", "2025-05-01", "2025-05-31").loaded
+    range_index.clear_range_indexes()
+
+
+def test_intern_rows_leaves_input_rows_alone():
+    rows = generate_entries(n_users=1, weeks=1)
+    originals = json.loads(json.dumps(rows))
+    interned = intern_rows(rows)
+    assert rows == originals
+    assert all(isinstance(row["payInfo"], PayProfile) for row in interned)
+    assert interned[0]["payInfo"] is interned[1]["payInfo"]
+    # 리스트로 돌려줄 때는 다시 JSON으로 내보낼 수 있어야 함
+    assert json.loads(json.dumps(plain_rows(interned))) == originals
+    assert calculate_custom_pay(interned) == calculate_custom_pay(rows)
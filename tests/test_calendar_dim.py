@@ -0,0 +1,23 @@
+from utils.calendar_dim import CalendarDimension, load_holidays
+
+
+def test_holiday_years_come_from_the_holiday_file():
+    calendar = CalendarDimension(2020, 2035)
+    assert calendar.holiday_years == {int(d[:4]) for d in load_holidays()}
+
+
+def test_is_holiday_unknown_outside_covered_years():
+    calendar = CalendarDimension(2020, 2030, holidays={"2025-01-01": "신정", "2025-03-01": "삼일절"})
+    assert calendar.is_holiday("2025-01-01") is True
+    assert calendar.is_holiday("2025-01-02") is False
+    # 2027 공휴일은 목록에 없음 → 평일로 확정하지 않음
+    assert calendar.is_holiday("2027-01-01") is None
+    assert calendar.is_holiday("2040-01-01") is None
+    # 날짜 차원 값은 공휴일 목록과 상관없이 범위 안이면 있음
+    assert calendar.week_key("2027-01-01") == "2027-00"
+
+
+def test_explicit_holiday_years():
+    calendar = CalendarDimension(2024, 2026, holidays={}, holiday_years=[2026])
+    assert calendar.is_holiday("2026-05-05") is False
+    assert calendar.is_holiday("2024-05-05") is None
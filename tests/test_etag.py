@@ -0,0 +1,118 @@
+import pytest
+
+from benchmarks.fake_supabase import FakeSupabase
+from utils import etag
+from utils.etag import etag_matches, make_etag, remember_result_validator, result_generation, result_validator
+from utils.result_cache import InMemoryResultCache, cache_key, handle_entry_change
+
+
+def test_etag_matches():
+    tag = make_etag("u1", "2025-05-01", "2025-05-31", "standard", 3, "2025-05-20T10:00:00")
+    assert etag_matches(tag, tag)
+    assert etag_matches(f'"other", W/{tag}', tag)
+    assert etag_matches("*", tag)
+    assert not etag_matches('"other"', tag)
+    assert not etag_matches(None, tag)
+    assert not etag_matches(tag, None)
+
+
+def test_make_etag_changes_with_version_count_and_mode():
+    args = ("u1", "2025-05-01", "2025-05-31")
+    tag = make_etag(*args, "standard", 3, "2025-05-20T10:00:00")
+    assert make_etag(*args, "standard", 3, "2025-05-20T10:00:00") == tag
+    assert make_etag(*args, "preview", 3, "2025-05-20T10:00:00") != tag
+    assert make_etag(*args, "standard", 2, "2025-05-20T10:00:00") != tag  # row 삭제
+    assert make_etag(*args, "standard", 3, "2025-05-20T10:00:01") != tag  # row 수정
+
+
+def test_result_validator_is_dropped_on_change_and_across_generations():
+    key = cache_key("u-etag", "2025-05-01", "2025-05-31", "standard")
+    generation = result_generation()
+    handle_entry_change({"record": {"userId": "u-etag", "date": "2025-05-20"}}, InMemoryResultCache())
+    remember_result_validator(key, (3, "v1"), generation)  # 계산 도중 변경 → 기록 안 함
+    assert result_validator(key) is None
+
+    remember_result_validator(key, (3, "v1"), result_generation())
+    assert result_validator(key) == (3, "v1")
+    handle_entry_change({"record": {"userId": "u-etag", "date": "2025-05-20"}}, InMemoryResultCache())
+    assert result_validator(key) is None
+
+
+def test_version_query_ignores_null_versions():
+    rows = [
+        {"id": 1, "userId": "u1", "date": "2025-05-02", "updated_at": "2025-05-02T09:00:00"},
+        {"id": 2, "userId": "u1", "date": "2025-05-03", "updated_at": None},
+        {"id": 3, "userId": "u1", "date": "2025-05-04", "updated_at": "2025-05-04T09:00:00"},
+        {"id": 4, "userId": "u1", "date": "2025-06-01", "updated_at": "2025-06-01T09:00:00"},
+    ]
+    fake = FakeSupabase({"i_entry": rows})
+    # fetch_entry_version_async가 만드는 쿼리와 같은 조건
+    params = [
+        ("select", "updated_at"),
+        ("date", "gte.2025-05-01"),
+        ("date", "lte.2025-05-31"),
+        ("userId", "eq.u1"),
+        ("updated_at", "not.is.null"),
+        ("order", "updated_at.desc"),
+        ("limit", "1"),
+    ]
+    result, total = fake.query("i_entry", params)
+    # DESC 정렬에서 NULL이 먼저 와서 최신 버전이 None이 되면 안 됨
+    assert result == [{"updated_at": "2025-05-04T09:00:00"}]
+    assert total == 2
+
+
+@pytest.fixture
+def client(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("postgrest")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    import main
+    from utils.result_cache import get_result_cache, set_result_cache
+
+    previous = get_result_cache()
+    set_result_cache(InMemoryResultCache())
+    monkeypatch.setattr(etag, "ETAG_ENABLED", True)
+    state = {"version": (3, "v1"), "computed": 0}
+
+    async def fetch_version(start_date, end_date, user_id=None, version_column="updated_at"):
+        return state["version"]
+
+    async def compute_pay(start_date, end_date, mode, engine, user_id):
+        state["computed"] += 1
+        return {"net_with_allowance": state["computed"]}
+
+    monkeypatch.setattr(main, "fetch_entry_version_async", fetch_version)
+    monkeypatch.setattr(main, "compute_pay", compute_pay)
+    yield TestClient(main.app), state
+    set_result_cache(previous)
+
+
+PARAMS = {"start_date": "2025-05-01", "end_date": "2025-05-31", "user_id": "u-http"}
+
+
+def test_not_modified_without_computing(client):
+    client, state = client
+    first = client.get("/calculate", params=PARAMS, headers={"If-None-Match": '"none"'})
+    assert first.status_code == 200 and state["computed"] == 1
+    tag = first.headers["ETag"]
+
+    second = client.get("/calculate", params=PARAMS, headers={"If-None-Match": tag})
+    assert second.status_code == 304
+    assert second.headers["ETag"] == tag
+    assert state["computed"] == 1
+
+
+def test_cached_result_from_another_version_is_recomputed(client):
+    client, state = client
+    first = client.get("/calculate", params=PARAMS, headers={"If-None-Match": '"none"'})
+    old_tag = first.headers["ETag"]
+
+    state["version"] = (3, "v2")  # 변경 알림 없이 버전만 바뀜 (결과 캐시에는 v1 결과가 남아 있음)
+    second = client.get("/calculate", params=PARAMS, headers={"If-None-Match": old_tag})
+    assert second.status_code == 200
+    assert second.json() == {"net_with_allowance": 2}  # v1 캐시 결과를 v2 ETag로 주지 않음
+    assert second.headers["ETag"] != old_tag
+    assert second.headers["ETag"] == make_etag("u-http", "2025-05-01", "2025-05-31", "standard", 3, "v2")
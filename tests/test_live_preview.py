@@ -0,0 +1,118 @@
+from datetime import datetime
+
+import pytest
+
+from benchmarks.synthetic import generate_entries
+from utils.calculator import calculate_custom_pay
+from utils.live_preview import (
+    TIMEZONE,
+    LivePreview,
+    default_range,
+    is_relevant_change,
+    next_minute_delay,
+)
+
+PAY_INFO = {"hourPrice": 10030, "night": True, "overtime": True, "wHoliday": True}
+
+
+def entry(id, date, start, end, **pay_info):
+    return {"id": id, "userId": "u1", "date": date, "startTime": start, "endTime": end,
+            "payInfo": dict(PAY_INFO, **pay_info)}
+
+
+def at(text: str) -> datetime:
+    return datetime.fromisoformat(text).replace(tzinfo=TIMEZONE)
+
+
+@pytest.fixture
+def rows():
+    return [
+        entry(1, "2025-05-19", "09:00", "18:00"),
+        entry(2, "2025-05-20", "20:00", "02:00"),  # 자정 넘김 + 야간
+        entry(3, "2025-05-21", "09:00", "18:00", Holiday=True),
+        entry(4, "2025-05-22", "09:00", "18:00"),
+    ]
+
+
+def preview(rows):
+    return calculate_custom_pay(rows, mode="preview")
+
+
+def test_finished_entries_match_calculate_custom_pay():
+    rows = sorted(generate_entries(n_users=1, weeks=4, overnight_share=0.3), key=lambda r: (r["date"], r["id"]))
+    session = LivePreview(rows[0]["userId"], rows[0]["date"], rows[-1]["date"])
+    session.load(rows, at("2025-12-31T00:00"))
+    assert session.totals() == preview(rows)
+    assert session.running() == []
+
+
+def test_running_entry_counts_until_now(rows):
+    session = LivePreview("u1", "2025-05-19", "2025-05-31")
+    session.load(rows, at("2025-05-21T13:30"))
+    # 3번은 13:30에 끝난 것으로, 4번은 아직 시작 전
+    assert session.totals() == preview([rows[0], rows[1], dict(rows[2], endTime="13:30")])
+    assert [r["id"] for r in session.running()] == [3]
+
+
+def test_overnight_entry_runs_past_midnight(rows):
+    session = LivePreview("u1", "2025-05-19", "2025-05-31")
+    session.load(rows, at("2025-05-21T01:15"))
+    assert session.totals() == preview([rows[0], dict(rows[1], endTime="01:15")])
+    assert session.running() == [{"id": 2, "date": "2025-05-20", "startTime": "20:00", "endTime": "02:00"}]
+
+
+def test_tick_sends_only_changed_keys(rows):
+    session = LivePreview("u1", "2025-05-19", "2025-05-31")
+    session.load(rows, at("2025-05-21T13:30"))
+    assert session.snapshot()["totals"] == session.totals()
+    assert session.delta() is None  # 아무것도 안 바뀜
+
+    session.tick(at("2025-05-21T13:31"))
+    delta = session.delta()
+    assert delta["type"] == "delta"
+    assert "base" in delta["changes"] and "holiday" in delta["changes"]
+    assert "weekly_allowance" not in delta["changes"]  # preview라 항상 0
+    assert session.delta() is None
+
+
+def test_tick_moves_entries_between_states(rows):
+    session = LivePreview("u1", "2025-05-19", "2025-05-31")
+    session.load(rows, at("2025-05-22T08:59"))
+    assert session.running() == []
+    session.tick(at("2025-05-22T09:30"))
+    assert [r["id"] for r in session.running()] == [4]
+    session.tick(at("2025-05-22T18:00"))
+    assert session.running() == []
+    assert session.totals() == preview(rows)
+
+
+def test_replace_day_matches_recompute(rows):
+    session = LivePreview("u1", "2025-05-19", "2025-05-31")
+    now = at("2025-05-22T12:00")
+    session.load(rows, now)
+    changed = [entry(5, "2025-05-21", "10:00", "14:00"), entry(6, "2025-05-21", "15:00", "16:30")]
+    session.replace_day("2025-05-21", changed, now)
+    assert session.totals() == preview([rows[0], rows[1], *changed, dict(rows[3], endTime="12:00")])
+
+    session.replace_day("2025-05-21", [], now)  # 그 날 entry 삭제
+    assert session.totals() == preview([rows[0], rows[1], dict(rows[3], endTime="12:00")])
+
+
+def test_entries_outside_the_range_are_ignored(rows):
+    session = LivePreview("u1", "2025-05-20", "2025-05-21")
+    session.load(rows, at("2025-06-01T00:00"))
+    assert session.totals() == preview(rows[1:3])
+
+
+def test_is_relevant_change():
+    session = LivePreview("u1", "2025-05-01", "2025-05-31")
+    assert is_relevant_change(session, "u1", "2025-05-20")
+    assert is_relevant_change(session, None, None)
+    assert not is_relevant_change(session, "u2", "2025-05-20")
+    assert not is_relevant_change(session, "u1", "2025-06-01")
+
+
+def test_minute_helpers():
+    now = at("2025-05-21T13:30:15.500000")
+    assert next_minute_delay(now) == pytest.approx(44.5)
+    assert default_range(now) == ("2025-05-01", "2025-05-21")
@@ -0,0 +1,127 @@
+import itertools
+import random
+
+import pytest
+
+from utils import manual_batch
+from utils.manual_batch import (
+    PAY_TYPES,
+    RESULT_KEYS,
+    TAX_RATES,
+    calculate_manual_pay_batch,
+    calculate_manual_pay_sweep,
+    expand_pay_amount_range,
+)
+from utils.manual_calculator import calculate_manual_pay
+
+DAYS = ["월", "화", "수", "목", "금", "토", "일"]
+
+BASE = {
+    "payType": "시급",
+    "payAmount": 10030,
+    "workHour": 4,
+    "workMinute": 30,
+    "workingDays": ["월", "수", "금"],
+    "overtimeHour": 1,
+    "overtimeMinute": 15,
+    "includeWeeklyAllowance": True,
+    "taxOption": "insurance",
+    "nightWork": False,
+}
+
+
+def random_inputs(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "payType": rng.choice(PAY_TYPES),
+            "payAmount": rng.randrange(9000, 3_000_000),
+            "workHour": rng.randrange(0, 13),
+            "workMinute": rng.choice((0, 10, 15, 20, 30, 45, 50)),
+            "workingDays": rng.sample(DAYS, rng.randrange(0, 8)),
+            "overtimeHour": rng.randrange(0, 4),
+            "overtimeMinute": rng.choice((0, 20, 30, 40)),
+            "includeWeeklyAllowance": rng.random() < 0.5,
+            "taxOption": rng.choice(list(TAX_RATES)),
+            "nightWork": rng.random() < 0.3,
+        }
+        for _ in range(n)
+    ]
+
+
+def test_batch_matches_calculate_manual_pay():
+    inputs = random_inputs(500)
+    inputs += inputs[:50]  # 중복 입력은 한 번만 계산
+    assert calculate_manual_pay_batch(inputs) == [calculate_manual_pay(data) for data in inputs]
+
+
+def test_batch_reuses_results_for_inputs_with_the_same_day_count():
+    other_days = dict(BASE, workingDays=["화", "목", "토"])
+    results = calculate_manual_pay_batch([BASE, other_days])
+    assert results[0] is results[1]
+    assert results[0] == calculate_manual_pay(other_days)
+
+
+def test_batch_without_numpy(monkeypatch):
+    monkeypatch.setattr(manual_batch, "np", None)
+    inputs = random_inputs(50, seed=1)
+    assert calculate_manual_pay_batch(inputs) == [calculate_manual_pay(data) for data in inputs]
+
+
+def test_batch_size_limit(monkeypatch):
+    monkeypatch.setattr(manual_batch, "MAX_BATCH_SIZE", 3)
+    with pytest.raises(ValueError):
+        calculate_manual_pay_batch([BASE] * 4)
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_sweep_matches_calculate_manual_pay(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(manual_batch, "np", None)
+    elif manual_batch.np is None:
+        pytest.skip("numpy is not installed")
+    sweep = {
+        "payType": list(PAY_TYPES),
+        "payAmount": [10030, 12345, 250000],
+        "workingDays": [DAYS[:n] for n in range(8)],
+        "taxOption": list(TAX_RATES),
+        "nightWork": [False, True],
+    }
+    result = calculate_manual_pay_sweep(BASE, sweep)
+    combos = [dict(zip(result["axes"], values)) for values in itertools.product(*result["axes"].values())]
+    assert result["count"] == len(combos) == 3 * 3 * 8 * 3 * 2
+    expected = [calculate_manual_pay(data) for data in combos]
+    for key in RESULT_KEYS:
+        assert result["results"][key] == [r[key] for r in expected]
+
+
+def test_sweep_combination_limit(monkeypatch):
+    monkeypatch.setattr(manual_batch, "MAX_BATCH_SIZE", 10)
+    with pytest.raises(ValueError):
+        calculate_manual_pay_sweep(BASE, {"payAmount": list(range(4)), "workHour": list(range(3))})
+
+
+def test_expand_pay_amount_range():
+    sweep = {"payAmount": [9000], "payAmountRange": {"start": 10000, "stop": 10030, "step": 10}}
+    assert expand_pay_amount_range(sweep) == {"payAmount": [9000, 10000, 10010, 10020, 10030]}
+    assert sweep["payAmountRange"]  # 받은 dict는 그대로
+    assert expand_pay_amount_range({"nightWork": [True]}) == {"nightWork": [True]}
+
+
+@pytest.mark.parametrize("amount_range", [
+    {"start": 10000, "stop": 20000, "step": 0},
+    {"start": 10000, "stop": 20000, "step": -10},
+    {"start": 20000, "stop": 10000, "step": 10},
+])
+def test_expand_pay_amount_range_rejects_bad_ranges(amount_range):
+    with pytest.raises(ValueError):
+        expand_pay_amount_range({"payAmountRange": amount_range})
+
+
+def test_expand_pay_amount_range_checks_size_before_expanding(monkeypatch):
+    monkeypatch.setattr(manual_batch, "MAX_BATCH_SIZE", 1000)
+    with pytest.raises(ValueError, match="too many payAmount values"):
+        expand_pay_amount_range({"payAmountRange": {"start": 0, "stop": 10 ** 15, "step": 1}})
+    # 기존 payAmount 값도 개수에 포함
+    with pytest.raises(ValueError):
+        expand_pay_amount_range({"payAmount": [1, 2], "payAmountRange": {"start": 0, "stop": 998, "step": 1}})
@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+
+import pytest
+
+from benchmarks.synthetic import generate_entries
+from utils.calculator import MODES, calculate_custom_pay
+from utils.pay_export import EXPORT_COLUMNS, PayExporter, iter_pay_export
+
+
+@pytest.fixture(scope="module")
+def rows():
+    # 야간 / 자정 넘김 근무 포함, 날짜순
+    return sorted(generate_entries(n_users=1, weeks=6, overnight_share=0.3), key=lambda r: (r["date"], r["id"]))
+
+
+def export_ndjson(rows, mode):
+    return [json.loads(line) for line in "".join(iter_pay_export(rows, mode, "ndjson")).splitlines()]
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_ndjson_total_matches_calculate_custom_pay(rows, mode):
+    lines = export_ndjson(rows, mode)
+    total = lines[-1]
+    expected = calculate_custom_pay(rows, mode=mode)
+    assert total["type"] == "total"
+    for key in ("base", "night", "overtime", "holiday", "weekly_allowance", "tax"):
+        assert total[key] == expected[key]
+    assert total["gross"] == expected["gross_with_allowance"]
+    assert total["net"] == expected["net_with_allowance"]
+
+    # shift 줄 + week 줄을 더하면 total 줄과 같음
+    details = lines[:-1]
+    assert len([line for line in details if line["type"] == "shift"]) == len(rows)
+    assert sum(line["gross"] for line in details) == total["gross"]
+    assert sum(line["net"] for line in details) == total["net"]
+    assert sum(line["tax"] for line in details) == total["tax"]
+
+
+def test_week_lines_only_in_standard_mode(rows):
+    assert any(line["type"] == "week" for line in export_ndjson(rows, "standard"))
+    assert not any(line["type"] == "week" for line in export_ndjson(rows, "preview"))
+
+
+def test_csv_matches_ndjson(rows):
+    ndjson = export_ndjson(rows, "standard")
+    table = list(csv.DictReader(io.StringIO("".join(iter_pay_export(rows, "standard", "csv")))))
+    assert len(table) == len(ndjson)
+    assert list(table[0]) == list(EXPORT_COLUMNS)
+    for line, record in zip(ndjson, table):
+        for key, value in line.items():
+            assert record[key] == ("" if value is None else str(value))
+
+
+def test_export_streams_one_chunk_per_week(rows):
+    exporter = PayExporter("standard", "ndjson")
+    chunks = [exporter.add(row) for row in rows]
+    # 주가 바뀌는 row에서만 이전 주가 한 번에 나옴
+    weeks = {line["week"] for line in export_ndjson(rows, "standard") if line["type"] == "shift"}
+    assert sum(1 for chunk in chunks if chunk) == len(weeks) - 1
+
+
+def test_export_rejects_unsorted_rows(rows):
+    later = next(r for r in rows if r["date"] >= "2025-05-19")
+    with pytest.raises(ValueError):
+        "".join(iter_pay_export([rows[0], later, rows[0]]))
+
+
+def test_export_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        PayExporter(fmt="xlsx")
@@ -0,0 +1,177 @@
+import asyncio
+
+import pytest
+
+from utils.resilience import CircuitBreaker, CircuitOpenError, FetchError, ResilientFetcher
+
+
+async def _ok():
+    return "ok"
+
+
+async def _down():
+    raise ConnectionError("down")
+
+
+def _open_breaker() -> CircuitBreaker:
+    """연속 실패로 열린 뒤 바로 half-open이 되는 circuit"""
+    breaker = CircuitBreaker(failures=1, reset_after=0)
+    breaker.record_failure()
+    assert breaker.state == "open"
+    return breaker
+
+
+def test_breaker_opens_after_consecutive_failures():
+    fetcher = ResilientFetcher(retries=0, breaker=CircuitBreaker(failures=3, reset_after=60))
+    for _ in range(3):
+        with pytest.raises(FetchError):
+            asyncio.run(fetcher.call(_down))
+    assert fetcher.breaker.state == "open"
+
+    # 열려 있는 동안은 호출하지 않고 바로 실패
+    calls = 0
+
+    async def counted():
+        nonlocal calls
+        calls += 1
+        return "ok"
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(fetcher.call(counted))
+    assert calls == 0
+
+
+def test_half_open_probe_success_closes():
+    fetcher = ResilientFetcher(retries=0, breaker=_open_breaker())
+    assert asyncio.run(fetcher.call(_ok)) == "ok"
+    assert fetcher.breaker.state == "closed"
+
+
+def test_half_open_probe_failure_reopens():
+    breaker = CircuitBreaker(failures=1, reset_after=60)
+    breaker.record_failure()
+    breaker.reset_after = 0  # 바로 half-open
+    fetcher = ResilientFetcher(retries=0, breaker=breaker)
+    with pytest.raises(FetchError):
+        asyncio.run(fetcher.call(_down))
+    assert breaker.state == "open"
+    breaker.reset_after = 60
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(fetcher.call(_ok))
+
+
+def test_cancelled_probe_releases_half_open():
+    breaker = _open_breaker()
+    fetcher = ResilientFetcher(retries=0, breaker=breaker)
+    started = asyncio.Event()
+
+    async def hang():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def run():
+        probe = asyncio.ensure_future(fetcher.call(hang))
+        await started.wait()
+        assert breaker.state == "half_open"
+        probe.cancel()
+        try:
+            await probe
+        except asyncio.CancelledError:
+            pass
+        # 취소된 시험 요청이 자리를 잡고 있으면 CircuitOpenError가 계속 남
+        return await fetcher.call(_ok)
+
+    assert asyncio.run(run()) == "ok"
+    assert breaker.state == "closed"
+
+
+def test_half_open_allows_single_probe():
+    breaker = _open_breaker()
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_stale_fallback_only_on_fetch_failure_and_cleared_on_change():
+    from utils.resilience import LastGoodStore, with_stale_fallback
+
+    store = LastGoodStore()
+    key = ("u1", "2025-05-01", "2025-05-31", "standard")
+
+    async def value(v):
+        return v
+
+    async def fail():
+        raise FetchError("down")
+
+    async def run():
+        assert await with_stale_fallback(key, value({"n": 1}), store) == ({"n": 1}, None)
+        result, age = await with_stale_fallback(key, fail(), store)
+        assert result == {"n": 1} and age is not None
+
+        store.invalidate(user_id="u1", date="2025-05-10")
+        with pytest.raises(FetchError):
+            await with_stale_fallback(key, fail(), store)
+
+    asyncio.run(run())
+
+
+def test_open_circuit_serves_stale_immediately_and_refreshes_in_background():
+    from utils.resilience import LastGoodStore, with_stale_fallback
+
+    store = LastGoodStore()
+    breaker = CircuitBreaker(failures=1, reset_after=60)
+    key = ("u1", "2025-05-01", "2025-05-31", "standard")
+    store.put(key, {"n": 1})
+    breaker.record_failure()
+    refreshed = asyncio.Event()
+
+    async def refresh():
+        refreshed.set()
+        return {"n": 2}
+
+    async def run():
+        result, age = await with_stale_fallback(key, refresh(), store, breaker)
+        assert result == {"n": 1} and age is not None
+        await asyncio.wait_for(refreshed.wait(), 1)
+        await asyncio.sleep(0)
+        return store.get(key)[0]
+
+    assert asyncio.run(run()) == {"n": 2}
+
+
+def test_client_error_during_half_open_does_not_close_circuit():
+    class BadRequest(Exception):
+        code = "400"
+
+    async def bad():
+        raise BadRequest()
+
+    breaker = _open_breaker()
+    fetcher = ResilientFetcher(retries=0, breaker=breaker)
+    with pytest.raises(BadRequest):
+        asyncio.run(fetcher.call(bad))
+    assert breaker.state == "half_open"
+    # 시험 요청 자리는 풀려서 다음 요청이 다시 시험할 수 있음
+    assert asyncio.run(fetcher.call(_ok)) == "ok"
+    assert breaker.state == "closed"
+
+
+def test_call_sync_exposes_remaining_budget_as_attempt_timeout():
+    from utils.resilience import apply_attempt_timeout, attempt_timeout
+
+    class Request:
+        extensions = {"timeout": {"connect": 30.0, "read": 30.0, "write": 30.0, "pool": 30.0}}
+
+    seen = []
+
+    def fn():
+        seen.append(attempt_timeout())
+        apply_attempt_timeout(Request)
+        return "ok"
+
+    fetcher = ResilientFetcher(timeout=5, deadline=0.5, breaker=CircuitBreaker())
+    assert fetcher.call_sync(fn) == "ok"
+    assert 0 < seen[0] <= 0.5
+    assert max(Request.extensions["timeout"].values()) <= 0.5
+    assert attempt_timeout() is None
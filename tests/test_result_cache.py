@@ -0,0 +1,103 @@
+import pytest
+
+from utils import result_cache
+from utils.result_cache import InMemoryResultCache, ResultCache, cache_key, handle_entry_change
+
+
+@pytest.fixture
+def cache():
+    return InMemoryResultCache(maxsize=8, ttl=60)
+
+
+def test_get_set_and_lru_eviction():
+    cache = InMemoryResultCache(maxsize=2, ttl=60)
+    a, b, c = (cache_key("u1", "2025-05-01", "2025-05-31", m) for m in ("standard", "preview", "x"))
+    cache.set(a, {"n": 1})
+    cache.set(b, {"n": 2})
+    assert cache.get(a) == {"n": 1}  # a가 최근 사용 → b가 밀려남
+    cache.set(c, {"n": 3})
+    assert cache.get(b) is None
+    assert cache.get(a) == {"n": 1}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry(cache, monkeypatch):
+    key = cache_key("u1", "2025-05-01", "2025-05-31", "standard")
+    cache.set(key, {"n": 1})
+    now = result_cache.time.monotonic()
+    monkeypatch.setattr(result_cache.time, "monotonic", lambda: now + 61)
+    assert cache.get(key) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_invalidate_only_ranges_containing_the_changed_day(cache):
+    may = cache_key("u1", "2025-05-01", "2025-05-31", "standard")
+    june = cache_key("u1", "2025-06-01", "2025-06-30", "standard")
+    other = cache_key("u2", "2025-05-01", "2025-05-31", "standard")
+    everyone = cache_key(None, "2025-05-01", "2025-05-31", "standard")
+    for key in (may, june, other, everyone):
+        cache.set(key, {"key": key})
+
+    assert cache.invalidate("u1", "2025-05-20") == 2  # u1의 5월 + 전체 사용자 5월
+    assert cache.get(may) is None and cache.get(everyone) is None
+    assert cache.get(june) is not None and cache.get(other) is not None
+
+    assert cache.invalidate() == 2
+    assert cache.stats()["size"] == 0
+
+
+def test_generation_guard_skips_results_computed_before_a_change(cache):
+    key = cache_key("u1", "2025-05-01", "2025-05-31", "standard")
+    generation = cache.generation()  # 계산 시작
+    cache.invalidate("u2", "2025-01-01")  # 계산하는 동안 변경 (어느 사용자든)
+    cache.set(key, {"stale": True}, generation)
+    assert cache.get(key) is None
+
+    cache.set(key, {"stale": False}, cache.generation())
+    assert cache.get(key) == {"stale": False}
+
+
+@pytest.mark.parametrize("payload", [
+    # realtime(postgres_changes)
+    {"data": {"type": "UPDATE", "record": {"userId": "u1", "date": "2025-05-20"},
+              "old_record": {"userId": "u1", "date": "2025-06-03"}}},
+    # Database Webhook
+    {"type": "UPDATE", "table": "i_entry", "record": {"userId": "u1", "date": "2025-05-20"},
+     "old_record": {"userId": "u1", "date": "2025-06-03"}},
+])
+def test_handle_entry_change_invalidates_old_and_new_rows(cache, payload):
+    for month in ("05", "06", "07"):
+        cache.set(cache_key("u1", f"2025-{month}-01", f"2025-{month}-28", "standard"), {})
+    seen = []
+
+    def listener(user_id, date):
+        seen.append((user_id, date))
+
+    result_cache.add_change_listener(listener)
+    try:
+        removed = handle_entry_change(payload, cache)
+    finally:
+        result_cache.remove_change_listener(listener)
+    assert removed == 2
+    assert cache.stats()["size"] == 1
+    assert seen == [("u1", "2025-05-20"), ("u1", "2025-06-03")]
+
+
+def test_handle_entry_change_without_rows_clears_everything(cache):
+    cache.set(cache_key("u1", "2025-05-01", "2025-05-31", "standard"), {})
+    cache.set(cache_key("u2", "2025-05-01", "2025-05-31", "standard"), {})
+    assert handle_entry_change({"type": "TRUNCATE"}, cache) == 2
+
+
+def test_cache_is_off_without_an_invalidation_source(monkeypatch):
+    monkeypatch.delenv("PAY_CACHE_BACKEND", raising=False)
+    monkeypatch.delenv("PAY_CACHE_REALTIME", raising=False)
+    monkeypatch.delenv("PAY_WEBHOOK_SECRET", raising=False)
+    assert type(result_cache._create_cache_from_env()) is ResultCache
+
+    monkeypatch.setenv("PAY_WEBHOOK_SECRET", "s3cret")
+    assert type(result_cache._create_cache_from_env()) is InMemoryResultCache
+
+    monkeypatch.setenv("PAY_CACHE_BACKEND", "redis")
+    with pytest.raises(ValueError):
+        result_cache._create_cache_from_env()
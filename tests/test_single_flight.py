@@ -0,0 +1,132 @@
+import asyncio
+
+from utils.result_cache import InMemoryResultCache, handle_entry_change
+from utils.single_flight import SingleFlight, get_single_flight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test", enabled=True)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"net": 1}
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", compute) for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"calls": 10, "coalesced": 9, "inflight": 0}
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight("test", enabled=True)
+
+    async def main():
+        return await asyncio.gather(flight.do("a", lambda: _value("a")), flight.do("b", lambda: _value("b")))
+
+    assert asyncio.run(main()) == ["a", "b"]
+    assert flight.coalesced == 0
+
+
+def test_results_are_not_kept_after_completion():
+    flight = SingleFlight("test", enabled=True)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return len(calls)
+
+    async def main():
+        return [await flight.do("key", compute), await flight.do("key", compute)]
+
+    assert asyncio.run(main()) == [1, 2]
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight("test", enabled=True)
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("down")
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_work():
+    flight = SingleFlight("test", enabled=True)
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("key", compute))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.do("key", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_forget_starts_new_work_for_later_callers():
+    flight = SingleFlight("test", enabled=True)
+    started = []
+
+    async def compute():
+        started.append(1)
+        number = len(started)
+        await asyncio.sleep(0.01)
+        return number
+
+    async def main():
+        before = asyncio.ensure_future(flight.do("key", compute))
+        await asyncio.sleep(0)
+        flight.forget()  # 변경 알림 → 이후 요청은 새로 조회
+        after = await flight.do("key", compute)
+        return await before, after
+
+    assert asyncio.run(main()) == (1, 2)
+
+
+def test_entry_change_forgets_registered_flights():
+    flight = get_single_flight("calculate")
+
+    async def main():
+        task = asyncio.ensure_future(flight.do("key", lambda: _value("v", delay=0.01)))
+        await asyncio.sleep(0)
+        assert flight.stats()["inflight"] == 1
+        handle_entry_change({"record": {"userId": "u1", "date": "2025-05-20"}}, InMemoryResultCache())
+        assert flight.stats()["inflight"] == 0
+        return await task
+
+    assert asyncio.run(main()) == "v"
+
+
+def test_disabled_runs_every_call():
+    flight = SingleFlight("test", enabled=False)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(*(flight.do("key", compute) for _ in range(3)))
+
+    asyncio.run(main())
+    assert len(calls) == 3
+
+
+async def _value(value, delay: float = 0):
+    await asyncio.sleep(delay)
+    return value
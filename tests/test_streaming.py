@@ -0,0 +1,54 @@
+from collections import Counter
+
+import pytest
+
+from benchmarks.synthetic import generate_entries
+from utils.calculator import (
+    MODES,
+    StreamingPayCalculator,
+    calculate_custom_pay,
+    calculate_custom_pay_stream,
+    week_key_for_date,
+)
+
+
+@pytest.fixture(scope="module")
+def rows():
+    # 야간 / 자정 넘김 근무 포함, 날짜순
+    return sorted(generate_entries(n_users=1, weeks=6, overnight_share=0.3), key=lambda r: (r["date"], r["id"]))
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_stream_matches_calculate_custom_pay(rows, mode):
+    assert calculate_custom_pay_stream(rows, mode=mode) == calculate_custom_pay(rows, mode=mode)
+
+
+def test_stream_accepts_a_generator(rows):
+    assert calculate_custom_pay_stream(row for row in rows) == calculate_custom_pay(rows)
+
+
+def test_stream_empty():
+    assert calculate_custom_pay_stream([]) == calculate_custom_pay([])
+
+
+def test_stream_keeps_one_week_of_rows(rows):
+    calc = StreamingPayCalculator()
+    sizes = []
+    for row in rows:
+        calc.add(row)
+        sizes.append(len(calc._week_rows))
+    # 한 주치 row만 들고 있음
+    assert max(sizes) == max(Counter(week_key_for_date(row["date"]) for row in rows).values())
+    assert calc.result() == calculate_custom_pay(rows)
+
+
+def test_stream_rejects_unsorted_rows(rows):
+    first_week = rows[0]
+    later = next(r for r in rows if r["date"] >= "2025-05-19")
+    with pytest.raises(ValueError):
+        calculate_custom_pay_stream([first_week, later, first_week])
+
+
+def test_stream_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        StreamingPayCalculator(mode="draft")
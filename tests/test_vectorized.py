@@ -0,0 +1,42 @@
+import pytest
+
+from benchmarks.synthetic import generate_entries
+from utils.calculator import MODES, calculate_custom_pay
+
+
+@pytest.fixture(scope="module")
+def rows():
+    # 야간 / 자정 넘김 근무 포함, 날짜순
+    return sorted(generate_entries(n_users=1, weeks=6, overnight_share=0.3), key=lambda r: (r["date"], r["id"]))
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_numpy_engine_matches_python(rows, mode):
+    pytest.importorskip("numpy")
+    assert calculate_custom_pay(rows, mode=mode, engine="numpy") == calculate_custom_pay(rows, mode=mode)
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_numpy_engine_matches_python_with_mixed_wages(rows, mode):
+    pytest.importorskip("numpy")
+    # 시급이 정수가 아닌 row가 섞이면 파이썬 엔진으로 계산 (결과는 같아야 함)
+    mixed = [dict(r, payInfo=dict(r["payInfo"], hourPrice=10030.5)) if i % 5 == 0 else r for i, r in enumerate(rows)]
+    assert calculate_custom_pay(mixed, mode=mode, engine="numpy") == calculate_custom_pay(mixed, mode=mode)
+
+
+def test_numpy_engine_empty_entries():
+    pytest.importorskip("numpy")
+    assert calculate_custom_pay([], engine="numpy") == calculate_custom_pay([])
+
+
+def test_numpy_engine_requires_numpy(rows, monkeypatch):
+    from utils import vectorized_calculator
+
+    monkeypatch.setattr(vectorized_calculator, "np", None)
+    with pytest.raises(RuntimeError):
+        calculate_custom_pay(rows, engine="numpy")
+
+
+def test_unknown_engine(rows):
+    with pytest.raises(ValueError):
+        calculate_custom_pay(rows, engine="fortran")
@@ -0,0 +1,97 @@
+import pytest
+
+from benchmarks.synthetic import generate_entries
+from utils.calculator import calculate_custom_pay
+from utils.week_store import InMemoryWeekStore, SQLiteWeekStore, complete_range, plan_range
+
+USER = "user-000000"
+
+
+@pytest.fixture(scope="module")
+def rows():
+    # 2025-05-05(월) ~ 6주, 날짜순
+    return sorted(generate_entries(n_users=1, weeks=6), key=lambda r: (r["date"], r["id"]))
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield InMemoryWeekStore()
+        return
+    store = SQLiteWeekStore(str(tmp_path / "week_totals.sqlite3"))
+    yield store
+    store.close()
+
+
+def _calculate(store, rows, start_date, end_date, mode="standard"):
+    """calculate_custom_pay_materialized와 같은 흐름 (Supabase 대신 rows에서 범위만 골라 씀)"""
+    plan = plan_range(USER, start_date, end_date, mode, store)
+    fetched = [r for first, last in plan.fetch_ranges for r in rows if first <= r["date"] <= last]
+    return plan, complete_range(plan, fetched, store)
+
+
+def _expected(rows, start_date, end_date, mode="standard"):
+    return calculate_custom_pay([r for r in rows if start_date <= r["date"] <= end_date], mode=mode)
+
+
+@pytest.mark.parametrize("mode", ["standard", "preview"])
+def test_partial_edge_weeks_match_calculate_custom_pay(store, rows, mode):
+    # 수요일 시작, 목요일 끝 → 양 끝 주는 일부만 범위 안
+    start_date, end_date = "2025-05-07", "2025-06-12"
+    plan, first = _calculate(store, rows, start_date, end_date, mode)
+    assert first == _expected(rows, start_date, end_date, mode)
+    assert not plan.cached
+
+    plan, second = _calculate(store, rows, start_date, end_date, mode)
+    assert second == first
+    # 주 전체가 범위 안인 주만 저장되고, 양 끝 일부 주는 매번 다시 계산
+    assert len(plan.cached) == len([span for span in plan.spans if span[3]])
+    assert [span[0] for span in plan.pending] == [plan.spans[0][0], plan.spans[-1][0]]
+
+
+def test_dirty_week_is_recomputed(store, rows):
+    start_date, end_date = "2025-05-05", "2025-06-15"
+    _calculate(store, rows, start_date, end_date)
+
+    changed = [dict(r) for r in rows]
+    target = next(r for r in changed if r["date"] == "2025-05-20")
+    target["endTime"] = "23:30"
+    store.mark_dirty(USER, "2025-05-20")
+    assert store.dirty_weeks() == [(USER, "2025-20", "standard")]
+
+    plan, result = _calculate(store, changed, start_date, end_date)
+    assert plan.fetch_ranges == [("2025-05-19", "2025-05-25")]
+    assert result == _expected(changed, start_date, end_date)
+    assert store.dirty_weeks() == []
+
+
+def test_write_after_concurrent_dirty_is_dropped(store, rows):
+    plan = plan_range(USER, "2025-05-05", "2025-05-11", "standard", store)
+    store.mark_dirty(USER, "2025-05-06")  # 조회 / 계산 도중 변경
+    complete_range(plan, [r for r in rows if r["date"] <= "2025-05-11"], store)
+    assert store.get(USER, "2025-19", "standard") is None
+
+
+def test_sqlite_store_survives_reopen(tmp_path, rows):
+    path = str(tmp_path / "week_totals.sqlite3")
+    store = SQLiteWeekStore(path)
+    _, expected = _calculate(store, rows, "2025-05-05", "2025-06-15")
+    store.close()
+
+    reopened = SQLiteWeekStore(path)
+    plan, result = _calculate(reopened, rows, "2025-05-05", "2025-06-15")
+    assert result == expected
+    assert plan.fetch_ranges == []
+    reopened.close()
+
+    # 계산 규칙이 바뀌면 예전 합계는 쓰지 않음
+    other_rules = SQLiteWeekStore(path, rules="other")
+    plan, _ = _calculate(other_rules, rows, "2025-05-05", "2025-06-15")
+    assert not plan.cached
+    other_rules.close()
+
+
+def test_expired_totals_are_recomputed(rows):
+    store = InMemoryWeekStore(ttl=0)
+    _calculate(store, rows, "2025-05-05", "2025-05-11")
+    assert store.get(USER, "2025-19", "standard") is None
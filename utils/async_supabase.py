@@ -0,0 +1,225 @@
+import asyncio
+import os
+
+import httpx
+from postgrest import AsyncPostgrestClient
+
+from utils.calculator import (
+    DEFAULT_PAGE_SIZE,
+    ENTRY_COLUMNS,
+    USER_CHUNK_SIZE,
+    build_entry_page_query,
+    chunk_user_ids,
+    intern_rows,
+    plain_rows,
+)
+from utils.metrics import add_count, metrics_enabled, span
+from utils.resilience import get_fetcher
+from utils.single_flight import get_single_flight
+from utils.supabase_client import get_supabase_settings
+
+# 비동기 Supabase(PostgREST) 데이터 레이어
+
+"""코드 요약:
+동기 postgrest 클라이언트는 요청 하나가 끝날 때까지 스레드풀 스레드 하나를 붙잡고 있어서,
+부하가 걸리면 CPU보다 스레드풀(기본 40개)이 먼저 바닥남
+→ async postgrest 클라이언트 + 앱 전체에서 공유하는 httpx connection pool을 쓰면
+  워커 하나가 수백 개의 fetch를 동시에 기다릴 수 있음
+
+main.py의 lifespan에서 open_async_client() / close_async_client()로 열고 닫음
+lifespan 밖(스크립트, TestClient 등)에서는 get_async_client()가 필요할 때 만들어 줌
+
+동시에 pool에 들어가는 요청 수는 MAX_CONNECTIONS개로 제한함 (fetch_slot, hedged 요청도 슬롯 하나씩 사용)
+→ httpcore pool은 대기 중인 요청 × 연결 수만큼 매번 훑기 때문에,
+  수백 개를 pool에 바로 밀어 넣으면 CPU를 대기열 관리에 다 써버림"""
+
+# connection pool 설정 (환경변수로 조정 가능)
+# Supabase는 HTTPS + HTTP/2라서 연결 하나에 여러 요청이 다중화됨 → 연결 수는 작게 유지
+MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("SUPABASE_MAX_KEEPALIVE_CONNECTIONS", str(MAX_CONNECTIONS)))
+REQUEST_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "30"))
+
+_client = None
+_client_loop = None
+_fetch_slots = None
+
+
+class PooledAsyncPostgrestClient(AsyncPostgrestClient):
+    """connection pool 한도(httpx.Limits)를 지정할 수 있는 AsyncPostgrestClient"""
+
+    def __init__(self, base_url: str, *, limits: httpx.Limits, **kwargs):
+        self._limits = limits
+        super().__init__(base_url, **kwargs)
+
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None) -> httpx.AsyncClient:
+        # 측정이 켜져 있으면 받은 응답 본문 바이트 수를 요청 카운터에 더함
+        event_hooks = {"response": [_count_response_bytes]} if metrics_enabled() else None
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            proxy=proxy,
+            follow_redirects=True,
+            http2=True,
+            limits=self._limits,
+            event_hooks=event_hooks,
+        )
+
+
+async def _count_response_bytes(response: httpx.Response):
+    await response.aread()  # postgrest가 어차피 전부 읽으므로 미리 읽어도 같음
+    add_count("bytes", len(response.content))
+
+
+def _create_client() -> PooledAsyncPostgrestClient:
+    url, key = get_supabase_settings()
+    return PooledAsyncPostgrestClient(
+        f"{url}/rest/v1",
+        headers={"apikey": key, "Authorization": f"Bearer {key}"},
+        timeout=REQUEST_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        ),
+    )
+
+
+def _bind_to_loop(loop):
+    global _client, _client_loop, _fetch_slots
+    _client = _create_client()
+    _client_loop = loop
+    _fetch_slots = asyncio.Semaphore(MAX_CONNECTIONS)
+
+
+async def open_async_client() -> PooledAsyncPostgrestClient:
+    """앱 시작(lifespan) 때 공유 클라이언트 생성"""
+    if _client is None:
+        _bind_to_loop(asyncio.get_running_loop())
+    return _client
+
+
+async def close_async_client():
+    """앱 종료(lifespan) 때 connection pool 정리"""
+    global _client, _client_loop, _fetch_slots
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+    _fetch_slots = None
+
+
+def get_async_client() -> PooledAsyncPostgrestClient:
+    """
+    공유 비동기 클라이언트 반환.
+    pool의 연결은 이벤트 루프에 묶여 있으므로, 다른 루프에서 호출되면 새로 만듦
+    (lifespan 없이 요청마다 루프가 바뀌는 TestClient 등)
+    """
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _bind_to_loop(loop)
+    return _client
+
+
+def fetch_slot() -> asyncio.Semaphore:
+    """pool에 동시에 들어가는 요청 수를 MAX_CONNECTIONS개로 제한하는 semaphore"""
+    get_async_client()
+    return _fetch_slots
+
+
+async def get_entries_for_date_range_async(start_date: str, end_date: str) -> list[dict]:
+    """
+    calculator.get_entries_for_date_range의 비동기 버전
+    Supabase에서 특정 날짜 범위(start_date ~ end_date)의 i_entry 데이터를 가져옴
+    payInfo는 일반 dict로 돌려줌 (그대로 JSON 응답 / json.dumps 가능)
+    """
+    return plain_rows([row async for row in iter_entries_for_date_range_async(start_date, end_date)])
+
+
+async def _fetch_entry_page(start_date, end_date, page_size, after, user_id, columns, user_ids=None) -> list[dict]:
+    # 같은 조건의 페이지를 동시에 여러 요청이 가져가려 하면 한 번만 조회해서 나눠 줌 (utils/single_flight.py)
+    key = (start_date, end_date, page_size, after, user_id, tuple(columns), tuple(user_ids) if user_ids else None)
+    return await get_single_flight("fetch").do(
+        key, lambda: _query_entry_page(start_date, end_date, page_size, after, user_id, columns, user_ids)
+    )
+
+
+async def _query_entry_page(start_date, end_date, page_size, after, user_id, columns, user_ids) -> list[dict]:
+    async def execute():
+        async with fetch_slot():
+            query = build_entry_page_query(
+                get_async_client().table("i_entry"), start_date, end_date, page_size,
+                after=after, user_id=user_id, columns=columns, user_ids=user_ids,
+            )
+            with span("fetch"):
+                return await query.execute()
+
+    # 시간 제한 / 재시도 / hedged 요청 / circuit breaker (utils/resilience.py), 실패하면 FetchError
+    response = await get_fetcher().call(execute)
+    data = response.data or []
+    add_count("rows", len(data))
+    # 같은 payInfo는 공유 프로필 하나로 (row마다 디코딩 / dict 보관하지 않음)
+    return intern_rows(data)
+
+
+async def fetch_entry_version_async(start_date: str, end_date: str, user_id: str = None,
+                                    version_column: str = "updated_at") -> tuple:
+    """
+    범위 안 i_entry의 (row 수, version_column 최댓값) → /calculate ETag 계산용 (utils/etag.py)
+    버전 컬럼만, 최신 row 하나만 받고 row 수는 Prefer: count=exact의 Content-Range로 받음
+    버전이 NULL인 row는 세지 않음 → version_column은 NOT NULL DEFAULT now() + 갱신 트리거여야 함
+    """
+    async def execute():
+        async with fetch_slot():
+            query = (
+                get_async_client().table("i_entry")
+                .select(version_column, count="exact")
+                .gte("date", start_date)
+                .lte("date", end_date)
+            )
+            if user_id is not None:
+                query = query.eq("userId", user_id)
+            # DESC 정렬은 NULL이 먼저 오므로(nullsfirst=False는 버전에 따라 아무것도 안 붙임) NULL은 조건으로 뺌
+            query = query.not_.is_(version_column, "null").order(version_column, desc=True).limit(1)
+            with span("fetch"):
+                return await query.execute()
+
+    response = await get_fetcher().call(execute)
+    data = response.data or []
+    return response.count or 0, data[0].get(version_column) if data else None
+
+
+async def iter_entries_for_date_range_async(start_date: str, end_date: str, page_size: int = DEFAULT_PAGE_SIZE,
+                                            user_id: str = None, columns=ENTRY_COLUMNS, user_ids: list = None):
+    """
+    calculator.iter_entries_for_date_range의 비동기 버전 (async generator)
+    현재 페이지를 내보내는 동안 다음 페이지 요청을 미리 보내 둠
+    → 받는 쪽 계산과 네트워크 전송이 겹쳐서 진행됨
+    """
+    page = await _fetch_entry_page(start_date, end_date, page_size, None, user_id, columns, user_ids)
+    while page:
+        next_page = None
+        if len(page) >= page_size:
+            after = (page[-1]["date"], page[-1]["id"])
+            next_page = asyncio.ensure_future(
+                _fetch_entry_page(start_date, end_date, page_size, after, user_id, columns, user_ids)
+            )
+        try:
+            for row in page:
+                yield row
+        except BaseException:
+            if next_page is not None:
+                next_page.cancel()
+            raise
+
+        if next_page is None:
+            return
+        page = await next_page
+
+
+async def iter_entries_for_users_async(user_ids, start_date: str, end_date: str,
+                                       page_size: int = DEFAULT_PAGE_SIZE, chunk_size: int = USER_CHUNK_SIZE):
+    """calculator.iter_entries_for_users의 비동기 버전 (userId in 필터, chunk_size명씩)"""
+    for chunk in chunk_user_ids(user_ids, chunk_size):
+        async for row in iter_entries_for_date_range_async(start_date, end_date, page_size, user_ids=chunk):
+            yield row
@@ -1,26 +1,28 @@
-
-
-from supabase import create_client
+import json
 import os
-from dotenv import load_dotenv
+import time
+from collections.abc import Mapping
+from types import MappingProxyType
 
-# .env 파일을 불러와서 환경변수 등록
-load_dotenv()
+from utils import metrics
+from utils.calendar_dim import get_calendar
+from utils.metrics import add_count, span
+from utils.supabase_client import get_supabase_client
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-
-# Supabase 클라이언트 생성
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Supabase 클라이언트는 utils/supabase_client.py 에서 처음 쿼리할 때 한 번만 생성해서 공유함.
+# → 이 모듈을 import 하는 것만으로는 네트워크 호출이나 print가 일어나지 않음
+#   (예시 실행은 맨 아래 `python -m utils.calculator` 블록 참고)
 
 
 #step1. 근무시간 계산 
 
 """코드 요약:
 → 문자열로 주어진 startTime, endTime을 받아 근무 시간을 시간단위(float)로 계산해 주는 함수
-자정 넘긴 야간근무도 고려해서 end < start일 경우 하루를 더해 계산"""
+자정 넘긴 야간근무도 고려해서 end < start일 경우 하루를 더해 계산
+→ "HH:MM" → 분 변환은 parse_time_minutes(1440칸 변환표), 반올림은 정수 연산 centihours (step2-2 참고)"""
 
-from datetime import datetime, timedelta
+from datetime import datetime
+from fractions import Fraction
 
 def calculate_work_hours(start: str, end: str) -> float:
     """
@@ -28,17 +30,15 @@ def calculate_work_hours(start: str, end: str) -> float:
     """
     if not start or not end:
         return 0.0
-    
-    fmt = "%H:%M"
-    start_dt = datetime.strptime(start, fmt)
-    end_dt = datetime.strptime(end, fmt)
+
+    start_minutes = parse_time_minutes(start)
+    end_minutes = parse_time_minutes(end)
 
     # 자정 넘긴 경우 처리
-    if end_dt < start_dt:
-        end_dt += timedelta(days=1)
+    if end_minutes < start_minutes:
+        end_minutes += 1440
 
-    diff = end_dt - start_dt
-    return round(diff.total_seconds() / 3600, 2)
+    return centihours(end_minutes - start_minutes) / 100
 
 
 
@@ -46,41 +46,25 @@ def calculate_work_hours(start: str, end: str) -> float:
 
 """코드 요약:
 → 한 개의 근무 row(dict)를 입력 받아, startTime, endTime, payInfo.hourPrice를 기반으로 기본 시급 × 근무 시간을 계산해서 기본급(int)을 반환하는 함수
-payInfo가 문자열(json)일 수도 있어서 파싱 처리도 포함.
+payInfo 파싱(문자열 json 포함)은 ShiftRecord(step2-1)를 만들 때 한 번만 함.
 기본 시급은 없을 경우 DEFAULT_MINIMUM_WAGE = 10030으로 대체."""
 
 DEFAULT_MINIMUM_WAGE = 10030  # 2025년 기준
 
-import json
-
-def calculate_base_pay_from_row(row: dict) -> int:
-    start = row.get("startTime")
-    end = row.get("endTime")
-
-    pay_info_raw = row.get("payInfo", {})
-
-    # payInfo가 문자열일 경우 dict로 변환
-    if isinstance(pay_info_raw, str):
-        try:
-            pay_info = json.loads(pay_info_raw)
-        except json.JSONDecodeError:
-            pay_info = {}
-    # 원래 dict인 경우 그대로 사용        
-    else:
-        pay_info = pay_info_raw
-
-    wage = pay_info.get("hourPrice", DEFAULT_MINIMUM_WAGE)
-    worked_hours = calculate_work_hours(start, end)
 
-    return int(worked_hours * wage)
+def calculate_base_pay_from_row(row) -> int:
+    record = to_shift_record(row)
+    # 근무시간(소수 둘째 자리) × 시급 → 1/100시간 단위 정수로 계산
+    return pay_amount(record.centihours, record.wage, 100)
 
 
 
 # Supabase에서 가져온 row의 payInfo 필드를 안전하게 dict로 변환.
-import json
 
 def parse_payinfo(row: dict) -> dict: 
     pay_info_raw = row.get("payInfo", {})
+    if isinstance(pay_info_raw, PayProfile):
+        return dict(pay_info_raw.info)  # fetch 단계에서 공유 프로필로 바뀐 row
     if isinstance(pay_info_raw, str):
         try:
             return json.loads(pay_info_raw)
@@ -90,6 +74,295 @@ def parse_payinfo(row: dict) -> dict:
 
 
 
+#step2-1. ShiftRecord (row 하나를 한 번만 파싱해 둔 근무 기록)
+
+"""코드 요약:
+예전에는 row 하나를 계산할 때 parse_payinfo(JSON 디코딩)가 4번, strptime이 여러 번 반복됐음
+→ fetch 직후 row마다 ShiftRecord를 한 번만 만들어 두고, step3~9 함수들이 전부 이걸 재사용
+- start / end : 자정 기준 분(int). 자정을 넘기면 end에 1440을 더해 end >= start 유지
+- hours : calculate_work_hours와 같은 값 (소수 둘째 자리 반올림 float), centihours : 같은 값 × 100 (int)
+- wage : payInfo.hourPrice (없으면 DEFAULT_MINIMUM_WAGE)
+- flags : night / overtime / wHoliday / Holiday 여부를 비트로 묶음
+- week_key : group_entries_by_week에서 쓰는 "%Y-%W" 주차 키 (달력 테이블 조회, utils/calendar_dim.py)
+PAY_AUTO_HOLIDAY=1이면 payInfo.Holiday가 없어도 달력상 공휴일인 날의 근무에 Holiday 플래그를 붙임
+step 함수들은 dict row와 ShiftRecord 둘 다 받음 (dict면 그 자리에서 변환)"""
+
+FLAG_NIGHT = 1
+FLAG_OVERTIME = 2
+FLAG_WHOLIDAY = 4
+FLAG_HOLIDAY = 8
+FLAG_WAGE_SET = 16  # payInfo에 hourPrice가 실제로 들어있었는지 (주휴수당 시급 결정용)
+
+AUTO_HOLIDAY_FLAG = os.getenv("PAY_AUTO_HOLIDAY") == "1"
+
+_PAYINFO_FLAGS = (
+    ("night", FLAG_NIGHT),
+    ("overtime", FLAG_OVERTIME),
+    ("wHoliday", FLAG_WHOLIDAY),
+    ("Holiday", FLAG_HOLIDAY),
+)
+
+
+# "00:00" ~ "23:59" → 자정 기준 분 (1440개, import 때 한 번 만듦)
+_MINUTES_BY_TIME = {f"{h:02d}:{m:02d}": h * 60 + m for h in range(24) for m in range(60)}
+
+
+def parse_time_minutes(value: str) -> int:
+    """ "HH:MM" 문자열 → 자정 기준 분 """
+    minutes = _MINUTES_BY_TIME.get(value)
+    if minutes is None:
+        # 표에 없는 형식("9:05" 등)은 예전처럼 strptime으로 검증 (잘못된 값이면 ValueError)
+        t = datetime.strptime(value, "%H:%M")
+        minutes = t.hour * 60 + t.minute
+    return minutes
+
+
+def week_key_for_date(date_str: str) -> str:
+    """ "YYYY-MM-DD" → "YYYY-WW" (group_entries_by_week와 같은 주차 키) """
+    week_key = get_calendar().week_key(date_str)
+    if week_key is None:
+        # 달력 범위 밖이거나 다른 형식 → 예전처럼 파싱 (잘못된 값이면 ValueError)
+        week_key = datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y-%W")
+    return week_key
+
+
+class ShiftRecord:
+    __slots__ = ("id", "user_id", "date", "week_key", "start", "end", "hours", "wage", "flags", "profile_id")
+
+    def __init__(self, id, user_id, date, week_key, start, end, hours, wage, flags, profile_id=None):
+        self.id = id
+        self.user_id = user_id
+        self.date = date
+        self.week_key = week_key
+        self.start = start
+        self.end = end
+        self.hours = hours
+        self.wage = wage
+        self.flags = flags
+        self.profile_id = profile_id  # 공유 payInfo 프로필 번호 (step2-3)
+
+    @classmethod
+    def from_row(cls, row: dict) -> "ShiftRecord":
+        # 같은 payInfo는 한 번만 디코딩해서 시급/플래그까지 계산해 둔 프로필을 공유
+        profile = intern_payinfo(row.get("payInfo"))
+        flags = profile.flags
+        wage = profile.wage
+
+        start_raw = row.get("startTime")
+        end_raw = row.get("endTime")
+        if start_raw and end_raw:
+            start = parse_time_minutes(start_raw)
+            end = parse_time_minutes(end_raw)
+            # 자정 넘긴 경우 처리
+            if end < start:
+                end += 1440
+        else:
+            start = end = 0
+
+        date = row.get("date")
+        if AUTO_HOLIDAY_FLAG and date and get_calendar().is_holiday(date):
+            flags |= FLAG_HOLIDAY
+        return cls(
+            id=row.get("id"),
+            user_id=row.get("userId"),
+            date=date,
+            week_key=week_key_for_date(date) if date else None,
+            start=start,
+            end=end,
+            hours=centihours(end - start) / 100,
+            wage=wage,
+            flags=flags,
+            profile_id=profile.id,
+        )
+
+    @property
+    def centihours(self) -> int:
+        return centihours(self.end - self.start)
+
+    def __repr__(self):
+        return (
+            f"ShiftRecord(date={self.date!r}, start={self.start}, end={self.end}, "
+            f"wage={self.wage!r}, flags={self.flags})"
+        )
+
+
+def to_shift_record(row) -> ShiftRecord:
+    # 이미 ShiftRecord면 그대로, dict row면 한 번 파싱
+    if isinstance(row, ShiftRecord):
+        return row
+    return ShiftRecord.from_row(row)
+
+
+def compile_entries(entries) -> list:
+    """fetch한 i_entry row 리스트를 ShiftRecord 리스트로 한 번에 변환"""
+    return [to_shift_record(e) for e in entries]
+
+
+
+#step2-2. 정수 근무시간 / 금액 계산
+
+"""코드 요약:
+근무시간을 float(소수 둘째 자리)로 들고 시급·0.5·세율을 곱하면 0.29 × 100 = 28.999...처럼
+마지막 자리 오차 때문에 버림 결과가 1원씩 틀어질 수 있었음
+→ 근무시간은 1/100시간 단위 정수(centihours), 야간은 분 단위 정수로 계산
+→ 금액은 (정수 × 시급) // 분모 로 한 번만 버림 (시급이 소수면 Fraction으로 정확히 계산)
+  - 기본급: centihours × 시급 / 100      - 야간: 분 × 시급 / 120 (시간 × 0.5)
+  - 연장/공휴일: centihours × 시급 / 200  - 세금: 급여 × 9 / 100, 급여 × 33 / 1000
+→ 주 15시간 기준도 centihours 합계(1500)로 비교"""
+
+FULL_TIME_CENTIHOURS = 15 * 100  # 주 15시간 (주휴수당 / 세율 기준)
+FULL_TIME_TAX = (9, 100)  # 4대보험 9%
+PART_TIME_TAX = (33, 1000)  # 삼쩜삼 3.3%
+
+
+def centihours(minutes: int) -> int:
+    """분 → round(분 / 60, 2) × 100 (분 / 60의 소수 셋째 자리는 0, 3, 6만 나와서 반올림이 애매한 경우 없음)"""
+    return (minutes * 10 + 3) // 6
+
+
+def pay_amount(units: int, wage, denominator: int) -> int:
+    """int(units × wage / denominator)를 float 없이 정확하게 (소수점 버림)"""
+    if isinstance(wage, int):
+        amount = units * wage
+        return amount // denominator if amount >= 0 else -(-amount // denominator)
+    return int(Fraction(str(wage)) * units / denominator)
+
+
+def calculate_tax_amount(total_pay: int, full_time: bool) -> int:
+    """주 15시간 이상이면 9%, 미만이면 3.3% (소수점 버림)"""
+    numerator, denominator = FULL_TIME_TAX if full_time else PART_TIME_TAX
+    return pay_amount(total_pay, numerator, denominator)
+
+
+
+#step2-3. payInfo 프로필 공유 (interning)
+
+"""코드 요약:
+i_entry row마다 payInfo JSON(hourPrice, wHoliday, Holiday, overtime, night, duty)이 따로 붙어 오지만
+한 사용자의 payInfo는 보통 몇 종류뿐 → 같은 내용을 row마다 json.loads해서 똑같은 dict 수천 개를 들고 있었음
+→ 원본(문자열이면 그 문자열, dict면 정렬한 (키, 값) 튜플)을 키로 PayProfile을 한 번만 만들고 공유
+  - info : 디코딩한 payInfo (읽기 전용 MappingProxyType)
+  - wage / flags : 시급과 FLAG_* 비트를 미리 계산 → ShiftRecord.from_row는 프로필 값만 복사
+  - id : 프로필 번호 (ShiftRecord.profile_id, get_profile(id)로 다시 찾음)
+fetch 단계(iter_entries_for_date_range / async 버전)에서 intern_rows로 payInfo가 프로필인 row 사본을 만들어 씀
+  - 받은 row(dict)는 건드리지 않음 (사본은 payInfo만 바꾼 얕은 복사)
+  - 리스트로 돌려주는 get_entries_for_date_range(_async)는 plain_rows로 payInfo를 다시 dict로 → JSON 직렬화 가능
+프로필이 PROFILE_TABLE_SIZE개를 넘으면 표를 비우고 다시 시작 (이미 만든 프로필 객체는 그대로 유효)"""
+
+PROFILE_TABLE_SIZE = int(os.getenv("PAY_PROFILE_TABLE_SIZE", "10000"))
+
+
+class PayProfile(Mapping):
+    """읽기 전용 payInfo (dict처럼 profile["hourPrice"], profile.get(...)으로도 읽을 수 있음)"""
+
+    __slots__ = ("id", "info", "wage", "flags")
+
+    def __init__(self, id, info: dict):
+        self.id = id
+        self.info = MappingProxyType(info)
+
+        flags = 0
+        for key, bit in _PAYINFO_FLAGS:
+            if info.get(key):
+                flags |= bit
+        if "hourPrice" in info:
+            flags |= FLAG_WAGE_SET
+        self.wage = info.get("hourPrice", DEFAULT_MINIMUM_WAGE)
+        self.flags = flags  # 마지막 속성 → 이후로는 수정 불가
+
+    def __setattr__(self, name, value):
+        # 여러 row가 공유하므로 만든 뒤에는 읽기 전용
+        if hasattr(self, "flags"):
+            raise AttributeError("PayProfile is read-only")
+        object.__setattr__(self, name, value)
+
+    def __getitem__(self, key):
+        return self.info[key]
+
+    def __iter__(self):
+        return iter(self.info)
+
+    def __len__(self):
+        return len(self.info)
+
+    def __repr__(self):
+        return f"PayProfile(id={self.id}, wage={self.wage!r}, flags={self.flags})"
+
+
+_profiles_by_key = {}
+_profiles_by_id = {}
+_profile_stats = {"lookups": 0, "decodes": 0}
+_next_profile_id = 0
+
+
+def _profile_key(raw):
+    if isinstance(raw, str):
+        return raw
+    try:
+        return tuple(sorted(raw.items()))
+    except (AttributeError, TypeError):  # 값에 list/dict 등 hash 안 되는 게 있으면 직렬화해서 키로
+        return json.dumps(raw, sort_keys=True, default=str)
+
+
+def intern_payinfo(raw) -> PayProfile:
+    """payInfo 원본(JSON 문자열 / dict / None / 이미 PayProfile) → 공유 PayProfile"""
+    global _next_profile_id
+    if isinstance(raw, PayProfile):
+        return raw
+    if raw is None:
+        raw = {}
+
+    _profile_stats["lookups"] += 1
+    key = _profile_key(raw)
+    profile = _profiles_by_key.get(key)
+    if profile is not None:
+        return profile
+
+    _profile_stats["decodes"] += 1
+    if isinstance(raw, str):
+        try:
+            info = json.loads(raw)
+        except json.JSONDecodeError:
+            info = {}
+        if not isinstance(info, dict):
+            info = {}
+    else:
+        info = dict(raw)
+
+    if len(_profiles_by_key) >= PROFILE_TABLE_SIZE:
+        _profiles_by_key.clear()
+        _profiles_by_id.clear()
+    profile = PayProfile(_next_profile_id, info)
+    _next_profile_id += 1
+    _profiles_by_key[key] = profile
+    _profiles_by_id[profile.id] = profile
+    return profile
+
+
+def get_profile(profile_id: int):
+    return _profiles_by_id.get(profile_id)
+
+
+def intern_rows(rows: list) -> list:
+    """fetch한 row들 → payInfo만 공유 PayProfile로 바꾼 얕은 사본 리스트 (원래 row는 그대로)"""
+    with span("decode"):
+        return [{**row, "payInfo": intern_payinfo(row.get("payInfo"))} for row in rows]
+
+
+def plain_rows(rows) -> list:
+    """PayProfile로 바뀐 payInfo를 일반 dict로 되돌린 row 리스트 (JSON으로 내보낼 때)"""
+    return [
+        {**row, "payInfo": dict(row["payInfo"].info)} if isinstance(row.get("payInfo"), PayProfile) else row
+        for row in rows
+    ]
+
+
+def profile_stats() -> dict:
+    """지금까지 intern_payinfo 호출 수 / 실제 디코딩 수 / 보관 중인 프로필 수"""
+    return dict(_profile_stats, profiles=len(_profiles_by_key))
+
+
+
 #step3. 야간수당 계산
 
 """코드 요약:
@@ -99,38 +372,22 @@ def parse_payinfo(row: dict) -> dict:
 단 payInfo.night가 True일 때만 계산
 """
 
-def calculate_night_pay(row: dict) -> int:
-    pay_info = parse_payinfo(row)
-    if not pay_info.get("night"):
-        return 0
-
-    start = row.get("startTime")
-    end = row.get("endTime")
-    wage = pay_info.get("hourPrice", DEFAULT_MINIMUM_WAGE)
+# 야간시간 범위 (22:00 ~ 06:00 다음날), 자정 기준 분
+NIGHT_START_MINUTES = 22 * 60
+NIGHT_END_MINUTES = NIGHT_START_MINUTES + 8 * 60
 
-    if not start or not end:
+def calculate_night_pay(row) -> int:
+    record = to_shift_record(row)
+    if not record.flags & FLAG_NIGHT:
         return 0
 
-    fmt = "%H:%M"
-    start_dt = datetime.strptime(start, fmt)
-    end_dt = datetime.strptime(end, fmt)
-    if end_dt < start_dt:
-        end_dt += timedelta(days=1)
-
-    # 야간시간 범위 (22:00 ~ 06:00 다음날)
-    night_start = datetime.combine(start_dt.date(), datetime.strptime("22:00", fmt).time())
-    night_end = night_start + timedelta(hours=8)
-
     # 근무시간과 야간시간 겹치는 구간 계산
-    overlap_start = max(start_dt, night_start)
-    overlap_end = min(end_dt, night_end)
-
-    if overlap_start >= overlap_end:
-        night_hours = 0
-    else:
-        night_hours = (overlap_end - overlap_start).seconds / 3600
+    overlap = min(record.end, NIGHT_END_MINUTES) - max(record.start, NIGHT_START_MINUTES)
+    if overlap <= 0:
+        return 0
 
-    return int(night_hours * wage * 0.5)
+    # 야간 분 / 60 × 시급 × 0.5
+    return pay_amount(overlap, record.wage, 120)
 
 
 
@@ -138,26 +395,22 @@ def calculate_night_pay(row: dict) -> int:
 #step4. 연장근무수당 계산
 
 """코드 요약:
-parse_payinfo(row)로 안전하게 시급 정보 로딩
+to_shift_record(row)로 이미 파싱된 시급/플래그 사용
 payInfo.overtime가 True일 때만 연장수당 계산
 
 하루 근무시간이 8시간을 초과하면, 초과 시간 × 시급 × 0.5로 연장근무 수당 계산. 나중에 더해줄거임
 → 근무시간이 8시간 이하면 0원 반환"""
 
-def calculate_overtime_pay(row: dict) -> int:
-    pay_info = parse_payinfo(row)  
+def calculate_overtime_pay(row) -> int:
+    record = to_shift_record(row)
 
-    if not pay_info.get("overtime"):
+    if not record.flags & FLAG_OVERTIME:
         return 0
 
-    start = row.get("startTime")
-    end = row.get("endTime")
-    wage = pay_info.get("hourPrice", DEFAULT_MINIMUM_WAGE)
-
-    total_hours = calculate_work_hours(start, end)
-    overtime_hours = max(0, total_hours - 8)
+    # 8시간 초과분 × 시급 × 0.5
+    overtime_centihours = max(0, record.centihours - 800)
 
-    return int(overtime_hours * wage * 0.5)
+    return pay_amount(overtime_centihours, record.wage, 200)
 
 
 
@@ -170,8 +423,8 @@ def calculate_overtime_pay(row: dict) -> int:
 각 row마다 startTime, endTime 기준으로 시간 계산 후 모두 더함
 주휴수당 판단이나 총 근무 통계 등에 활용 가능"""
 
-def get_weekly_hours(rows: list[dict]) -> float:
-    return sum(calculate_work_hours(r.get("startTime"), r.get("endTime")) for r in rows)
+def get_weekly_hours(rows: list) -> float:
+    return sum(to_shift_record(r).centihours for r in rows) / 100
 
 
 
@@ -189,28 +442,13 @@ payInfo.wHoliday가 True인 경우에만 적용
 지급액: 시급 × 8시간 = 하루치 시급. 나중에 더해줄거임.
 (주 15시간 이상 근무자에게 유급휴일 1일 부여하는 기준 적용)"""
 
-import json
-
-def calculate_weekly_allowance(rows: list[dict]) -> int:
+def calculate_weekly_allowance(rows) -> int:
     if not rows:
         return 0
 
-    total_hours = 0
-    wage = DEFAULT_MINIMUM_WAGE
-    apply = False
-
-    for row in rows:
-        pay_info = parse_payinfo(row)
-
-        if pay_info.get("wHoliday"):
-            apply = True
-            wage = pay_info.get("hourPrice", wage)
-
-        total_hours = get_weekly_hours(rows)
-
-    if apply and total_hours >= 15:
-        return int(wage * 8)  
-    return 0
+    # 총 근무시간 / 주휴 시급은 summarize_week에서 한 번에 계산 (step12-1 참고)
+    week = rows if isinstance(rows, WeekSummary) else summarize_week(rows)
+    return week.weekly_allowance
 
 
 
@@ -224,23 +462,18 @@ payInfo["Holiday"] == True일 때만 계산
 기본급에는 공휴일 근무 시간도 포함되므로, 여기선 추가분(0.5배)만 더하는 방식
 """
 
-def calculate_holiday_pay(row: dict) -> int:
+def calculate_holiday_pay(row) -> int:
     """
     공휴일 수당 계산
     - 공휴일에 일한 시간 × 시급 × 0.5
     - payInfo["Holiday"]가 True인 경우에만 계산
     """
-    pay_info = parse_payinfo(row)  
+    record = to_shift_record(row)
 
-    if not pay_info.get("Holiday"):
+    if not record.flags & FLAG_HOLIDAY:
         return 0
 
-    start = row.get("startTime")
-    end = row.get("endTime")
-    wage = pay_info.get("hourPrice", DEFAULT_MINIMUM_WAGE)
-
-    worked_hours = calculate_work_hours(start, end)
-    return int(worked_hours * wage * 0.5)
+    return pay_amount(record.centihours, record.wage, 200)
 
 
 
@@ -256,16 +489,16 @@ def calculate_holiday_pay(row: dict) -> int:
 주 15시간 미만 -> 삼쩜삼 : 3.3% 공제 """
 
 
-def calculate_tax_deduction(total_pay: int, weekly_rows: list[dict]) -> int:
-    
-    total_hours = get_weekly_hours(weekly_rows)
+def calculate_tax_deduction(total_pay: int, weekly_rows) -> int:
     
-    if total_hours >= 15:
-        # 4대보험 공제: 9%
-        return int(total_pay * 0.09)
-    else:
-        # 삼쩜삼 공제: 3.3%
-        return int(total_pay * 0.033)
+    # WeekSummary를 넘기면 주마다 한 번 정해 둔 세율을 그대로 씀 (row마다 다시 합산하지 않음)
+    if isinstance(weekly_rows, WeekSummary):
+        return calculate_tax_amount(total_pay, weekly_rows.full_time)
+
+    total_centihours = sum(to_shift_record(r).centihours for r in weekly_rows)
+
+    # 15시간 이상 → 4대보험 공제: 9%, 미만 → 삼쩜삼 공제: 3.3%
+    return calculate_tax_amount(total_pay, total_centihours >= FULL_TIME_CENTIHOURS)
     
 
 
@@ -273,7 +506,7 @@ def calculate_tax_deduction(total_pay: int, weekly_rows: list[dict]) -> int:
 #step9. 총 급여 계산
 
 """코드 요약:
-개별 근무 row 하나와 해당 주 전체 근무 리스트를 받아서
+개별 근무 row 하나와 해당 주 전체 근무 리스트(또는 summarize_week 결과)를 받아서
 기본급, 야간수당, 연장근무수당, 공휴일수당 → 전부 합산 (gross)
 
 주휴수당은 하루가 아닌 '주' 기준이기 때문에, 여기서는 제외함
@@ -283,7 +516,8 @@ calculate_tax_deduction()으로 세금(tax) 계산
 
 모든 항목을 dict 형태로 반환"""
 
-def calculate_final_pay(row: dict, weekly_rows: list[dict]) -> dict:
+def calculate_final_pay(row, weekly_rows) -> dict:
+    row = to_shift_record(row)
     base = calculate_base_pay_from_row(row)
     night = calculate_night_pay(row)
     overtime = calculate_overtime_pay(row)
@@ -312,25 +546,7 @@ def calculate_final_pay(row: dict, weekly_rows: list[dict]) -> dict:
 공휴일 수당은 직접 True로 설정하지 않으면 자동으로 적용되지 않음
 """
 
-row = {
-    "startTime": "20:00",
-    "endTime": "04:00",
-    "payInfo": {
-        "hourPrice": 11000,
-        "night": True,
-        "overtime": True,
-        "wHoliday": True
-    }
-}
-
-weekly_rows = [row] * 3  # 주 3일 (총 24시간 근무) 근무로 가정
-
-result = calculate_final_pay(row, weekly_rows)
-print(result)
-
-
-
-
+# → 예시 실행 코드는 파일 맨 아래 __main__ 블록으로 이동
 
 
 
@@ -338,11 +554,9 @@ print(result)
 #step11. import
 
 """코드 요약:
-defaultdict → 항목별 자동 초기화된 dict 만들 때 유용 (ex. 사용자별 급여 누적)
-calendar → 해당 월의 날짜 수 구할 때 필요 (예: 말일 계산, 주차 계산 등)"""
+defaultdict → 항목별 자동 초기화된 dict 만들 때 유용 (ex. 사용자별 급여 누적)"""
 
 from collections import defaultdict
-import calendar
 
 
 #step12. 유틸 함수
@@ -352,19 +566,85 @@ import calendar
 → 각 entry의 "date" 값을 기준으로 YYYY-WW 형식(연도-주차)으로 그룹화
 → 결과는 딕셔너리 형태"""
 
-def group_entries_by_week(entries: list[dict]) -> dict:
+def group_entries_by_week(entries: list) -> dict:
     
     weekly = defaultdict(list)
     for entry in entries:
-        date_str = entry.get("date")
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-        year_week = date_obj.strftime("%Y-%W")  # ISO 주차: 연도-주차
+        if isinstance(entry, ShiftRecord):
+            year_week = entry.week_key  # ShiftRecord는 주차 키를 이미 계산해 둠
+        else:
+            year_week = week_key_for_date(entry.get("date"))  # ISO 주차: 연도-주차
         weekly[year_week].append(entry)
     return dict(weekly)
 
 
 
 
+#step12-1. 주 단위 집계 (WeekSummary)
+
+"""코드 요약:
+한 주의 rows를 한 번만 훑어서 주간 총 근무시간, 주휴수당 적용 여부/시급, 세율을 계산해 둠
+→ 예전에는 주휴수당(step6)이 row마다 get_weekly_hours를 다시 돌리고,
+  세금공제(step8)도 row마다 그 주 전체를 다시 합산해서 한 주에 n개면 O(n²)이었음
+→ calculate_custom_pay / calculate_monthly_pay는 주마다 summarize_week 한 번 + row마다 O(1)"""
+
+class WeekSummary:
+    __slots__ = ("week_key", "records", "total_centihours", "apply_allowance", "allowance_wage")
+
+    def __init__(self, week_key, records, total_centihours, apply_allowance, allowance_wage):
+        self.week_key = week_key
+        self.records = records
+        self.total_centihours = total_centihours
+        self.apply_allowance = apply_allowance
+        self.allowance_wage = allowance_wage
+
+    @property
+    def total_hours(self) -> float:
+        return self.total_centihours / 100
+
+    @property
+    def full_time(self) -> bool:
+        return self.total_centihours >= FULL_TIME_CENTIHOURS
+
+    @property
+    def weekly_allowance(self) -> int:
+        # 주 15시간 이상 + wHoliday → 시급 × 8시간
+        if self.apply_allowance and self.full_time:
+            return pay_amount(8, self.allowance_wage, 1)
+        return 0
+
+    @property
+    def tax_rate(self) -> float:
+        # 주 15시간 이상 → 4대보험 9%, 미만 → 삼쩜삼 3.3% (실제 공제액은 calculate_tax_amount로 정수 계산)
+        return 0.09 if self.full_time else 0.033
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+
+def summarize_week(rows, week_key: str = None) -> WeekSummary:
+    records = compile_entries(rows)
+
+    total_centihours = 0
+    wage = DEFAULT_MINIMUM_WAGE
+    apply = False
+
+    for record in records:
+        total_centihours += record.centihours
+        if record.flags & FLAG_WHOLIDAY:
+            apply = True
+            # 주휴 시급은 wHoliday인 row 중 마지막 hourPrice (없으면 이전 값 유지)
+            if record.flags & FLAG_WAGE_SET:
+                wage = record.wage
+
+    return WeekSummary(week_key, records, total_centihours, apply, wage)
+
+
+
+
 #step13. 최종 계산 함수(마스터 함수) - 한달치 급여 최종 계산
 
 """코드 요약:
@@ -376,7 +656,7 @@ def group_entries_by_week(entries: list[dict]) -> dict:
 하루 단위 총 급여 계산 (기본급 + 각종 수당들 + 세금공제)
 마지막에 전체 누적 결과를 정리해서 dict로 반환"""
 
-def calculate_monthly_pay(entries: list[dict]) -> dict:
+def calculate_monthly_pay(entries: list) -> dict:
     
     total_base = 0
     total_night = 0
@@ -386,16 +666,17 @@ def calculate_monthly_pay(entries: list[dict]) -> dict:
     total_net = 0
     total_weekly_allowance = 0
 
-    weekly_groups = group_entries_by_week(entries)
+    weekly_groups = group_entries_by_week(compile_entries(entries))
 
     for week_id, weekly_rows in weekly_groups.items():
+        week = summarize_week(weekly_rows, week_id)  # 주간 합계는 주마다 한 번만
         
         # 주휴수당 먼저 계산
-        weekly_allowance = calculate_weekly_allowance(weekly_rows)
+        weekly_allowance = week.weekly_allowance
         total_weekly_allowance += weekly_allowance
 
-        for row in weekly_rows:
-            result = calculate_final_pay(row, weekly_rows)  # 하루치 + 세금
+        for row in week.records:
+            result = calculate_final_pay(row, week)  # 하루치 + 세금
             total_base += result["base"]
             total_night += result["night"]
             total_overtime += result["overtime"]
@@ -424,49 +705,13 @@ Supabase에서 받아온 i_Schedule.entries 데이터를 바탕으로 월급을
 entries: 개인 근무 데이터 (더미로 가정)
 각 row에는 "date", "startTime", "endTime", "payInfo" 포함"""
 
-from supabase import create_client
-
-# supabase에서 개인 i_Schedule.entries 가져왔다고 가정
-#우선은 entries 더미 데이터 (함수가 잘 돌아가는지 테스트 용도이므로)
-entries = [
-    {
-        "date": "2025-05-06",
-        "startTime": "09:00",
-        "endTime": "17:00",
-        "payInfo": {
-            "hourPrice": 11000,
-            "wHoliday": True,
-            "Holiday": False,
-            "overtime": True,
-            "night": False,
-            "duty": "4대보험"
-        }
-    },
-    {
-        "date": "2025-05-07",
-        "startTime": "10:00",
-        "endTime": "14:00",
-        "payInfo": {
-            "hourPrice": 11000,
-            "wHoliday": True,
-            "Holiday": False,
-            "overtime": False,
-            "night": False,
-            "duty": "4대보험"
-        }
-    },
-    # 원하는 만큼 추가 가능
-]
-  # i_Entry dict 리스트
-
-monthly_result = calculate_monthly_pay(entries)
-print("월 실수령액:", monthly_result["net_with_allowance"])
+# → 예시 실행 코드는 파일 맨 아래 __main__ 블록으로 이동
 
 
 #step15. 최종 함수 테스트 예시(실제 데이터)
 
 def fetch_user_entries(user_id: str, start_date: str, end_date: str) -> list[dict]:
-    response = supabase.table("i_entry") \
+    response = get_supabase_client().table("i_entry") \
         .select("*") \
         .eq("userId", user_id) \
         .gte("date", start_date) \
@@ -475,17 +720,7 @@ def fetch_user_entries(user_id: str, start_date: str, end_date: str) -> list[dic
     
     return response.data if response.data else []
 
-# 사용자 ID 설정 
-user_id = "76f36c2c-22e6-43ac-bf2e-b3458d4d1b3a"
-start_date = "2025-05-01"
-end_date = "2025-05-31"
-
-# 데이터 가져오기 및 계산
-entries = fetch_user_entries(user_id, start_date, end_date)
-result = calculate_monthly_pay(entries)
-
-print("월 실수령액:", result["net_with_allowance"])
-
+# → 예시 실행 코드는 파일 맨 아래 __main__ 블록으로 이동
 
 
 
@@ -496,7 +731,8 @@ print("월 실수령액:", result["net_with_allowance"])
 """코드 요약:
 세금 없이, 하루치 급여만 미리보기용으로 계산하는 함수"""
 
-def calculate_final_pay_preview(row: dict) -> dict:
+def calculate_final_pay_preview(row) -> dict:
+    row = to_shift_record(row)
     base = calculate_base_pay_from_row(row)
     night = calculate_night_pay(row)
     overtime = calculate_overtime_pay(row)
@@ -519,8 +755,7 @@ def calculate_final_pay_preview(row: dict) -> dict:
 """코드 요약:
 하루치 row 데이터를 기반으로, 세금 없이 수당까지 합산된 실지급 예상액(net)을 출력"""
 
-preview = calculate_final_pay_preview(row)
-print("프리뷰 모드 : ", preview["net"])  # 미리보기용 실수령액
+# → 예시 실행 코드는 파일 맨 아래 __main__ 블록으로 이동
 
 
 
@@ -536,15 +771,100 @@ def get_entries_for_date_range(start_date: str, end_date: str) -> list[dict]:
     """
     Supabase에서 특정 날짜 범위(start_date ~ end_date)의 i_entry 데이터를 가져옴
     payInfo는 JSON 형태로 포함되어 있다고 가정함
+    → 계산에 필요한 컬럼만, 페이지 단위로 전부 가져옴 (step18-1)
+    payInfo는 일반 dict로 돌려줌 (그대로 JSON 응답 / json.dumps 가능)
+    """
+    return plain_rows(iter_entries_for_date_range(start_date, end_date))
+
+
+
+
+#step18-1. 페이지 단위 스트리밍 조회 (keyset pagination)
+
+"""코드 요약:
+예전 get_entries_for_date_range는 select("*")로 범위 전체를 한 번에 받아서
+모든 컬럼을 하나의 큰 JSON 응답 + 파이썬 리스트로 들고 있었음 (Supabase 기본 설정이면 1000행에서 잘리기도 함)
+→ 계산에 필요한 컬럼만 고르고(ENTRY_COLUMNS), (date, id) 순서로 정렬해서
+  "마지막으로 받은 (date, id) 다음부터" page_size개씩 가져오는 keyset 방식으로 끝까지 조회
+→ 제너레이터로 row를 하나씩 내보내므로, 받는 쪽은 다음 페이지를 받기 전에 계산을 시작할 수 있음
+offset 방식과 달리 뒤 페이지로 갈수록 느려지지 않음"""
+
+# 급여 계산에 필요한 i_entry 컬럼 (id는 페이지 경계를 정하는 keyset 용도)
+ENTRY_COLUMNS = ("id", "userId", "date", "startTime", "endTime", "payInfo")
+
+# 한 페이지 row 수 (Supabase(PostgREST) 기본 max-rows가 1000이라 그보다 크게 잡으면 잘림)
+DEFAULT_PAGE_SIZE = int(os.getenv("SUPABASE_PAGE_SIZE", "1000"))
+
+
+def build_entry_page_query(table, start_date: str, end_date: str, page_size: int,
+                           after: tuple = None, user_id: str = None, columns=ENTRY_COLUMNS,
+                           user_ids: list = None):
     """
-    response = (
-        supabase.table("i_entry")
-        .select("*")  # payInfo는 별도 join이 아니라 내부 JSON
+    i_entry 한 페이지 쿼리 구성 (동기/비동기 postgrest 빌더 공용)
+    after = 이전 페이지 마지막 row의 (date, id)
+    user_id = 한 사용자만, user_ids = 여러 사용자 (in 필터)
+    """
+    query = (
+        table.select(",".join(columns))
         .gte("date", start_date)
         .lte("date", end_date)
-        .execute()
     )
-    return response.data
+    if user_id is not None:
+        query = query.eq("userId", user_id)
+    if user_ids is not None:
+        query = query.in_("userId", list(user_ids))
+    if after is not None:
+        last_date, last_id = after
+        query = query.or_(f"date.gt.{last_date},and(date.eq.{last_date},id.gt.{last_id})")
+    return query.order("date").order("id").limit(page_size)
+
+
+def iter_entries_for_date_range(start_date: str, end_date: str, page_size: int = DEFAULT_PAGE_SIZE,
+                                user_id: str = None, columns=ENTRY_COLUMNS, user_ids: list = None):
+    """
+    날짜 범위의 i_entry row를 (date, id) 순서로 page_size개씩 가져와서 하나씩 yield
+    user_id를 주면 그 사용자 것만, user_ids를 주면 그 사용자들 것만 (in 필터 한 쿼리)
+    """
+    from utils.resilience import get_fetcher  # asyncio까지 불러오므로 import 시점이 아니라 조회할 때
+
+    after = None
+    while True:
+        query = build_entry_page_query(
+            get_supabase_client().table("i_entry"), start_date, end_date, page_size,
+            after=after, user_id=user_id, columns=columns, user_ids=user_ids,
+        )
+        with span("fetch"):
+            # 재시도 / circuit breaker (utils/resilience.py), 실패하면 FetchError
+            data = get_fetcher().call_sync(query.execute).data or []
+        add_count("rows", len(data))
+        page = intern_rows(data)
+        yield from page
+
+        if len(page) < page_size:
+            return
+        after = (page[-1]["date"], page[-1]["id"])
+
+
+#step18-2. 여러 사용자 한 번에 조회
+
+"""코드 요약:
+사용자 500명 급여를 계산하려고 500번 쿼리하지 않도록, userId in (...) 필터 한 쿼리로 가져옴
+URL 길이 제한 때문에 USER_CHUNK_SIZE명씩 나눠서 조회 (각 묶음은 다시 페이지 단위)
+→ 한 묶음 안에서는 (date, id) 순서이므로, 사용자별로 보면 날짜순"""
+
+USER_CHUNK_SIZE = int(os.getenv("SUPABASE_USER_CHUNK_SIZE", "100"))
+
+
+def chunk_user_ids(user_ids, chunk_size: int = USER_CHUNK_SIZE) -> list:
+    """중복 제거(순서 유지) 후 chunk_size명씩 나눔"""
+    unique = list(dict.fromkeys(user_ids))
+    return [unique[i:i + chunk_size] for i in range(0, len(unique), chunk_size)]
+
+
+def iter_entries_for_users(user_ids, start_date: str, end_date: str, page_size: int = DEFAULT_PAGE_SIZE,
+                           chunk_size: int = USER_CHUNK_SIZE):
+    for chunk in chunk_user_ids(user_ids, chunk_size):
+        yield from iter_entries_for_date_range(start_date, end_date, page_size, user_ids=chunk)
 
 
 
@@ -560,34 +880,61 @@ def get_entries_for_date_range(start_date: str, end_date: str) -> list[dict]:
 mode에 따라:
 "standard"면: 세금, 주휴수당 포함 정식 급여 계산
 "preview"면: 세금 없이 미리보기 계산
-항목별 합산 후 최종 dict로 반환"""
+항목별 합산 후 최종 dict로 반환
 
-def calculate_custom_pay(entries: list[dict], mode: str = "standard") -> dict:
-    grouped = group_entries_by_week(entries)
-    total_base = total_night = total_overtime = total_holiday = total_tax = total_net = 0
-    total_weekly_allowance = 0
+engine="numpy"면 같은 계산을 NumPy 배열 연산으로 처리 (utils/vectorized_calculator.py, 결과 동일)"""
+
+ENGINES = ("python", "numpy")
+MODES = ("standard", "preview")
+
+# 주 단위 / 전체 합계에서 누적하는 항목
+PAY_TOTAL_KEYS = ("base", "night", "overtime", "holiday", "weekly_allowance", "tax", "net")
+
+
+def calculate_week_pay(weekly_rows, mode: str = "standard", week_key: str = None) -> dict:
+    """
+    한 주치 rows의 항목별 합계 (PAY_TOTAL_KEYS + 주간 총 근무시간 "hours")
+    calculate_custom_pay / 스트리밍 모드가 주마다 이 함수를 한 번씩 호출함
+    """
+    if mode not in MODES:
+        raise ValueError("Invalid mode")
+
+    week = summarize_week(weekly_rows, week_key)  # 주간 합계는 주마다 한 번만
+    totals = dict.fromkeys(PAY_TOTAL_KEYS, 0)
+    totals["hours"] = week.total_hours
+    if mode == "standard":
+        totals["weekly_allowance"] = week.weekly_allowance
 
-    for week_id, weekly_rows in grouped.items():
+    for row in week.records:
         if mode == "standard":
-            weekly_allowance = calculate_weekly_allowance(weekly_rows)
-            total_weekly_allowance += weekly_allowance
+            result = calculate_final_pay(row, week)
         else:
-            weekly_allowance = 0
+            result = calculate_final_pay_preview(row)
 
-        for row in weekly_rows:
-            if mode == "standard":
-                result = calculate_final_pay(row, weekly_rows)
-            elif mode == "preview":
-                result = calculate_final_pay_preview(row)
-            else:
-                raise ValueError("Invalid mode")
+        totals["base"] += result["base"]
+        totals["night"] += result["night"]
+        totals["overtime"] += result["overtime"]
+        totals["holiday"] += result["holiday"]
+        totals["tax"] += result.get("tax", 0)
+        totals["net"] += result["net"]
 
-            total_base += result["base"]
-            total_night += result["night"]
-            total_overtime += result["overtime"]
-            total_holiday += result["holiday"]
-            total_tax += result.get("tax", 0)
-            total_net += result["net"]
+    return totals
+
+
+def add_pay_totals(acc: dict, totals: dict) -> dict:
+    """주 단위 합계(totals)를 누적 dict(acc)에 더함"""
+    for key in PAY_TOTAL_KEYS:
+        acc[key] = acc.get(key, 0) + totals[key]
+    return acc
+
+
+def finalize_pay_totals(acc: dict) -> dict:
+    """누적 합계 → calculate_custom_pay 결과 형식"""
+    total_base = acc.get("base", 0)
+    total_night = acc.get("night", 0)
+    total_overtime = acc.get("overtime", 0)
+    total_holiday = acc.get("holiday", 0)
+    total_weekly_allowance = acc.get("weekly_allowance", 0)
 
     return {
         "base": total_base,
@@ -595,23 +942,139 @@ def calculate_custom_pay(entries: list[dict], mode: str = "standard") -> dict:
         "overtime": total_overtime,
         "holiday": total_holiday,
         "weekly_allowance": total_weekly_allowance,
-        "tax": total_tax,
+        "tax": acc.get("tax", 0),
         "gross_with_allowance": total_base + total_night + total_overtime + total_holiday + total_weekly_allowance,
-        "net_with_allowance": total_net + total_weekly_allowance
+        "net_with_allowance": acc.get("net", 0) + total_weekly_allowance
     }
 
 
+def calculate_custom_pay(entries: list, mode: str = "standard", engine: str = "python") -> dict:
+    if engine == "numpy":
+        from utils.vectorized_calculator import calculate_custom_pay_numpy
+
+        with span("calc"):
+            return calculate_custom_pay_numpy(entries, mode=mode)
+    if engine != "python":
+        raise ValueError("Invalid engine")
+
+    # row마다 payInfo/시간 파싱은 여기서 딱 한 번 (이미 ShiftRecord면 그대로 사용)
+    with span("parse"):
+        records = compile_entries(entries)
+    with span("group"):
+        grouped = group_entries_by_week(records)
+    acc = {}
+
+    with span("calc"):
+        for week_id, weekly_rows in grouped.items():
+            add_pay_totals(acc, calculate_week_pay(weekly_rows, mode, week_id))
+
+    return finalize_pay_totals(acc)
+
+
+
+#step19-1. 스트리밍(상수 메모리) 모드
+
+"""코드 요약:
+calculate_custom_pay는 group_entries_by_week가 모든 주를 dict로 만든 뒤에야 합산을 시작해서
+범위 전체의 entry를 메모리에 들고 있어야 함
+→ entry가 날짜순으로 들어온다면(페이지 조회 결과가 그렇듯) 한 주가 끝나는 순간 그 주를 합산하고 rows를 버림
+→ 메모리는 범위 길이와 상관없이 "한 주치"만큼만 사용
+어떤 iterable이든 받음 (리스트, iter_entries_for_date_range 제너레이터 등), 결과 dict는 calculate_custom_pay와 같음
+이미 합산한 주가 다시 나오면(날짜순이 아니면) ValueError"""
+
+def _parse_row_timed(row) -> ShiftRecord:
+    """to_shift_record + 측정이 켜져 있으면 "parse" 단계 시간 기록"""
+    if not metrics.METRICS_ENABLED or isinstance(row, ShiftRecord):
+        return to_shift_record(row)
+    # row마다 with span()을 쓰면 측정이 꺼져 있을 때도 비용이 들어서 켜져 있을 때만 직접 잼
+    started = time.perf_counter()
+    record = ShiftRecord.from_row(row)
+    metrics.add_time("parse", time.perf_counter() - started)
+    return record
+
+
+class StreamingPayCalculator:
+    def __init__(self, mode: str = "standard"):
+        if mode not in MODES:
+            raise ValueError("Invalid mode")
+        self.mode = mode
+        self._acc = {}
+        self._week_key = None
+        self._week_rows = []
+        self._done_weeks = set()
+
+    def add(self, row):
+        record = _parse_row_timed(row)
+        if record.week_key != self._week_key:
+            self._flush()
+            if record.week_key in self._done_weeks:
+                raise ValueError(f"entries must be sorted by date (week {record.week_key} appeared again)")
+            self._week_key = record.week_key
+        self._week_rows.append(record)
+
+    def _flush(self):
+        if self._week_rows:
+            with span("calc"):
+                totals = calculate_week_pay(self._week_rows, self.mode, self._week_key)
+            add_pay_totals(self._acc, totals)
+            self._done_weeks.add(self._week_key)
+        self._week_rows = []
+
+    def result(self) -> dict:
+        self._flush()
+        return finalize_pay_totals(self._acc)
+
+
+def calculate_custom_pay_stream(rows, mode: str = "standard") -> dict:
+    """날짜순 iterable을 한 주씩 합산 (calculate_custom_pay와 같은 결과, 한 주치 메모리)"""
+    calc = StreamingPayCalculator(mode)
+    for row in rows:
+        calc.add(row)
+    return calc.result()
+
+
+
+#step19-2. 여러 사용자 급여를 한 번에 계산
+
+"""코드 요약:
+여러 사용자의 entry가 섞여서(사용자별로는 날짜순) 들어오면
+사용자별 StreamingPayCalculator로 나눠 담아서 사용자마다 calculate_custom_pay와 같은 결과를 만듦
+→ 전체 entry 수에 비례하는 시간, 사용자마다 한 주치 메모리"""
+
+class UserPayCalculator:
+    def __init__(self, user_ids=(), mode: str = "standard"):
+        if mode not in MODES:
+            raise ValueError("Invalid mode")
+        self.mode = mode
+        # entry가 없는 사용자도 0원 결과가 나오도록 미리 만들어 둠 (요청 순서 유지)
+        self._calcs = {user_id: StreamingPayCalculator(mode) for user_id in user_ids}
+
+    def add(self, row):
+        record = _parse_row_timed(row)
+        calc = self._calcs.get(record.user_id)
+        if calc is None:
+            calc = self._calcs[record.user_id] = StreamingPayCalculator(self.mode)
+        calc.add(record)
+
+    def results(self) -> dict:
+        return {user_id: calc.result() for user_id, calc in self._calcs.items()}
+
+
+def calculate_custom_pay_by_user(rows, user_ids=(), mode: str = "standard") -> dict:
+    """{userId: calculate_custom_pay 결과} (rows는 사용자별로 날짜순이어야 함)"""
+    calc = UserPayCalculator(user_ids, mode)
+    for row in rows:
+        calc.add(row)
+    return calc.results()
+
+
 
 #step20. FINAL 급여 계산 함수 (우리는 이걸 사용)
 
 """코드 요약:
 이건 우리가 만든 급여 시스템을 실제로 호출하는 최종 통합 사용 예시"""
 
-result = calculate_custom_pay(
-    get_entries_for_date_range("2025-05-01", "2025-05-31"),
-    mode="standard"
-)
-print("💰 5월 실수령액:", result["net_with_allowance"])
+# → 예시 실행 코드는 파일 맨 아래 __main__ 블록으로 이동
 
 
 
@@ -621,28 +1084,88 @@ print("💰 5월 실수령액:", result["net_with_allowance"])
 
 이 예시는 우리가 만든 calculate_custom_pay() 함수를 두 가지 시나리오에서 실전처럼 테스트"""
 
-# 1. 세금 포함된 5월 월급 계산
-# Supabase에서 2025년 5월 근무한 i_entry 데이터 전부 가져옴
-entries = get_entries_for_date_range("2025-05-01", "2025-05-31")
+# → 예시 실행 코드는 파일 맨 아래 __main__ 블록으로 이동
 
-# "standard" 모드로 급여 계산 (세금·주휴수당 모두 포함)
-result = calculate_custom_pay(entries, mode="standard")
 
-# 결과 출력
-print("🪙 5월 실수령액:", result["net_with_allowance"])
-print(result)  # 전체 세부 급여 breakdown 확인용
 
-# 2. 사용자가 날짜 3개만 선택했을 때 미리보기 (세금 X)
-# Supabase에서 전체 데이터를 가져온 후, 앞에서 3개만 선택해 예시 테스트
-# 실제 프론트에서는 사용자가 선택한 날만 추려서 넘겨줄 수 있음
-selected_entries = entries[:3]  # 혹은 사용자가 고른 날짜에 해당하는 entry만 추출
 
-# "preview" 모드로 계산 (세금 미포함, 주휴수당은 포함)
-preview_result = calculate_custom_pay(selected_entries, mode="preview")
+#예시 실행 (step10, 14, 15, 17, 20, 21)
 
-# 미리보기 결과 출력
-print("👀 미리보기 결과 (3일치):", preview_result["net_with_allowance"])
-print(preview_result)
+"""코드 요약:
+import 시점에는 아무것도 실행되지 않도록 예시 코드를 전부 이 블록으로 모음
+→ 프로젝트 루트에서 `python -m utils.calculator` 로 실행
+step15, 20, 21은 실제 Supabase에 쿼리함"""
 
+if __name__ == "__main__":
 
+    # step10. 총 급여 계산 테스트 (야간 + 연장 + 주휴 조건을 모두 만족하는 예제)
+    row = {
+        "startTime": "20:00",
+        "endTime": "04:00",
+        "payInfo": {
+            "hourPrice": 11000,
+            "night": True,
+            "overtime": True,
+            "wHoliday": True
+        }
+    }
 
+    weekly_rows = [row] * 3  # 주 3일 (총 24시간 근무) 근무로 가정
+
+    result = calculate_final_pay(row, weekly_rows)
+    print(result)
+
+    # step14. 최종함수 테스트 예시(더미 데이터)
+    entries = [
+        {
+            "date": "2025-05-06",
+            "startTime": "09:00",
+            "endTime": "17:00",
+            "payInfo": {
+                "hourPrice": 11000,
+                "wHoliday": True,
+                "Holiday": False,
+                "overtime": True,
+                "night": False,
+                "duty": "4대보험"
+            }
+        },
+        {
+            "date": "2025-05-07",
+            "startTime": "10:00",
+            "endTime": "14:00",
+            "payInfo": {
+                "hourPrice": 11000,
+                "wHoliday": True,
+                "Holiday": False,
+                "overtime": False,
+                "night": False,
+                "duty": "4대보험"
+            }
+        },
+    ]
+
+    monthly_result = calculate_monthly_pay(entries)
+    print("월 실수령액:", monthly_result["net_with_allowance"])
+
+    # step17. 프리뷰 모드 사용 예시
+    preview = calculate_final_pay_preview(row)
+    print("프리뷰 모드 : ", preview["net"])  # 미리보기용 실수령액
+
+    # step15. 최종 함수 테스트 예시(실제 데이터)
+    user_id = "76f36c2c-22e6-43ac-bf2e-b3458d4d1b3a"
+    entries = fetch_user_entries(user_id, "2025-05-01", "2025-05-31")
+    result = calculate_monthly_pay(entries)
+    print("월 실수령액:", result["net_with_allowance"])
+
+    # step20/21. 5월 전체 i_entry로 정식 급여 + 3일치 미리보기
+    entries = get_entries_for_date_range("2025-05-01", "2025-05-31")
+
+    result = calculate_custom_pay(entries, mode="standard")
+    print("🪙 5월 실수령액:", result["net_with_allowance"])
+    print(result)  # 전체 세부 급여 breakdown 확인용
+
+    selected_entries = entries[:3]  # 혹은 사용자가 고른 날짜에 해당하는 entry만 추출
+    preview_result = calculate_custom_pay(selected_entries, mode="preview")
+    print("👀 미리보기 결과 (3일치):", preview_result["net_with_allowance"])
+    print(preview_result)
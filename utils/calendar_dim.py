@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+from array import array
+from datetime import date
+
+# 달력 차원 테이블 (날짜 → 주차 키 / ISO 주 / 요일 / 공휴일)
+
+"""코드 요약:
+group_entries_by_week / ShiftRecord가 row마다 strptime + strftime("%Y-%W")을 하고 있었고,
+공휴일 수당은 클라이언트가 payInfo.Holiday를 제대로 넣어 줬는지에만 의존했음
+→ 연도 범위를 한 번만 훑어서 날짜별 값을 압축 배열로 만들어 둠
+  - day_index: "YYYY-MM-DD" → 배열 위치 (dict, O(1))
+  - ordinals : date.toordinal()            (array 'l')
+  - week_ids : "%Y-%W" 주차 키의 번호       (array 'H', 키 문자열은 week_keys[번호])
+  - iso_weeks: ISO 주차 번호                (array 'B')
+  - weekdays : 월=0 ~ 일=6                  (array 'B')
+  - holidays : 공휴일이면 1                  (bytearray, 이름은 holiday_names)
+→ row마다 날짜 파싱 없이 dict 조회 한 번 + 배열 인덱싱
+→ 배열이라 numpy 등에서 날짜 위치 배열만 있으면 week_ids[위치]로 주차 그룹핑을 한 번에 할 수 있음
+
+공휴일은 utils/data/kr_holidays.json (날짜 → 이름, 대체공휴일/선거일 포함, 해마다 추가)
+다른 파일을 쓰려면 PAY_HOLIDAYS_FILE, 기본 연도 범위는 PAY_CALENDAR_YEARS (예: 2020-2035)
+범위 밖 날짜나 다른 형식의 문자열은 None을 반환 → 호출하는 쪽이 예전처럼 strptime으로 처리
+공휴일 파일에 없는 연도(holiday_years 밖)는 is_holiday가 False가 아니라 None (모름)
+→ 파일에 아직 안 넣은 해의 공휴일을 평일로 잘못 확정하지 않음"""
+
+HOLIDAYS_FILE = os.getenv(
+    "PAY_HOLIDAYS_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "kr_holidays.json")
+)
+DEFAULT_YEARS = os.getenv("PAY_CALENDAR_YEARS", "2020-2035")
+
+
+def load_holidays(path: str = HOLIDAYS_FILE) -> dict:
+    """공휴일 파일 → {"YYYY-MM-DD": 이름} (파일이 없으면 빈 dict)"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class CalendarDimension:
+    """first_year 1월 1일 ~ last_year 12월 31일의 날짜별 값"""
+
+    def __init__(self, first_year: int, last_year: int, holidays: dict = None, holiday_years=None):
+        if last_year < first_year:
+            raise ValueError("last_year must not be before first_year")
+        self.first_year = first_year
+        self.last_year = last_year
+        self.holiday_names = load_holidays() if holidays is None else dict(holidays)
+        # 공휴일 목록이 채워져 있는 연도 (따로 안 주면 목록에 나오는 연도)
+        if holiday_years is None:
+            holiday_years = {int(date_str[:4]) for date_str in self.holiday_names}
+        self.holiday_years = frozenset(holiday_years)
+
+        self.day_index = {}
+        self.ordinals = array("l")
+        self.week_ids = array("H")
+        self.iso_weeks = array("B")
+        self.weekdays = array("B")
+        self.holidays = bytearray()
+        self.week_keys = []
+        week_numbers = {}
+
+        # strftime / isocalendar를 날마다 부르지 않고 연도별로 요일·주차를 직접 셈
+        for year in range(first_year, last_year + 1):
+            jan1 = date(year, 1, 1)
+            ordinal = jan1.toordinal()
+            n_days = date(year + 1, 1, 1).toordinal() - ordinal
+            weekday = jan1.weekday()
+            for yday in range(n_days):
+                week_key = f"{year}-{(yday + 7 - weekday) // 7:02d}"  # strftime("%Y-%W")과 같음
+                week_id = week_numbers.get(week_key)
+                if week_id is None:
+                    week_id = week_numbers[week_key] = len(self.week_keys)
+                    self.week_keys.append(week_key)
+
+                day = date.fromordinal(ordinal + yday)
+                date_str = day.isoformat()
+                self.day_index[date_str] = len(self.ordinals)
+                self.ordinals.append(ordinal + yday)
+                self.week_ids.append(week_id)
+                self.weekdays.append(weekday)
+                self.holidays.append(1 if date_str in self.holiday_names else 0)
+                weekday = (weekday + 1) % 7
+
+        # ISO 주차는 주 단위로 한 번씩 (월요일마다 계산하고 나머지 요일은 그대로)
+        iso_week = date.fromordinal(self.ordinals[0]).isocalendar()[1] if self.ordinals else 0
+        for i, weekday in enumerate(self.weekdays):
+            if weekday == 0:
+                iso_week = date.fromordinal(self.ordinals[i]).isocalendar()[1]
+            self.iso_weeks.append(iso_week)
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def week_key(self, date_str: str):
+        """ "YYYY-MM-DD" → group_entries_by_week와 같은 "%Y-%W" 키 (범위 밖이면 None) """
+        i = self.day_index.get(date_str)
+        return None if i is None else self.week_keys[self.week_ids[i]]
+
+    def iso_week(self, date_str: str):
+        i = self.day_index.get(date_str)
+        return None if i is None else self.iso_weeks[i]
+
+    def weekday(self, date_str: str):
+        i = self.day_index.get(date_str)
+        return None if i is None else self.weekdays[i]
+
+    def ordinal(self, date_str: str):
+        i = self.day_index.get(date_str)
+        return None if i is None else self.ordinals[i]
+
+    def is_holiday(self, date_str: str):
+        """공휴일이면 True, 아니면 False (범위 밖이거나 공휴일 목록이 없는 연도면 None)"""
+        i = self.day_index.get(date_str)
+        if i is None or int(date_str[:4]) not in self.holiday_years:
+            return None
+        return bool(self.holidays[i])
+
+
+def _parse_years(value: str) -> tuple:
+    first, _, last = value.partition("-")
+    return int(first), int(last or first)
+
+
+_calendar = None
+_calendar_lock = threading.Lock()
+
+
+def get_calendar() -> CalendarDimension:
+    """공유 달력 (처음 쓸 때 PAY_CALENDAR_YEARS 범위로 한 번 만듦)"""
+    global _calendar
+    if _calendar is None:
+        with _calendar_lock:
+            if _calendar is None:
+                _calendar = CalendarDimension(*_parse_years(DEFAULT_YEARS))
+    return _calendar
+
+
+def set_calendar(calendar: CalendarDimension):
+    """달력 교체 (다른 연도 범위 / 공휴일 목록)"""
+    global _calendar
+    _calendar = calendar
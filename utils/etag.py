@@ -0,0 +1,117 @@
+import hashlib
+import os
+
+from utils.calculator import AUTO_HOLIDAY_FLAG
+from utils.metrics import counter
+from utils.result_cache import InMemoryResultCache, ResultCache, add_change_listener, invalidation_configured
+
+# /calculate 조건부 GET (ETag / If-None-Match)
+
+"""코드 요약:
+대시보드는 아무것도 안 바뀌었어도 /calculate를 계속 다시 부르고, 매번 전체 결과를 받아 감
+(캐시가 비어 있으면 조회 + 계산까지 전부 다시 함)
+→ 요청 범위의 i_entry "버전"을 가벼운 쿼리 하나로 구해서 ETag로 씀
+  - 범위 안 row 수(Prefer: count=exact) + PAY_ETAG_VERSION_COLUMN(기본 updated_at)의 최댓값
+  - 한 row(버전 컬럼 하나)만 받으므로 범위 크기와 상관없이 작음
+  - 구한 값은 (user, 기간)별로 PAY_ETAG_TTL초 보관, i_entry 변경 알림이 오면 결과 캐시와 같은 규칙으로 무효화
+    (변경 알림 경로가 설정되지 않았으면 보관하지 않고 요청마다 다시 구함)
+→ 버전 쿼리는 클라이언트가 If-None-Match를 보냈을 때만 (그 외 요청은 추가 왕복 없음)
+  같으면 전체 조회 / 계산 없이 304 Not Modified
+→ 응답에는 그 결과를 계산하기 전에 구한 버전의 ETag만 붙임 (결과는 항상 ETag 시점과 같거나 더 최신)
+  - 새로 계산한 결과: 계산 전에 구한(또는 보관 중인) 버전을 결과 캐시 키별로 같이 기록 (remember_result_validator)
+  - 캐시 결과: 기록된 버전의 ETag, If-None-Match로 지금 버전을 구했는데 다르면 캐시를 쓰지 않고 다시 계산
+  - 버전을 모르는 결과(미리 계산한 스냅샷, stale 결과)에는 ETag를 붙이지 않음
+  → 예전 결과가 새 버전의 ETag로 나가서 이후 요청이 계속 304를 받는 일이 없음
+
+row가 추가/삭제되면 row 수가, 수정되면 updated_at이 바뀜 (updated_at을 갱신하는 트리거가 있어야 함)
+버전 쿼리가 장애가 아닌 이유로 실패하면(컬럼 없음 등) 그 프로세스에서는 ETag를 끄고 기존처럼 응답 (disable_etag)
+계산 규칙이 바뀌는 배포 때는 PAY_ETAG_SALT를 바꾸면(예: 커밋 해시) 이전 ETag가 전부 무효가 됨
+PAY_ETAG=0이면 사용 안 함, 지정하지 않으면 변경 알림 경로(result_cache.invalidation_configured)가 있을 때만 사용"""
+
+# 변경 알림 경로가 없으면 버전을 보관할 수 없어서 요청마다 버전 쿼리가 필요 → 직접 켰을 때만 사용
+ETAG_ENABLED = os.getenv("PAY_ETAG", "1" if invalidation_configured() else "0") != "0"
+VERSION_COLUMN = os.getenv("PAY_ETAG_VERSION_COLUMN", "updated_at")
+ETAG_SALT = os.getenv("PAY_ETAG_SALT", "")
+VALIDATOR_TTL = float(os.getenv("PAY_ETAG_TTL", os.getenv("PAY_CACHE_TTL", "60")))
+
+_disabled_reason = None  # 버전 쿼리가 실패한 이유 (컬럼 없음 등), 있으면 프로세스가 끝날 때까지 ETag 사용 안 함
+
+NOT_MODIFIED = counter("pay_not_modified_total", "If-None-Match가 같아서 304로 응답한 /calculate 요청 수")
+
+
+def etag_enabled() -> bool:
+    return ETAG_ENABLED and _disabled_reason is None
+
+
+def disable_etag(reason: str):
+    """버전 쿼리 자체가 안 되는 환경(컬럼 없음, 권한 등) → 요청마다 같은 실패를 반복하지 않도록 ETag를 끔"""
+    global _disabled_reason
+    _disabled_reason = reason
+
+
+def etag_stats() -> dict:
+    return {"enabled": etag_enabled(), "disabled_reason": _disabled_reason}
+
+
+# (user_id, start_date, end_date) → (row 수, 최신 버전), 결과 캐시와 같은 키 구조라 같은 무효화 규칙이 적용됨
+# 변경 알림 경로가 없으면 보관하지 않음 (보관하면 수정 뒤에도 TTL 동안 304가 나감) → 요청마다 버전 쿼리
+_validators = InMemoryResultCache(maxsize=4096, ttl=VALIDATOR_TTL) if invalidation_configured() else ResultCache()
+
+
+def get_validator(user_id, start_date: str, end_date: str):
+    """보관 중인 (row 수, 최신 버전), 없으면 None"""
+    return _validators.get((user_id, start_date, end_date))
+
+
+def validator_generation() -> int:
+    """버전 쿼리 전에 받아 두었다가 set_validator()에 넘김 (그 사이 변경이 있으면 저장 안 함)"""
+    return _validators.generation()
+
+
+def set_validator(user_id, start_date: str, end_date: str, validator: tuple, generation: int = None):
+    _validators.set((user_id, start_date, end_date), validator, generation)
+
+
+# 결과 캐시 키 (user_id, start_date, end_date, mode) → 그 결과를 계산하기 전에 구한 (row 수, 최신 버전)
+_result_validators = InMemoryResultCache(
+    maxsize=int(os.getenv("PAY_CACHE_MAXSIZE", "1024")),
+    ttl=float(os.getenv("PAY_CACHE_TTL", "60")),
+)
+
+
+def result_validator(key: tuple):
+    """key 결과를 계산할 때 쓴 (row 수, 최신 버전), 모르면 None"""
+    return _result_validators.get(key)
+
+
+def remember_result_validator(key: tuple, validator: tuple, generation: int = None):
+    """결과 캐시에 저장한 결과가 어느 버전에서 계산됐는지 기록 (generation은 result_generation())"""
+    _result_validators.set(key, validator, generation)
+
+
+def result_generation() -> int:
+    return _result_validators.generation()
+
+
+def _on_entry_change(user_id, date):
+    _validators.invalidate(user_id=user_id, date=date)
+    _result_validators.invalidate(user_id=user_id, date=date)
+
+
+add_change_listener(_on_entry_change)
+
+
+def make_etag(user_id, start_date: str, end_date: str, mode: str, count: int, version) -> str:
+    """범위 row 수 + 최신 버전 → ETag (mode가 다르면 결과도 다르므로 포함)"""
+    raw = f"{ETAG_SALT}|{AUTO_HOLIDAY_FLAG}|{user_id}|{start_date}|{end_date}|{mode}|{count}|{version}"
+    return '"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 헤더(여러 개 / W/ 약한 비교 / *)에 etag가 있는지"""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
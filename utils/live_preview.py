@@ -0,0 +1,186 @@
+import os
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from utils.calculator import (
+    ShiftRecord,
+    calculate_final_pay_preview,
+    centihours,
+    compile_entries,
+    finalize_pay_totals,
+)
+
+# 실시간 미리보기 (preview 모드 "지금까지 번 돈"을 WebSocket으로 조금씩 갱신)
+
+"""코드 요약:
+프런트엔드는 "지금까지 얼마 벌었나"를 보려고 /calculate?mode=preview를 몇 초마다 다시 부르는데,
+그때마다 범위 전체를 다시 조회하고 다시 계산함 (바뀌는 건 지금 근무 중인 shift 하나뿐)
+→ 연결 하나(사용자 하나)마다 LivePreview 세션을 두고
+  - 끝난 entry: calculate_final_pay_preview 결과를 날짜별로 합산해 두고 다시 계산하지 않음
+  - 근무 중인 entry: 시작 ~ 지금까지만 일한 것으로 보고 base/night/overtime/holiday만 다시 계산
+  - 아직 시작 안 한 entry: 0원 (시작 시각이 되면 근무 중으로 옮김)
+→ 시간이 지나거나(분 단위) entry가 바뀌면(그 날짜만 다시 조회) 합계에서 바뀐 항목만 delta로 보냄
+
+preview 모드라 주휴수당 / 세금은 없음 (합계 형식은 calculate_custom_pay preview 결과와 같음)
+근무 시각은 PAY_TIMEZONE(기본 Asia/Seoul) 기준, 자정 넘긴 shift는 entry 날짜 기준 분으로 계산"""
+
+TIMEZONE = ZoneInfo(os.getenv("PAY_TIMEZONE", "Asia/Seoul"))
+
+# 근무 중 / 끝난 entry 합계에서 누적하는 항목 (calculate_final_pay_preview 결과 키)
+PREVIEW_KEYS = ("base", "night", "overtime", "holiday", "net")
+
+
+def local_now() -> datetime:
+    return datetime.now(TIMEZONE)
+
+
+def minutes_since(date_str: str, now: datetime) -> int:
+    """date_str 날짜 0시부터 now까지 분 (ShiftRecord.start/end와 같은 기준, 이전 날짜면 1440분씩 더 큼)"""
+    days = (now.date() - date.fromisoformat(date_str)).days
+    return days * 1440 + now.hour * 60 + now.minute
+
+
+def partial_record(record: ShiftRecord, end: int) -> ShiftRecord:
+    """record를 end(분)에 끝난 것으로 자른 복사본"""
+    return ShiftRecord(
+        id=record.id,
+        user_id=record.user_id,
+        date=record.date,
+        week_key=record.week_key,
+        start=record.start,
+        end=end,
+        hours=centihours(end - record.start) / 100,
+        wage=record.wage,
+        flags=record.flags,
+        profile_id=record.profile_id,
+    )
+
+
+def _add(acc: dict, result: dict, sign: int = 1):
+    for key in PREVIEW_KEYS:
+        acc[key] = acc.get(key, 0) + sign * result[key]
+
+
+class LivePreview:
+    """
+    한 사용자 범위의 실시간 preview 합계
+    load(rows) → 처음 한 번, replace_day(date, rows) → 그 날짜 entry가 바뀌었을 때, tick(now) → 시간이 지났을 때
+    totals()는 calculate_custom_pay(..., mode="preview")와 같은 형식 (지금까지 일한 만큼만)
+    """
+
+    def __init__(self, user_id: str, start_date: str, end_date: str):
+        self.user_id = user_id
+        self.start_date = start_date
+        self.end_date = end_date
+        self._done = {}  # 끝난 entry 합계
+        self._done_by_date = {}  # 날짜 → 끝난 entry 합계 (그 날짜가 바뀌면 빼기 위해)
+        self._running = []  # 근무 중인 ShiftRecord
+        self._upcoming = []  # 아직 시작 안 한 ShiftRecord
+        self._running_totals = {}  # 근무 중인 entry들의 지금까지 합계
+        self._last = None  # 마지막으로 보낸 합계
+
+    def load(self, rows, now: datetime):
+        self._done, self._done_by_date = {}, {}
+        self._running, self._upcoming = [], []
+        self._classify(compile_entries(rows), now)
+        self._refresh_running(now)
+
+    def replace_day(self, day: str, rows, now: datetime):
+        """day의 entry를 rows로 교체 (그 날짜에 끝난 entry 합계만 빼고 다시 더함)"""
+        removed = self._done_by_date.pop(day, None)
+        if removed:
+            _add(self._done, removed, -1)
+        self._running = [r for r in self._running if r.date != day]
+        self._upcoming = [r for r in self._upcoming if r.date != day]
+        self._classify(compile_entries(rows), now)
+        self._refresh_running(now)
+
+    def _classify(self, records: list, now: datetime):
+        for record in records:
+            if record.date is None or not self.start_date <= record.date <= self.end_date:
+                continue
+            elapsed = minutes_since(record.date, now)
+            if elapsed >= record.end:
+                self._complete(record)
+            elif elapsed >= record.start:
+                self._running.append(record)
+            else:
+                self._upcoming.append(record)
+
+    def _complete(self, record: ShiftRecord):
+        result = calculate_final_pay_preview(record)
+        _add(self._done, result)
+        _add(self._done_by_date.setdefault(record.date, {}), result)
+
+    def _refresh_running(self, now: datetime):
+        # 시작 시각이 된 entry는 근무 중으로, 끝난 entry는 합계로 옮김
+        if self._upcoming:
+            upcoming, self._upcoming = self._upcoming, []
+            self._running.extend(upcoming)
+        running, self._running = self._running, []
+        self._running_totals = dict.fromkeys(PREVIEW_KEYS, 0)
+        for record in running:
+            elapsed = minutes_since(record.date, now)
+            if elapsed >= record.end:
+                self._complete(record)
+            elif elapsed < record.start:
+                self._upcoming.append(record)
+            else:
+                self._running.append(record)
+                _add(self._running_totals, calculate_final_pay_preview(partial_record(record, elapsed)))
+
+    def tick(self, now: datetime):
+        """시간이 지났을 때: 근무 중인 entry만 다시 계산"""
+        self._refresh_running(now)
+
+    def totals(self) -> dict:
+        acc = dict(self._done)
+        for key in PREVIEW_KEYS:
+            acc[key] = acc.get(key, 0) + self._running_totals.get(key, 0)
+        return finalize_pay_totals(acc)
+
+    def running(self) -> list:
+        """근무 중인 entry [{id, date, startTime, endTime}, ...]"""
+        return [
+            {
+                "id": r.id,
+                "date": r.date,
+                "startTime": f"{r.start // 60 % 24:02d}:{r.start % 60:02d}",
+                "endTime": f"{r.end // 60 % 24:02d}:{r.end % 60:02d}",
+            }
+            for r in self._running
+        ]
+
+    def snapshot(self) -> dict:
+        """연결 직후 보내는 전체 상태"""
+        self._last = self.totals()
+        return {"type": "snapshot", "totals": self._last, "running": self.running()}
+
+    def delta(self):
+        """마지막으로 보낸 뒤 바뀐 항목만 ({"type": "delta", "changes": {...}}, 바뀐 게 없으면 None)"""
+        current = self.totals()
+        previous = self._last or {}
+        changes = {key: value for key, value in current.items() if previous.get(key) != value}
+        if not changes:
+            return None
+        self._last = current
+        return {"type": "delta", "changes": changes, "running": self.running()}
+
+
+def next_minute_delay(now: datetime) -> float:
+    """다음 분이 시작될 때까지 초 (급여는 분 단위로만 바뀜)"""
+    return 60 - now.second - now.microsecond / 1_000_000
+
+
+def default_range(now: datetime) -> tuple:
+    """범위를 안 주면 이번 달 1일 ~ 오늘"""
+    today = now.date()
+    return today.replace(day=1).isoformat(), today.isoformat()
+
+
+def is_relevant_change(session: LivePreview, user_id, day) -> bool:
+    """change listener 알림이 이 세션 범위에 해당하는지 (row 정보가 없으면 항상 해당)"""
+    if user_id is not None and user_id != session.user_id:
+        return False
+    return day is None or session.start_date <= day <= session.end_date
+
@@ -0,0 +1,224 @@
+import itertools
+import os
+
+from utils.manual_calculator import calculate_manual_pay
+
+# numpy는 선택 의존성: 없으면 같은 결과를 calculate_manual_pay로 하나씩 계산
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# 수동 급여 계산 일괄 처리 (/manual-calculate/batch)
+
+"""코드 요약:
+비교 화면이 payType / taxOption / 연장 / 야간 조합마다 /manual-calculate를 수십 번 호출하고 있었음
+→ 입력 여러 개(inputs) 또는 기본 입력 하나 + 바꿔 볼 값 목록(sweep)을 한 번에 받아서
+  입력 항목별 컬럼 배열로 만든 뒤 calculate_manual_pay의 계산을 배열 연산 한 번으로 처리
+→ 결과는 calculate_manual_pay와 정수 단위까지 같음 (같은 float 연산을 같은 순서로, int() 대신 np.trunc)
+→ inputs 안에서 계산 결과가 같은 입력(workingDays는 요일 수만 같으면 됨)은 한 번만 계산하고 재사용 (입력 순서대로 반환)
+→ sweep은 조합 수가 많으므로(예: 시급 10,030~20,000 × 근무요일 7종 × 세금 3종 ≈ 21만 개)
+  결과를 항목별 리스트(컬럼)로 반환, 조합 순서는 itertools.product(축 순서대로, 마지막 축이 가장 빨리 바뀜)"""
+
+MAX_BATCH_SIZE = int(os.getenv("MANUAL_BATCH_MAX", "1000000"))  # 한 요청에서 계산할 최대 조합 수
+
+RESULT_KEYS = ("grossPay", "weeklyAllowance", "overtimePay", "nightPay", "tax", "netPay")
+PAY_TYPES = ("시급", "일급", "월급")
+TAX_RATES = {"none": 0.0, "insurance": 0.0879, "income": 0.033}
+
+# sweep에서 바꿀 수 있는 입력 항목 (ManualPayInput 필드 순서)
+SWEEP_FIELDS = (
+    "payType", "payAmount", "workHour", "workMinute", "workingDays",
+    "overtimeHour", "overtimeMinute", "includeWeeklyAllowance", "taxOption", "nightWork",
+)
+
+
+_PAY_TYPE_CODES = {pay_type: code for code, pay_type in enumerate(PAY_TYPES)}
+
+# input_key의 값 순서 = 계산 컬럼 이름 (workingDays는 요일 수만 결과에 영향을 줌)
+_KEY_COLUMNS = (
+    "payType", "payAmount", "workHour", "workMinute", "num_days",
+    "overtimeHour", "overtimeMinute", "includeWeeklyAllowance", "tax_rate", "nightWork",
+)
+_BOOL_COLUMNS = ("includeWeeklyAllowance", "nightWork")
+
+
+def input_key(data: dict) -> tuple:
+    """결과가 같은 입력인지 비교하는 키 (계산에 쓰는 값만 숫자로, _KEY_COLUMNS 순서)"""
+    return (
+        _PAY_TYPE_CODES.get(data["payType"], -1),
+        data["payAmount"],
+        data["workHour"],
+        data["workMinute"],
+        len(data["workingDays"]),
+        data["overtimeHour"],
+        data["overtimeMinute"],
+        data["includeWeeklyAllowance"],
+        TAX_RATES.get(data["taxOption"], 0.0),
+        data["nightWork"],
+    )
+
+
+def _calculate_columns(cols: dict) -> dict:
+    """입력 컬럼 배열 dict → 결과 컬럼(int64 배열) dict (calculate_manual_pay와 같은 연산 순서)"""
+    num_days = cols["num_days"]
+    amount = cols["payAmount"]
+    hourly = cols["payType"] == 0
+
+    # 1~4. 근무 / 연장 / 야간 시간
+    total_work_hours = num_days * (cols["workHour"] + cols["workMinute"] / 60)
+    total_overtime_hours = num_days * (cols["overtimeHour"] + cols["overtimeMinute"] / 60)
+    total_night_hours = np.where(cols["nightWork"], num_days * 4, 0)
+
+    # 5. 기본급 (시급 / 일급 / 월급)
+    base_pay = np.select(
+        [hourly, cols["payType"] == 1, cols["payType"] == 2],
+        [total_work_hours * amount, num_days * amount, amount],
+        0,
+    )
+
+    # 6~8. 연장 / 야간 / 주휴 (시급일 때만)
+    overtime_pay = np.where(hourly, total_overtime_hours * amount * 1.5, 0)
+    night_pay = np.where(hourly, total_night_hours * amount * 0.5, 0)
+    weekly = cols["includeWeeklyAllowance"] & hourly & (total_work_hours >= 15)
+    weekly_allowance = np.where(weekly, num_days // 7 * amount * 8, 0)
+
+    # 9~10. 세전 / 세금 / 실수령
+    gross_pay = base_pay + overtime_pay + night_pay + weekly_allowance
+    tax = gross_pay * cols["tax_rate"]
+    net_pay = gross_pay - tax
+
+    values = (gross_pay, weekly_allowance, overtime_pay, night_pay, tax, net_pay)
+    return {key: np.trunc(v).astype(np.int64) for key, v in zip(RESULT_KEYS, values)}
+
+
+# 입력 필드 → (계산에 쓰는 컬럼 이름, 값 변환)
+_FIELD_COLUMNS = {
+    "payType": ("payType", lambda v: _PAY_TYPE_CODES.get(v, -1)),
+    "payAmount": ("payAmount", int),
+    "workHour": ("workHour", int),
+    "workMinute": ("workMinute", int),
+    "workingDays": ("num_days", len),  # 계산에는 근무일 수만 씀
+    "overtimeHour": ("overtimeHour", int),
+    "overtimeMinute": ("overtimeMinute", int),
+    "includeWeeklyAllowance": ("includeWeeklyAllowance", bool),
+    "taxOption": ("tax_rate", lambda v: TAX_RATES.get(v, 0.0)),
+    "nightWork": ("nightWork", bool),
+}
+
+
+def _column(field: str, values) -> tuple:
+    name, convert = _FIELD_COLUMNS[field]
+    return name, np.array([convert(v) for v in values])
+
+
+def _columns_from_keys(keys: list) -> dict:
+    """input_key 리스트 → 계산 컬럼 dict (키가 모두 숫자라 2차원 배열 한 번으로 변환)"""
+    flat = itertools.chain.from_iterable(keys)  # np.array(keys)보다 빠름
+    table = np.fromiter(flat, np.float64, count=len(keys) * len(_KEY_COLUMNS)).reshape(len(keys), -1)
+    cols = {}
+    for i, name in enumerate(_KEY_COLUMNS):
+        column = table[:, i]
+        if name in _BOOL_COLUMNS:
+            column = column != 0
+        elif name != "tax_rate":
+            column = column.astype(np.int64)
+        cols[name] = column
+    return cols
+
+
+def calculate_manual_pay_batch(inputs: list) -> list:
+    """
+    입력 dict 리스트 → calculate_manual_pay 결과 리스트 (입력 순서)
+    완전히 같은 입력은 한 번만 계산
+    """
+    if len(inputs) > MAX_BATCH_SIZE:
+        raise ValueError(f"too many inputs: {len(inputs)} > {MAX_BATCH_SIZE}")
+
+    # 중복 제거: 처음 나온 입력만 계산하고, 나머지는 그 결과 위치를 가리킴
+    unique, keys, positions, first_seen = [], [], [], {}
+    for data in inputs:
+        key = input_key(data)
+        index = first_seen.get(key)
+        if index is None:
+            index = first_seen[key] = len(unique)
+            unique.append(data)
+            keys.append(key)
+        positions.append(index)
+
+    if np is None or not unique:
+        results = [calculate_manual_pay(data) for data in unique]
+    else:
+        cols = _calculate_columns(_columns_from_keys(keys))
+        rows = zip(*(cols[key].tolist() for key in RESULT_KEYS))
+        # dict(zip(RESULT_KEYS, row))보다 리터럴이 2배 정도 빠름 (키 순서 = RESULT_KEYS)
+        results = [
+            {"grossPay": g, "weeklyAllowance": w, "overtimePay": o, "nightPay": n, "tax": t, "netPay": p}
+            for g, w, o, n, t, p in rows
+        ]
+
+    # 중복 입력은 같은 결과 dict를 가리킴 (응답으로 직렬화만 하므로 복사하지 않음)
+    return [results[i] for i in positions]
+
+
+def expand_pay_amount_range(sweep: dict) -> dict:
+    """
+    sweep의 payAmountRange({"start", "stop"(포함), "step"})를 payAmount 값 목록 뒤에 펼쳐 붙임
+    범위가 잘못됐거나 값이 MAX_BATCH_SIZE개를 넘으면 리스트로 펼치기 전에 ValueError
+    """
+    sweep = dict(sweep)
+    amount_range = sweep.pop("payAmountRange", None)
+    if amount_range is None:
+        return sweep
+    if amount_range["step"] <= 0:
+        raise ValueError("payAmountRange.step must be positive")
+    if amount_range["stop"] < amount_range["start"]:
+        raise ValueError("payAmountRange.stop must be >= start")
+    amounts = range(amount_range["start"], amount_range["stop"] + 1, amount_range["step"])
+    # 큰 범위 하나로 메모리를 다 쓰지 않도록 크기부터 확인
+    amount_count = len(amounts) + len(sweep.get("payAmount") or [])
+    if amount_count > MAX_BATCH_SIZE:
+        raise ValueError(f"too many payAmount values: {amount_count} > {MAX_BATCH_SIZE}")
+    sweep["payAmount"] = list(sweep.get("payAmount") or []) + list(amounts)
+    return sweep
+
+
+def sweep_axes(base: dict, sweep: dict) -> dict:
+    """기본 입력 + 바꿀 값 목록 → {필드: 값 리스트} (SWEEP_FIELDS 순서, 안 바꾸는 필드는 기본값 하나)"""
+    axes = {}
+    for field in SWEEP_FIELDS:
+        values = sweep.get(field)
+        axes[field] = list(values) if values else [base[field]]
+    return axes
+
+
+def calculate_manual_pay_sweep(base: dict, sweep: dict) -> dict:
+    """
+    base 입력에서 sweep의 필드 값들을 모든 조합으로 바꿔 가며 계산
+    → {"axes": {필드: 값 리스트}, "count": 조합 수, "results": {결과 항목: 값 리스트(조합 순서)}}
+    i번째 조합 = itertools.product(*axes.values())의 i번째
+    """
+    axes = sweep_axes(base, sweep)
+    sizes = [len(values) for values in axes.values()]
+    count = 1
+    for size in sizes:
+        count *= size
+    if count > MAX_BATCH_SIZE:
+        raise ValueError(f"too many combinations: {count} > {MAX_BATCH_SIZE}")
+
+    if np is None:
+        combos = [dict(zip(axes, values)) for values in itertools.product(*axes.values())]
+        results = [calculate_manual_pay(data) for data in combos]
+        columns = {key: [r[key] for r in results] for key in RESULT_KEYS}
+        return {"axes": axes, "count": count, "results": columns}
+
+    # 축마다 값 배열을 한 번 만들고, 조합 번호 → 축별 위치(np.indices, product와 같은 순서)로 펼침
+    positions = np.indices(sizes).reshape(len(sizes), -1)
+    cols = {}
+    for axis, (field, values) in enumerate(axes.items()):
+        name, column = _column(field, values)
+        cols[name] = column[positions[axis]]
+
+    results = _calculate_columns(cols)
+    return {"axes": axes, "count": count, "results": {key: results[key].tolist() for key in RESULT_KEYS}}
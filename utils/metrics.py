@@ -0,0 +1,319 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+# 단계별 시간 측정 (Server-Timing 헤더 / Prometheus /metrics)
+
+"""코드 요약:
+/calculate가 느릴 때 Supabase 조회 / payInfo 디코딩 / 주 묶기 / row 계산 / 응답 직렬화 중 어디가 느린지 알 수 없었음
+→ 각 단계를 span("fetch") 같은 이름 구간으로 감싸서 요청 단위로 단계별 시간 합계 + row 수 / 받은 바이트 수를 모음
+→ main.py 미들웨어가 요청이 끝나면
+  - 응답에 Server-Timing 헤더로 단계별 시간을 붙이고 (브라우저 개발자도구 Timing 탭에서 보임)
+  - 단계별 / 엔드포인트별 지연시간 히스토그램과 카운터에 누적 → GET /metrics (Prometheus 텍스트 형식)
+
+단계 이름
+- fetch    : Supabase 페이지 요청 (HTTP 왕복 + 응답 JSON 파싱)
+- decode   : payInfo 디코딩 / 공유 프로필 interning (intern_rows)
+- parse    : row → ShiftRecord (시간 파싱 등)
+- group    : group_entries_by_week
+- calc     : 주 단위 집계 + row별 급여 계산
+- serialize: 응답 JSON 직렬화
+비동기 조회는 다음 페이지를 미리 받아 두므로 fetch와 나머지 단계가 겹칠 수 있음 (단계 합 > total일 수 있음)
+스트리밍 응답(/calculate/export)은 헤더를 먼저 보내므로 Server-Timing에는 본문을 보내기 전까지만 들어감
+
+PAY_METRICS=1일 때만 측정 (기본 꺼짐), 꺼져 있으면 span()은 아무것도 하지 않는 공유 객체를 돌려줌"""
+
+METRICS_ENABLED = os.getenv("PAY_METRICS") == "1"
+
+# 지연시간 히스토그램 구간 (초)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def metrics_enabled() -> bool:
+    return METRICS_ENABLED
+
+
+def set_metrics_enabled(enabled: bool):
+    """측정 켜기/끄기 (스크립트, 벤치마크용)"""
+    global METRICS_ENABLED
+    METRICS_ENABLED = bool(enabled)
+
+
+#요청 단위 기록
+
+class RequestTimings:
+    """요청 하나의 단계별 시간 합계(초) / 횟수와 카운터(row 수, 바이트 수 등)"""
+
+    __slots__ = ("stages", "counts", "started")
+
+    def __init__(self):
+        self.stages = {}  # 단계 → [초 합계, 횟수]
+        self.counts = {}
+        self.started = time.perf_counter()
+
+    def add_time(self, stage: str, seconds: float):
+        entry = self.stages.get(stage)
+        if entry is None:
+            self.stages[stage] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def add_count(self, name: str, value: int):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def server_timing(self, total: float = None) -> str:
+        """Server-Timing 헤더 값 (예: fetch;dur=12.3;desc="3x", calc;dur=4.5, rows;desc="1000")"""
+        parts = []
+        for stage, (seconds, count) in self.stages.items():
+            part = f"{stage};dur={seconds * 1000:.2f}"
+            if count > 1:
+                part += f';desc="{count}x"'
+            parts.append(part)
+        for name, value in self.counts.items():
+            parts.append(f'{name};desc="{value}"')
+        if total is not None:
+            parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+
+# 현재 요청의 RequestTimings (asyncio task / 스레드마다 따로, 미리 받는 페이지 task에도 그대로 복사됨)
+_current = ContextVar("pay_request_timings", default=None)
+
+
+def start_request() -> tuple:
+    """요청 시작: 새 RequestTimings를 현재 context에 설정 → (timings, 되돌릴 token)"""
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def current_timings():
+    return _current.get()
+
+
+class _Span:
+    __slots__ = ("stage", "timings", "started")
+
+    def __init__(self, stage: str, timings: RequestTimings):
+        self.stage = stage
+        self.timings = timings
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timings.add_time(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(stage: str):
+    """with span("fetch"): ... → 현재 요청의 단계 시간에 더함 (측정이 꺼져 있거나 요청 밖이면 아무것도 안 함)"""
+    if not METRICS_ENABLED:
+        return _NULL_SPAN
+    timings = _current.get()
+    if timings is None:
+        return _NULL_SPAN
+    return _Span(stage, timings)
+
+
+def add_time(stage: str, seconds: float):
+    """직접 잰 시간을 단계에 더함 (row마다 with를 쓰기엔 아까운 반복문용)"""
+    if METRICS_ENABLED:
+        timings = _current.get()
+        if timings is not None:
+            timings.add_time(stage, seconds)
+
+
+def add_count(name: str, value: int):
+    """현재 요청 카운터(row 수 등)에 더함"""
+    if METRICS_ENABLED:
+        timings = _current.get()
+        if timings is not None:
+            timings.add_count(name, value)
+
+
+#전체 누적 (Prometheus)
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value: float = 1, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + value
+
+    def value(self, *label_values) -> float:
+        return self._values.get(label_values, 0)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # 라벨 값 → [구간별 개수..., 합계, 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, *label_values) -> int:
+        series = self._series.get(label_values)
+        return series[-1] if series else 0
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                le = _format_labels(self.labels, label_values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _format_labels(self.labels, label_values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {series[-1]}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {series[-2]}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _register(metric):
+    with _registry_lock:
+        existing = _registry.get(metric.name)
+        if existing is not None:
+            return existing
+        _registry[metric.name] = metric
+        return metric
+
+
+def counter(name: str, help: str, labels: tuple = ()) -> Counter:
+    """이름으로 등록된 Counter (이미 있으면 그것을 반환)"""
+    return _register(Counter(name, help, labels))
+
+
+def histogram(name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+    """이름으로 등록된 Histogram (이미 있으면 그것을 반환)"""
+    return _register(Histogram(name, help, labels, buckets))
+
+
+def render_prometheus() -> str:
+    """등록된 모든 지표 → Prometheus 텍스트 형식 (GET /metrics)"""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+REQUEST_SECONDS = histogram(
+    "pay_request_duration_seconds", "요청 처리 시간 (응답 헤더까지)", ("method", "path", "status")
+)
+STAGE_SECONDS = histogram(
+    "pay_stage_duration_seconds", "요청 하나에서 단계별로 쓴 시간 합계", ("path", "stage")
+)
+ROWS_FETCHED = counter("pay_rows_fetched_total", "Supabase에서 받은 i_entry row 수", ("path",))
+BYTES_FETCHED = counter("pay_bytes_fetched_total", "Supabase에서 받은 응답 본문 바이트 수", ("path",))
+
+
+def record_request(timings: RequestTimings, method: str, path: str, status: int, total: float):
+    """요청 하나의 기록을 전체 히스토그램 / 카운터에 누적"""
+    REQUEST_SECONDS.observe(total, method, path, str(status))
+    for stage, (seconds, _) in timings.stages.items():
+        STAGE_SECONDS.observe(seconds, path, stage)
+    if "rows" in timings.counts:
+        ROWS_FETCHED.inc(timings.counts["rows"], path)
+    if "bytes" in timings.counts:
+        BYTES_FETCHED.inc(timings.counts["bytes"], path)
+
+
+#ASGI 미들웨어
+
+class StageTimingMiddleware:
+    """
+    요청마다 RequestTimings를 열고, 응답 헤더를 보낼 때 Server-Timing을 붙이고, 끝나면 히스토그램에 누적
+    측정이 꺼져 있거나 /metrics 요청이면 그대로 통과 (BaseHTTPMiddleware와 달리 추가 task / 본문 복사 없음)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not METRICS_ENABLED or scope["type"] != "http" or scope.get("path") == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = start_request()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total = time.perf_counter() - timings.started
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing(total).encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_request(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"  # 라벨 수가 늘지 않도록 경로 템플릿으로
+            record_request(timings, scope.get("method", ""), path, status, time.perf_counter() - timings.started)
@@ -0,0 +1,183 @@
+import csv
+import io
+import json
+
+from utils.calculator import (
+    MODES,
+    add_pay_totals,
+    calculate_final_pay,
+    calculate_final_pay_preview,
+    finalize_pay_totals,
+    summarize_week,
+    to_shift_record,
+)
+
+# 일별 급여 내역 내보내기 (/calculate/export)
+
+"""코드 요약:
+calculate_custom_pay는 calculate_final_pay의 row별 결과를 합계만 남기고 버려서,
+일별 내역이 필요하면 하루짜리 범위로 /calculate를 계속 호출해야 했음
+→ 날짜순으로 들어오는 row를 받으면서 row(근무) 한 줄씩 + 주마다 주휴수당 한 줄 + 마지막에 합계 한 줄을
+  NDJSON 또는 CSV로 만들어 바로 내보냄
+→ 세율(주 15시간 기준)은 그 주 전체가 있어야 정해지므로 "현재 주"의 row만 들고 있다가
+  다음 주 row가 들어오는 순간 그 주를 계산해서 내보내고 버림 → 메모리는 한 주치만 사용 (StreamingPayCalculator와 같음)
+→ 주 묶음은 calculate_custom_pay와 같이 넘겨받은 row 전체 기준 (사용자별로 나누려면 user_id로 조회)
+→ 줄 종류 (type)
+  - "shift"  : row 하나 (base / night / overtime / holiday / gross / tax / net)
+  - "week"   : 한 주 (주간 근무시간 hours, weekly_allowance), standard 모드에서만
+               userId는 그 주 row가 모두 한 사용자일 때만 채움
+  - "total"  : 전체 합계, /calculate 결과와 같은 값 (gross = gross_with_allowance, net = net_with_allowance)
+  shift 줄의 gross/net + week 줄의 weekly_allowance를 모두 더하면 total 줄과 같음
+
+entry는 (date, id) 순서여야 함 (iter_entries_for_date_range(_async)가 그렇게 줌), 이미 내보낸 주가 다시 나오면 ValueError"""
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+# CSV 헤더 / NDJSON 키 순서 (줄 종류마다 없는 값은 CSV에서 빈 칸)
+EXPORT_COLUMNS = (
+    "type", "userId", "date", "week", "id", "startTime", "endTime", "hours",
+    "base", "night", "overtime", "holiday", "weekly_allowance", "gross", "tax", "net",
+)
+
+
+def format_minutes(minutes: int) -> str:
+    """자정 기준 분 → "HH:MM" (자정 넘긴 종료 시각은 다음날 시각으로)"""
+    return f"{minutes // 60 % 24:02d}:{minutes % 60:02d}"
+
+
+class PayExporter:
+    """
+    row를 add()로 하나씩 넣으면 다 계산된 줄을 인코딩된 문자열 조각으로 돌려줌
+    header() → add(row) ... → finish() 순서로 호출해서 나온 조각을 그대로 이어 붙이면 파일 하나
+    """
+
+    def __init__(self, mode: str = "standard", fmt: str = "ndjson"):
+        if mode not in MODES:
+            raise ValueError("Invalid mode")
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError("Invalid format")
+        self.mode = mode
+        self.fmt = fmt
+        self._acc = {}
+        self._hours = 0
+        self._week_key = None
+        self._week_rows = []  # 현재 주 ShiftRecord
+        self._done_weeks = set()
+        self._buffer = io.StringIO()
+        self._csv = csv.DictWriter(self._buffer, EXPORT_COLUMNS, lineterminator="\n") if fmt == "csv" else None
+
+    def header(self) -> str:
+        if self._csv is None:
+            return ""
+        self._csv.writeheader()
+        return self._take()
+
+    def add(self, row) -> str:
+        record = to_shift_record(row)
+        if record.week_key != self._week_key:
+            self._flush()
+            if record.week_key in self._done_weeks:
+                raise ValueError(f"entries must be sorted by date (week {record.week_key} appeared again)")
+            self._week_key = record.week_key
+        self._week_rows.append(record)
+        return self._take()
+
+    def finish(self) -> str:
+        self._flush()
+        total = finalize_pay_totals(self._acc)
+        self._write({
+            "type": "total",
+            "hours": self._hours / 100,
+            "base": total["base"],
+            "night": total["night"],
+            "overtime": total["overtime"],
+            "holiday": total["holiday"],
+            "weekly_allowance": total["weekly_allowance"],
+            "gross": total["gross_with_allowance"],
+            "tax": total["tax"],
+            "net": total["net_with_allowance"],
+        })
+        return self._take()
+
+    def _flush(self):
+        """현재 주를 계산해서 버퍼에 쓰고 버림"""
+        if self._week_rows:
+            self._write_week(self._week_rows)
+            self._done_weeks.add(self._week_key)
+        self._week_rows = []
+
+    def _write_week(self, records: list):
+        week = summarize_week(records, self._week_key)  # 주간 합계 / 세율은 주마다 한 번만
+        totals = dict.fromkeys(("base", "night", "overtime", "holiday", "tax", "net"), 0)
+        self._hours += week.total_centihours
+
+        for record in week.records:
+            if self.mode == "standard":
+                result = calculate_final_pay(record, week)
+            else:
+                result = calculate_final_pay_preview(record)
+            gross = result["base"] + result["night"] + result["overtime"] + result["holiday"]
+            self._write({
+                "type": "shift",
+                "userId": record.user_id,
+                "date": record.date,
+                "week": self._week_key,
+                "id": record.id,
+                "startTime": format_minutes(record.start),
+                "endTime": format_minutes(record.end),
+                "hours": record.centihours / 100,
+                "base": result["base"],
+                "night": result["night"],
+                "overtime": result["overtime"],
+                "holiday": result["holiday"],
+                "gross": gross,
+                "tax": result.get("tax", 0),
+                "net": result["net"],
+            })
+            for key in totals:
+                totals[key] += result.get(key, 0)
+
+        totals["weekly_allowance"] = 0
+        if self.mode == "standard":
+            allowance = week.weekly_allowance
+            totals["weekly_allowance"] = allowance
+            user_ids = {record.user_id for record in week.records}
+            self._write({
+                "type": "week",
+                "userId": user_ids.pop() if len(user_ids) == 1 else None,
+                "week": self._week_key,
+                "hours": week.total_hours,
+                "weekly_allowance": allowance,
+                "gross": allowance,
+                "tax": 0,
+                "net": allowance,
+            })
+        add_pay_totals(self._acc, totals)
+
+    def _write(self, line: dict):
+        if self._csv is not None:
+            self._csv.writerow(line)
+        else:
+            self._buffer.write(json.dumps(line, ensure_ascii=False, separators=(",", ":")))
+            self._buffer.write("\n")
+
+    def _take(self) -> str:
+        text = self._buffer.getvalue()
+        if text:
+            self._buffer.seek(0)
+            self._buffer.truncate()
+        return text
+
+
+def iter_pay_export(rows, mode: str = "standard", fmt: str = "ndjson"):
+    """날짜순 iterable → 내보내기 문자열 조각 generator (스크립트용, 주 단위로 조각이 나옴)"""
+    exporter = PayExporter(mode, fmt)
+    chunk = exporter.header()
+    if chunk:
+        yield chunk
+    for row in rows:
+        chunk = exporter.add(row)
+        if chunk:
+            yield chunk
+    yield exporter.finish()
@@ -0,0 +1,176 @@
+import argparse
+import json
+import os
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.calculator import MODES, ShiftRecord, calculate_custom_pay, compile_entries
+
+# 회사 전체 월말 정산: 사용자별로 나눠서 여러 프로세스로 병렬 계산
+
+"""코드 요약:
+/calculate/batch도 결국 한 프로세스 한 코어에서 사용자마다 calculate_custom_pay를 차례로 돌림
+→ entry를 사용자 단위로 나누고(주휴수당·세금이 주 전체에 의존하므로 한 사용자의 주는 절대 쪼개지 않음)
+  사용자 여러 명씩 묶은 작업을 ProcessPoolExecutor에 분배한 뒤 결과 dict를 합침
+→ 프로세스 사이로는 dict row 대신 컬럼 배열(array)로 압축한 PackedShifts만 보냄 (pickle 크기/시간 절약)
+
+라이브러리: run_payroll(entries, mode, workers)
+CLI: 프로젝트 루트에서
+    python -m utils.payroll_run --start 2025-05-01 --end 2025-05-31 --workers 4 [--users a,b] [--output out.json]"""
+
+DEFAULT_CHUNK_RECORDS = 50_000  # 작업 하나에 담는 최대 entry 수 (사용자는 쪼개지 않음)
+
+
+class PackedShifts:
+    """
+    여러 사용자의 ShiftRecord를 컬럼 배열로 압축한 작업 단위
+    user_offsets[i] ~ user_offsets[i + 1] 범위가 user_ids[i]의 entry (원래 순서 유지)
+    """
+
+    __slots__ = ("user_ids", "user_offsets", "week_keys", "week_ids", "start", "end", "hours", "wage", "flags")
+
+    def __init__(self, user_records: list):
+        self.user_ids = []
+        self.user_offsets = array("q", [0])
+        self.week_keys = []
+        self.week_ids = array("i")
+        self.start = array("i")
+        self.end = array("i")
+        self.hours = array("d")
+        # 시급이 전부 정수면 정수 배열로 (int/float 타입까지 그대로 복원되도록)
+        all_int = all(isinstance(r.wage, int) for _, records in user_records for r in records)
+        self.wage = array("q" if all_int else "d")
+        self.flags = array("B")
+
+        week_index = {}
+        for user_id, records in user_records:
+            self.user_ids.append(user_id)
+            for r in records:
+                week_id = week_index.get(r.week_key)
+                if week_id is None:
+                    week_id = week_index[r.week_key] = len(self.week_keys)
+                    self.week_keys.append(r.week_key)
+                self.week_ids.append(week_id)
+                self.start.append(r.start)
+                self.end.append(r.end)
+                self.hours.append(r.hours)
+                self.wage.append(r.wage)
+                self.flags.append(r.flags)
+            self.user_offsets.append(len(self.flags))
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def __len__(self):
+        return len(self.flags)
+
+    def iter_users(self):
+        """(user_id, ShiftRecord 리스트) 복원"""
+        for i, user_id in enumerate(self.user_ids):
+            records = [
+                ShiftRecord(
+                    id=None,
+                    user_id=user_id,
+                    date=None,
+                    week_key=self.week_keys[self.week_ids[j]],
+                    start=self.start[j],
+                    end=self.end[j],
+                    hours=self.hours[j],
+                    wage=self.wage[j],
+                    flags=self.flags[j],
+                )
+                for j in range(self.user_offsets[i], self.user_offsets[i + 1])
+            ]
+            yield user_id, records
+
+
+def partition_by_user(entries) -> dict:
+    """entry들을 {userId: [ShiftRecord, ...]}로 나눔 (처음 등장한 사용자 순서, 사용자 안에서는 원래 순서)"""
+    by_user = {}
+    for record in compile_entries(entries):
+        by_user.setdefault(record.user_id, []).append(record)
+    return by_user
+
+
+def pack_chunks(by_user: dict, chunk_records: int = DEFAULT_CHUNK_RECORDS) -> list:
+    """사용자를 쪼개지 않고 chunk_records개 안팎씩 묶어서 PackedShifts 리스트로"""
+    chunks, current, size = [], [], 0
+    for user_id, records in by_user.items():
+        if current and size + len(records) > chunk_records:
+            chunks.append(PackedShifts(current))
+            current, size = [], 0
+        current.append((user_id, records))
+        size += len(records)
+    if current:
+        chunks.append(PackedShifts(current))
+    return chunks
+
+
+def compute_chunk(packed: PackedShifts, mode: str = "standard") -> dict:
+    """작업 하나 계산 (워커 프로세스에서 실행) → {userId: calculate_custom_pay 결과}"""
+    return {user_id: calculate_custom_pay(records, mode=mode) for user_id, records in packed.iter_users()}
+
+
+def run_payroll(entries, mode: str = "standard", workers: int = None,
+                chunk_records: int = DEFAULT_CHUNK_RECORDS) -> dict:
+    """
+    전체 entry → {userId: calculate_custom_pay 결과}
+    workers=1이면 현재 프로세스에서 순서대로, 아니면 ProcessPoolExecutor(max_workers=workers)
+    """
+    if mode not in MODES:
+        raise ValueError("Invalid mode")
+
+    by_user = partition_by_user(entries)
+    if workers == 1:
+        return {user_id: calculate_custom_pay(records, mode=mode) for user_id, records in by_user.items()}
+
+    workers = workers or os.cpu_count() or 1
+    # 워커마다 여러 작업이 돌아가도록 작업 크기를 줄여서 마지막 작업 하나가 늦게 끝나는 꼬리를 줄임
+    total = sum(len(records) for records in by_user.values())
+    chunk_records = max(1, min(chunk_records, -(-total // (workers * 4))))
+    chunks = pack_chunks(by_user, chunk_records)
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(compute_chunk, chunks, [mode] * len(chunks)):
+            results.update(partial)
+
+    # 처음 등장한 사용자 순서로 정렬해서 반환
+    return {user_id: results[user_id] for user_id in by_user}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="회사 전체 급여 일괄 계산 (프로세스 병렬)")
+    parser.add_argument("--start", required=True, help="시작 날짜 (예: 2025-05-01)")
+    parser.add_argument("--end", required=True, help="종료 날짜 (예: 2025-05-31)")
+    parser.add_argument("--mode", default="standard", choices=MODES)
+    parser.add_argument("--users", default=None, help="쉼표로 구분한 userId (없으면 범위 안 전체 사용자)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--output", default=None, help="결과 JSON 파일 경로 (없으면 stdout)")
+    args = parser.parse_args(argv)
+
+    from utils.calculator import iter_entries_for_date_range, iter_entries_for_users
+
+    if args.users:
+        rows = iter_entries_for_users(args.users.split(","), args.start, args.end)
+    else:
+        rows = iter_entries_for_date_range(args.start, args.end)
+
+    results = run_payroll(rows, mode=args.mode, workers=args.workers)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False)
+    else:
+        json.dump(results, sys.stdout, ensure_ascii=False)
+        sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
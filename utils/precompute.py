@@ -0,0 +1,416 @@
+import asyncio
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+from utils.calculator import DEFAULT_PAGE_SIZE, MODES, calculate_custom_pay, compile_entries
+from utils.live_preview import local_now
+from utils.metrics import counter
+from utils.resilience import FetchError
+from utils.result_cache import add_change_listener, cache_key, remove_change_listener
+from utils.single_flight import get_single_flight
+
+# 이번 달 / 지난 달 급여 스냅샷 미리 계산 (백그라운드 스케줄러)
+
+"""코드 요약:
+/calculate 요청 대부분은 "이번 달 지금까지" 또는 "지난 달" 범위인데,
+결과 캐시는 누군가 한 번 요청해서 계산한 뒤에야 채워지고 TTL이 지나면 다시 처음부터 계산함
+→ 백그라운드 작업이 주기적으로(+ i_entry 변경 후) 활성 사용자(기간 안에 entry가 있는 사용자)의
+  다음 범위 결과를 standard / preview 둘 다 미리 계산해서 버전 붙은 스냅샷으로 보관
+  - 지난 달 전체 (1일 ~ 말일)
+  - 이번 달 전체 (1일 ~ 말일)
+  - 이번 달 오늘까지 (1일 ~ 오늘)
+  사용자 지정 없는(user_id=None) 같은 범위 결과도 같이 보관
+→ /calculate는 (user_id, 기간, mode)가 스냅샷과 정확히 같으면 바로 반환, 아니면 기존처럼 계산
+→ i_entry가 바뀌면(handle_entry_change → change listener) 그 사용자 + 그 날짜가 포함된 스냅샷을 지우고
+  그 사용자만 다시 계산하도록 예약 (사용자 지정 없는 스냅샷은 다음 주기에 다시 계산)
+
+포그라운드 요청을 굶기지 않도록
+- 진행 중인 /calculate 계산(single-flight "calculate")이 있으면 끝날 때까지 기다렸다가 진행
+- 계산(compile_entries / calculate_custom_pay)은 스레드풀(run_in_executor)에서 → 이벤트 루프를 막지 않음
+- 사용자 계산은 초당 PAY_PRECOMPUTE_RATE명까지 (PAY_PRECOMPUTE_CHUNK명씩 계산한 뒤 쉬어 감)
+- "이번 달 / 지난 달"은 PAY_TIMEZONE(기본 Asia/Seoul) 날짜 기준
+- Supabase 조회는 페이지 사이마다 같은 조건으로 쉬어 감
+
+main.py lifespan에서 PAY_PRECOMPUTE=1일 때 start_precompute() / stop_precompute()
+PAY_PRECOMPUTE_INTERVAL(초, 기본 300)마다 기간 전체의 버전(row 수 + 최신 updated_at)을 확인해서
+바뀌었을 때만 전체 다시 계산 (평소 갱신은 변경 알림으로), 상태는 /cache/stats의 "snapshots"
+변경 알림이 없으면 스냅샷이 수정을 놓치므로 main.py는 invalidation_configured()일 때만 시작 / 사용"""
+
+PRECOMPUTE_INTERVAL = float(os.getenv("PAY_PRECOMPUTE_INTERVAL", "300"))
+PRECOMPUTE_RATE = float(os.getenv("PAY_PRECOMPUTE_RATE", "50"))  # 초당 계산할 사용자 수
+PRECOMPUTE_CHUNK = int(os.getenv("PAY_PRECOMPUTE_CHUNK", "10"))  # 한 번에(양보 없이) 계산할 사용자 수
+CHANGE_DEBOUNCE = float(os.getenv("PAY_PRECOMPUTE_DEBOUNCE", "2"))  # 변경 알림 후 모아서 다시 계산할 때까지 대기(초)
+
+SNAPSHOT_HITS = counter("pay_snapshot_hits_total", "미리 계산한 스냅샷으로 응답한 /calculate 요청 수")
+SNAPSHOT_BUILDS = counter("pay_snapshot_builds_total", "백그라운드에서 계산한 스냅샷 수", ("trigger",))
+
+
+def local_today() -> date:
+    return local_now().date()
+
+
+def pay_periods(today: date = None) -> list:
+    """
+    미리 계산할 범위 [(start_date, end_date), ...] (지난 달 전체, 이번 달 전체, 이번 달 오늘까지)
+    today가 없으면 PAY_TIMEZONE(기본 Asia/Seoul) 기준 오늘 (서버 시간대와 무관)
+    """
+    today = today or local_today()
+    month_start = today.replace(day=1)
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+    prev_start = (month_start - timedelta(days=1)).replace(day=1)
+    periods = [
+        (prev_start.isoformat(), (month_start - timedelta(days=1)).isoformat()),
+        (month_start.isoformat(), (next_month - timedelta(days=1)).isoformat()),
+        (month_start.isoformat(), today.isoformat()),
+    ]
+    return list(dict.fromkeys(periods))  # 말일이면 "오늘까지"와 "전체"가 같음
+
+
+class Snapshot:
+    __slots__ = ("version", "built_at", "result")
+
+    def __init__(self, version: int, built_at: float, result: dict):
+        self.version = version
+        self.built_at = built_at
+        self.result = result
+
+
+class SnapshotStore:
+    """(user_id, start_date, end_date, mode) → Snapshot, 같은 키를 다시 계산할 때마다 version 증가"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._data = {}
+        self._versions = {}
+        self._generation = 0  # 무효화 전체 횟수 (user_id=None 스냅샷 기준)
+        self._all_generation = 0  # 사용자 지정 없는 무효화 횟수
+        self._user_generations = {}  # 사용자별 무효화 횟수
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple):
+        snapshot = self._data.get(key)
+        if snapshot is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        SNAPSHOT_HITS.inc(1)
+        return snapshot
+
+    def generation(self) -> tuple:
+        """
+        계산 전에 받아 두었다가 put()에 넘기면, 그 사이 그 사용자 스냅샷이 무효화됐을 때 저장을 건너뜀
+        (다른 사용자가 바뀐 것 때문에 전체 계산 결과를 버리지 않도록 사용자별로 비교)
+        """
+        with self._lock:
+            return self._generation, self._all_generation, dict(self._user_generations)
+
+    def _is_current(self, user_id, generation: tuple) -> bool:
+        if user_id is None:
+            return generation[0] == self._generation
+        return (generation[1] == self._all_generation
+                and generation[2].get(user_id, 0) == self._user_generations.get(user_id, 0))
+
+    def put(self, key: tuple, result: dict, generation: tuple = None) -> bool:
+        with self._lock:
+            if generation is not None and not self._is_current(key[0], generation):
+                return False  # 계산하는 동안 i_entry가 바뀜 → 오래된 결과일 수 있어서 저장 안 함
+            version = self._versions.get(key, 0) + 1
+            self._versions[key] = version
+            self._data[key] = Snapshot(version, time.time(), result)
+            return True
+
+    def invalidate(self, user_id=None, date: str = None) -> int:
+        """user_id/date에 해당하는 스냅샷 삭제 (둘 다 None이면 전부), result_cache.invalidate와 같은 규칙"""
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._all_generation += 1
+            else:
+                self._user_generations[user_id] = self._user_generations.get(user_id, 0) + 1
+            stale = [
+                key for key in self._data
+                # 사용자 지정 없이(None) 계산한 스냅샷은 누구 entry가 바뀌어도 영향 받음
+                if (user_id is None or key[0] is None or key[0] == user_id)
+                and (date is None or key[1] <= date <= key[2])
+            ]
+            for key in stale:
+                del self._data[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def retain(self, periods: list):
+        """달이 바뀌어서 더 이상 미리 계산하지 않는 범위의 스냅샷 정리"""
+        keep = set(periods)
+        with self._lock:
+            for key in [key for key in self._data if (key[1], key[2]) not in keep]:
+                del self._data[key]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "invalidations": self.invalidations,
+            "size": len(self._data),
+        }
+
+
+def compute_user_snapshots(records: list, periods: list) -> dict:
+    """
+    한 사용자(또는 전체)의 ShiftRecord(날짜순) → {(start_date, end_date, mode): calculate_custom_pay 결과}
+    범위마다 그 안의 entry만 골라서 계산 (/calculate와 같은 결과)
+    """
+    results = {}
+    for start_date, end_date in periods:
+        selected = [r for r in records if r.date is not None and start_date <= r.date <= end_date]
+        for mode in MODES:
+            results[(start_date, end_date, mode)] = calculate_custom_pay(selected, mode=mode)
+    return results
+
+
+class PrecomputeScheduler:
+    """
+    백그라운드 스냅샷 계산 작업
+    fetch(start_date, end_date, user_id) = i_entry row async iterator (기본: async_supabase 페이지 조회)
+    """
+
+    def __init__(self, store: SnapshotStore, fetch=None, interval: float = PRECOMPUTE_INTERVAL,
+                 rate: float = PRECOMPUTE_RATE, chunk: int = PRECOMPUTE_CHUNK, today=None, version=None):
+        self.store = store
+        self.interval = interval
+        self.rate = rate
+        self.chunk = max(1, chunk)
+        self.runs = 0
+        self.skipped = 0
+        self.failures = 0
+        self.last_run_at = None
+        self.last_run_seconds = None
+        self._fetch = fetch
+        self._version = version if version is not None or fetch is not None else _range_version
+        self._last_version = None  # 마지막 전체 계산 때의 (기간, 범위 버전)
+        self._pending_version = None
+        self._today = today or local_today
+        self._dirty_users = set()
+        self._wake = None
+        self._task = None
+
+    # 시작 / 종료
+
+    def start(self):
+        self._wake = asyncio.Event()
+        self._task = asyncio.ensure_future(self._loop())
+        add_change_listener(self.on_entry_change)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        remove_change_listener(self.on_entry_change)
+
+    def on_entry_change(self, user_id, date):
+        """change listener: 스냅샷을 지우고 그 사용자 다시 계산 예약 (user_id가 없으면 전체)"""
+        self.store.invalidate(user_id=user_id, date=date)
+        self._dirty_users.add(user_id)
+        if user_id is None:
+            self._last_version = None  # 어떤 row가 바뀌었는지 모름 → 버전이 같아도 다시 계산
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _loop(self):
+        next_full = 0.0
+        while True:
+            if self._dirty_users and time.monotonic() < next_full:
+                await asyncio.sleep(CHANGE_DEBOUNCE)  # 짧은 시간에 몰린 변경은 한 번에 처리
+                users, self._dirty_users = self._dirty_users, set()
+                if None not in users:
+                    try:
+                        await self.run_users(list(users))
+                    except FetchError:
+                        next_full = 0.0  # Supabase 장애 → 다음 전체 계산에서 같이 처리
+                else:
+                    next_full = 0.0  # 어떤 row가 바뀌었는지 모름 → 전체 다시 계산
+
+            if time.monotonic() >= next_full:
+                self._dirty_users.clear()
+                try:
+                    if await self._range_changed():
+                        await self.run_full()
+                    else:
+                        self.skipped += 1
+                except FetchError:
+                    self.failures += 1  # 다음 주기에 다시 시도 (그동안 스냅샷은 그대로)
+                next_full = time.monotonic() + self.interval
+
+            if not self._dirty_users:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), max(0.0, next_full - time.monotonic()))
+                except asyncio.TimeoutError:
+                    pass
+
+    # 계산
+
+    async def _range_changed(self) -> bool:
+        """
+        마지막 전체 계산 이후 기간 전체의 (row 수, 최신 버전)이 바뀌었는지 (가벼운 버전 쿼리 하나)
+        바뀌지 않았으면 주기 계산을 건너뜀 → 변경이 없을 때 두 달치 전체를 다시 가져오지 않음
+        """
+        if self._version is None:
+            return True
+        periods = pay_periods(self._today())
+        first = min(start for start, _ in periods)
+        last = max(end for _, end in periods)
+        try:
+            version = await self._version(first, last)
+        except FetchError:
+            raise
+        except Exception:  # 버전 컬럼이 없는 테이블 등 → 버전 비교 없이 매 주기 전체 계산
+            self._version = None
+            return True
+        current = (periods, version)
+        if current == self._last_version:
+            return False
+        self._pending_version = current
+        return True
+
+    async def run_full(self):
+        """활성 사용자 전체 + 사용자 지정 없는 범위 결과 다시 계산"""
+        started = time.monotonic()
+        pending_version, self._pending_version = self._pending_version, None
+        periods = pay_periods(self._today())
+        self.store.retain(periods)
+        generation = self.store.generation()
+        rows = await self._collect(periods, None)
+        records = await asyncio.get_running_loop().run_in_executor(None, compile_entries, rows)
+
+        by_user = {}
+        for record in records:
+            by_user.setdefault(record.user_id, []).append(record)
+        await self._build(by_user, periods, generation, "schedule")
+        await self._build({None: records}, periods, generation, "schedule")
+
+        if pending_version is not None and pending_version[0] == periods:
+            self._last_version = pending_version  # 계산 전에 구한 버전 (도중에 바뀌었으면 다음 주기에 다시 계산)
+        self.runs += 1
+        self.last_run_at = time.time()
+        self.last_run_seconds = round(time.monotonic() - started, 3)
+
+    async def run_users(self, user_ids: list):
+        """i_entry가 바뀐 사용자만 다시 계산"""
+        periods = pay_periods(self._today())
+        for user_id in user_ids:
+            generation = self.store.generation()
+            rows = await self._collect(periods, user_id)
+            records = await asyncio.get_running_loop().run_in_executor(None, compile_entries, rows)
+            await self._build({user_id: records}, periods, generation, "change")
+
+    async def _collect(self, periods: list, user_id) -> list:
+        first = min(start for start, _ in periods)
+        last = max(end for _, end in periods)
+        rows = []
+        async for row in self._iter_rows(first, last, user_id):
+            rows.append(row)
+        return rows
+
+    async def _iter_rows(self, start_date: str, end_date: str, user_id):
+        if self._fetch is not None:
+            async for row in self._fetch(start_date, end_date, user_id):
+                yield row
+            return
+
+        from utils.async_supabase import iter_entries_for_date_range_async
+
+        count = 0
+        async for row in iter_entries_for_date_range_async(start_date, end_date, user_id=user_id):
+            yield row
+            count += 1
+            if count % DEFAULT_PAGE_SIZE == 0:
+                await self._yield_to_foreground()  # 페이지 사이마다 포그라운드 요청에 양보
+
+    async def _build(self, by_user: dict, periods: list, generation: tuple, trigger: str):
+        loop = asyncio.get_running_loop()
+        delay = self.chunk / self.rate if self.rate > 0 else 0.0
+        users = list(by_user.items())
+        for i in range(0, len(users), self.chunk):
+            await self._yield_to_foreground()
+            for user_id, records in users[i:i + self.chunk]:
+                # 계산은 스레드풀에서 (이벤트 루프에서 돌리면 그동안 포그라운드 요청이 멈춤)
+                snapshots = await loop.run_in_executor(None, compute_user_snapshots, records, periods)
+                for (start_date, end_date, mode), result in snapshots.items():
+                    if self.store.put(cache_key(user_id, start_date, end_date, mode), result, generation):
+                        SNAPSHOT_BUILDS.inc(1, trigger)
+            await asyncio.sleep(delay)
+
+    async def _yield_to_foreground(self):
+        # /calculate 계산이 진행 중이면 끝날 때까지 기다림 (너무 오래 밀리지 않도록 최대 1초)
+        flight = get_single_flight("calculate")
+        waited = 0.0
+        while flight.stats()["inflight"] and waited < 1.0:
+            await asyncio.sleep(0.01)
+            waited += 0.01
+        await asyncio.sleep(0)
+
+    def stats(self) -> dict:
+        stats = self.store.stats()
+        stats.update(
+            running=self._task is not None and not self._task.done(),
+            runs=self.runs,
+            skipped=self.skipped,
+            failures=self.failures,
+            last_run_at=self.last_run_at,
+            last_run_seconds=self.last_run_seconds,
+            pending_users=len(self._dirty_users),
+            periods=pay_periods(self._today()),
+        )
+        return stats
+
+
+async def _range_version(start_date: str, end_date: str) -> tuple:
+    from utils.async_supabase import fetch_entry_version_async
+    from utils.etag import VERSION_COLUMN
+
+    return await fetch_entry_version_async(start_date, end_date, version_column=VERSION_COLUMN)
+
+
+_store = SnapshotStore()
+_scheduler = None
+
+
+def get_snapshot_store() -> SnapshotStore:
+    return _store
+
+
+def get_precompute_scheduler():
+    return _scheduler
+
+
+def start_precompute(fetch=None) -> PrecomputeScheduler:
+    """앱 시작(lifespan) 때 백그라운드 계산 시작"""
+    global _scheduler
+    _scheduler = PrecomputeScheduler(_store, fetch=fetch)
+    _scheduler.start()
+    return _scheduler
+
+
+async def stop_precompute():
+    global _scheduler
+    if _scheduler is not None:
+        await _scheduler.stop()
+    _scheduler = None
+
+
+def snapshot_stats() -> dict:
+    if _scheduler is not None:
+        return _scheduler.stats()
+    stats = _store.stats()
+    stats["running"] = False
+    return stats
@@ -0,0 +1,311 @@
+import cProfile
+import hmac
+import io
+import itertools
+import marshal
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import deque
+
+# 요청 단위 프로파일링 (관리자 요청 / 일부 트래픽 샘플링)
+
+"""코드 요약:
+/metrics의 단계별 시간으로는 calculator.py의 어느 줄이 느린지까지는 알 수 없음
+→ 요청 하나를 프로파일러 아래에서 실행하고 결과를 보관해 두는 ASGI 미들웨어
+- 관리자 요청: X-Profile: 1 (또는 ?profile=1) + X-Profile-Token 헤더가 PAY_PROFILE_TOKEN과 같을 때
+  → 응답에 X-Profile-Id 헤더, GET /profiles/{id}로 결과 조회 (같은 토큰 필요)
+  X-Profile: deterministic (또는 ?profile=deterministic)이면 cProfile도 같이 실행 (정확한 호출 수, 대신 느려짐)
+- 샘플링: PAY_PROFILE_SAMPLE_RATE 비율의 일반 요청을 샘플링 프로파일러로만 실행해서 보관 (응답은 그대로)
+  → 샘플러 스레드가 PAY_PROFILE_INTERVAL_MS마다 이벤트 루프 스레드의 호출 스택을 찍기만 하므로
+    요청 처리 자체에는 거의 영향이 없음
+- 결과 형식
+  - collapsed: "함수1;함수2;함수3 샘플수" 줄 (flamegraph.pl / speedscope에 그대로 넣을 수 있음), 프레임마다 파일:줄번호
+  - pstats   : pstats.Stats로 열 수 있는 파일 (deterministic이면 cProfile 결과, 아니면 샘플로 만든 통계)
+  - text     : pstats 누적 시간 순 상위 함수
+- 최근 PAY_PROFILE_KEEP개를 메모리에 보관, PAY_PROFILE_DIR을 지정하면 파일(.collapsed / .pstats)로도 저장
+
+PAY_PROFILING=1일 때만 동작 (기본 꺼짐), 프로파일은 한 번에 하나만 (실행 중이면 다른 요청은 그냥 통과)
+asyncio라서 요청이 I/O를 기다리는 동안 같은 루프에서 돌아간 다른 요청의 코드도 같이 잡힐 수 있음"""
+
+PROFILING_ENABLED = os.getenv("PAY_PROFILING") == "1"
+PROFILE_TOKEN = os.getenv("PAY_PROFILE_TOKEN", "")
+SAMPLE_RATE = float(os.getenv("PAY_PROFILE_SAMPLE_RATE", "0"))
+SAMPLE_INTERVAL = float(os.getenv("PAY_PROFILE_INTERVAL_MS", "2")) / 1000
+PROFILE_KEEP = int(os.getenv("PAY_PROFILE_KEEP", "50"))
+PROFILE_DIR = os.getenv("PAY_PROFILE_DIR", "")
+
+MAX_STACK_DEPTH = 128
+
+
+def check_profile_token(token) -> bool:
+    """관리자 토큰 확인 (PAY_PROFILE_TOKEN이 비어 있으면 항상 거부)"""
+    return bool(PROFILE_TOKEN) and token is not None and hmac.compare_digest(token, PROFILE_TOKEN)
+
+
+#샘플링 프로파일러
+
+def _frame_label(code, lineno: int, cwd: str) -> str:
+    filename = code.co_filename
+    # 프로젝트 파일은 상대 경로로 (utils/calculator.py:512), 라이브러리는 파일 이름만
+    if filename.startswith(cwd):
+        filename = os.path.relpath(filename, cwd)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{lineno})"
+
+
+class StackSampler:
+    """대상 스레드의 호출 스택을 interval마다 찍어서 (code, 줄번호) 스택별 개수를 셈"""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="pay-profile-sampler", daemon=True)
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        samples = self.samples
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                stack.append((frame.f_code, frame.f_lineno))
+                frame = frame.f_back
+            if stack:
+                key = tuple(reversed(stack))  # 바깥 → 안쪽
+                samples[key] = samples.get(key, 0) + 1
+
+
+def collapse_samples(samples: dict) -> str:
+    """샘플 → collapsed stack 형식 (샘플 수 많은 순)"""
+    cwd = os.getcwd()
+    lines = []
+    for stack, count in sorted(samples.items(), key=lambda item: -item[1]):
+        lines.append(";".join(_frame_label(code, lineno, cwd) for code, lineno in stack) + f" {count}")
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
+def stats_from_samples(samples: dict, interval: float) -> dict:
+    """
+    샘플 → pstats 형식 dict {(파일, 첫 줄, 함수): (호출수, 호출수, 자체 시간, 누적 시간, {호출한 함수: ...})}
+    호출 수 자리에는 샘플 수를 넣음 (샘플링이라 실제 호출 수는 알 수 없음)
+    """
+    def key(code):
+        return (code.co_filename, code.co_firstlineno, code.co_name)
+
+    own = {}
+    inclusive = {}
+    callers = {}
+    for stack, count in samples.items():
+        seen = set()
+        for i, (code, _) in enumerate(stack):
+            k = key(code)
+            if k not in seen:  # 재귀 호출은 누적 시간에 한 번만
+                seen.add(k)
+                inclusive[k] = inclusive.get(k, 0) + count
+            if i > 0:
+                edge = callers.setdefault(k, {})
+                parent = key(stack[i - 1][0])
+                edge[parent] = edge.get(parent, 0) + count
+        leaf = key(stack[-1][0])
+        own[leaf] = own.get(leaf, 0) + count
+
+    stats = {}
+    for k, total in inclusive.items():
+        n = own.get(k, 0)
+        edges = {
+            parent: (c, c, 0.0, c * interval)
+            for parent, c in callers.get(k, {}).items()
+        }
+        stats[k] = (total, total, n * interval, total * interval, edges)
+    return stats
+
+
+class _StatsSource:
+    """pstats.Stats(…)에 넘길 수 있는 객체 (create_stats + stats)"""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+#프로파일 보관
+
+class Profile:
+    def __init__(self, id: str, method: str, path: str, mode: str, reason: str):
+        self.id = id
+        self.method = method
+        self.path = path
+        self.mode = mode  # "sampling" / "deterministic"
+        self.reason = reason  # "admin" / "sampled"
+        self.created = time.time()
+        self.duration = 0.0
+        self.status = None
+        self.samples = {}
+        self.interval = SAMPLE_INTERVAL
+        self.cprofile_stats = None
+
+    def info(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "mode": self.mode,
+            "reason": self.reason,
+            "created": self.created,
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "samples": sum(self.samples.values()),
+        }
+
+    def stats(self) -> dict:
+        if self.cprofile_stats is not None:
+            return self.cprofile_stats
+        return stats_from_samples(self.samples, self.interval)
+
+    def collapsed(self) -> str:
+        return collapse_samples(self.samples)
+
+    def pstats_bytes(self) -> bytes:
+        # pstats.Stats.dump_stats와 같은 형식 (marshal된 stats dict)
+        return marshal.dumps(self.stats())
+
+    def text(self, limit: int = 40) -> str:
+        out = io.StringIO()
+        stats = pstats.Stats(_StatsSource(self.stats()), stream=out)
+        stats.sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+
+class ProfileStore:
+    """최근 maxlen개 프로파일 (넘치면 오래된 것부터 버림), directory를 주면 파일로도 저장"""
+
+    def __init__(self, maxlen: int = PROFILE_KEEP, directory: str = PROFILE_DIR):
+        self.maxlen = maxlen
+        self.directory = directory
+        self._profiles = {}
+        self._order = deque()
+        self._lock = threading.Lock()
+
+    def add(self, profile: Profile):
+        with self._lock:
+            self._profiles[profile.id] = profile
+            self._order.append(profile.id)
+            while len(self._order) > self.maxlen:
+                self._profiles.pop(self._order.popleft(), None)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            base = os.path.join(self.directory, profile.id)
+            with open(base + ".collapsed", "w", encoding="utf-8") as f:
+                f.write(profile.collapsed())
+            with open(base + ".pstats", "wb") as f:
+                f.write(profile.pstats_bytes())
+
+    def get(self, profile_id: str):
+        return self._profiles.get(profile_id)
+
+    def list(self) -> list:
+        with self._lock:
+            return [self._profiles[i].info() for i in reversed(self._order)]
+
+
+_store = ProfileStore()
+
+
+def get_profile_store() -> ProfileStore:
+    return _store
+
+
+def set_profile_store(store: ProfileStore):
+    global _store
+    _store = store
+
+
+#ASGI 미들웨어
+
+_active = threading.Lock()  # 프로파일은 한 번에 하나 (cProfile / 샘플러가 겹치지 않게)
+_ids = itertools.count(1)
+
+
+def _profile_request(scope) -> tuple:
+    """이 요청을 프로파일할지 → (mode, reason) 또는 (None, None)"""
+    headers = dict(scope.get("headers") or [])
+    flag = headers.get(b"x-profile", b"").decode("latin-1")
+    if not flag:
+        query = scope.get("query_string", b"").decode("latin-1")
+        for part in query.split("&"):
+            name, _, value = part.partition("=")
+            if name == "profile":
+                flag = value or "1"
+    if flag and flag != "0":
+        token = headers.get(b"x-profile-token", b"").decode("latin-1")
+        if check_profile_token(token):
+            return ("deterministic" if flag == "deterministic" else "sampling"), "admin"
+        # 토큰이 틀리면 프로파일 없이 평소처럼 처리 (관리자 기능이 있다는 것도 드러내지 않음)
+    if SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE:
+        return "sampling", "sampled"
+    return None, None
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not PROFILING_ENABLED or scope["type"] != "http" or scope.get("path", "").startswith("/profiles"):
+            await self.app(scope, receive, send)
+            return
+
+        mode, reason = _profile_request(scope)
+        if mode is None or not _active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(f"{int(time.time())}-{next(_ids)}", scope.get("method", ""), scope.get("path", ""), mode, reason)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                if reason == "admin":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-profile-id", profile.id.encode("latin-1")))
+                    message = dict(message, headers=headers)
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident()).start()
+        profiler = None
+        if mode == "deterministic":
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # 다른 프로파일러(디버거 등)가 이미 켜져 있음 → 샘플링만
+                profiler = None
+                profile.mode = "sampling"
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile.duration = time.perf_counter() - started
+            if profiler is not None:
+                profiler.disable()
+                profiler.create_stats()
+                profile.cprofile_stats = profiler.stats
+            sampler.stop()
+            profile.samples = sampler.samples
+            _active.release()
+            get_profile_store().add(profile)
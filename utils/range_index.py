@@ -0,0 +1,359 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+from utils.calculator import (
+    DEFAULT_MINIMUM_WAGE,
+    FLAG_WAGE_SET,
+    FLAG_WHOLIDAY,
+    FULL_TIME_CENTIHOURS,
+    MODES,
+    calculate_final_pay_preview,
+    calculate_tax_amount,
+    compile_entries,
+    finalize_pay_totals,
+    pay_amount,
+)
+from utils.result_cache import add_change_listener, invalidation_configured
+from utils.week_store import week_spans
+
+# 사용자별 일 단위 누적합 인덱스 (임의 기간 급여를 lookup 몇 번으로)
+
+"""코드 요약:
+프론트엔드는 "이번 주", "최근 14일", "이번 달", 직접 고른 기간처럼 서로 겹치는 범위로 /calculate를 계속 부름
+→ 사용자 한 명의 하루별 합계(기본급, 야간, 연장, 공휴일)를 Fenwick tree(누적합 트리)에 넣어 두면
+  어떤 기간이든 prefix(끝) - prefix(시작) 두 번의 조회로 합계가 나옴 (preview 순액 = 네 항목의 합)
+→ 주휴수당·세금은 주 전체에 의존하므로 주 단위 Fenwick tree를 따로 둠
+  범위 안에 온전히 들어간 주들은 주 단위 tree 두 번 조회, 양 끝에 걸친 일부 주(최대 2개, 각 7일 이하)만
+  그 날짜들의 하루 합계로 다시 계산 (calculate_custom_pay가 범위 안 entry만으로 계산하는 것과 같음)
+→ 하루가 바뀌면 그날 값과 그 주 값만 O(log n)으로 갱신 (전체 재구성 없음)
+
+하루마다 보관하는 것: 기본급/야간/연장/공휴일 합계, 세율별(9%, 3.3%) 세금 합계, 근무시간 합계(centihours),
+wHoliday 여부, 그날 마지막 주휴 시급
+결과는 calculate_custom_pay와 같음 (주휴 시급은 "마지막 row" 기준이라 rows가 날짜순일 때, 페이지 조회 결과가 그렇듯)
+
+PAY_RANGE_INDEX=1이고 변경 알림 경로(realtime / webhook)가 있으면 /calculate(user_id 지정, python 엔진)가 사용
+(알림 없이 쓰면 수정이 프로세스가 끝날 때까지 반영되지 않으므로 결과 캐시와 같은 조건)
+i_entry가 바뀌면 그날만 stale로 표시 → 다음 조회 때 그 하루만 다시 가져와서 set_day
+알림을 놓쳐도 오래 남지 않도록 적재 후 PAY_RANGE_INDEX_TTL초(기본 3600)가 지나면 기간 전체를 다시 load"""
+
+DAY_TOTAL_KEYS = ("base", "night", "overtime", "holiday")
+
+
+class FenwickTree:
+    """정수 배열의 구간 합 / 한 칸 갱신을 O(log n)으로 (인덱스 0부터)"""
+
+    __slots__ = ("size", "_tree")
+
+    def __init__(self, values):
+        # O(n) 초기화: 각 칸을 자기 부모에 한 번씩 더함
+        self.size = len(values)
+        tree = [0] + list(values)
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def add(self, index: int, delta: int):
+        i = index + 1
+        while i <= self.size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix(self, count: int) -> int:
+        """앞에서부터 count칸의 합"""
+        total = 0
+        i = count
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def range_sum(self, lo: int, hi: int) -> int:
+        """[lo, hi) 구간 합"""
+        if hi <= lo:
+            return 0
+        return self.prefix(hi) - self.prefix(lo)
+
+
+class PayRangeIndex:
+    """first_date ~ last_date(포함) 기간의 일 단위 / 주 단위 누적합 인덱스 (사용자 한 명 기준)"""
+
+    def __init__(self, first_date: str, last_date: str):
+        self.first_date = first_date
+        self.last_date = last_date
+        self.loaded = False
+        self.loaded_at = None
+        self._origin = date.fromisoformat(first_date).toordinal()
+        n_days = date.fromisoformat(last_date).toordinal() - self._origin + 1
+        if n_days <= 0:
+            raise ValueError("last_date must not be before first_date")
+
+        self._n_days = n_days
+        self._reset_days()
+
+        # 주 단위 구조: 하루 → 주 번호, 주 번호 → (첫 날, 마지막 날, 달력상 주 전체가 인덱스 안인지)
+        self._day_week = []
+        self._weeks = []
+        for _, first, last, full in week_spans(first_date, last_date):
+            lo, hi = self._day(first), self._day(last)
+            self._weeks.append((lo, hi, full))
+            self._day_week.extend([len(self._weeks) - 1] * (hi - lo + 1))
+
+        self._day_trees = [FenwickTree([0] * n_days) for _ in DAY_TOTAL_KEYS]
+        self._week_tax = FenwickTree([0] * len(self._weeks))
+        self._week_allowance = FenwickTree([0] * len(self._weeks))
+        self._week_values = [(0, 0)] * len(self._weeks)  # 주 번호 → (세금, 주휴수당)
+
+        self._stale = set()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _reset_days(self):
+        # 하루별 값 (인덱스 = 날짜 - first_date)
+        n_days = self._n_days
+        self._day_totals = [(0, 0, 0, 0)] * n_days
+        self._centihours = [0] * n_days
+        self._tax_full = [0] * n_days  # 주 15시간 이상일 때 세금 (9%)
+        self._tax_part = [0] * n_days  # 15시간 미만일 때 세금 (3.3%)
+        self._wholiday = bytearray(n_days)
+        self._allowance_wage = [None] * n_days
+
+    def _day(self, date_str: str) -> int:
+        return date.fromisoformat(date_str).toordinal() - self._origin
+
+    def covers(self, start_date: str, end_date: str) -> bool:
+        return self.first_date <= start_date and end_date <= self.last_date
+
+    #하루 값 계산
+
+    def _set_day_values(self, day: int, records: list):
+        totals = [0, 0, 0, 0]
+        total_centihours, tax_full, tax_part = 0, 0, 0
+        wholiday, allowance_wage = 0, None
+        for record in records:
+            pay = calculate_final_pay_preview(record)
+            totals[0] += pay["base"]
+            totals[1] += pay["night"]
+            totals[2] += pay["overtime"]
+            totals[3] += pay["holiday"]
+            total_centihours += record.centihours
+            tax_full += calculate_tax_amount(pay["net"], True)
+            tax_part += calculate_tax_amount(pay["net"], False)
+            if record.flags & FLAG_WHOLIDAY:
+                wholiday = 1
+                if record.flags & FLAG_WAGE_SET:
+                    allowance_wage = record.wage
+
+        self._day_totals[day] = tuple(totals)
+        self._centihours[day] = total_centihours
+        self._tax_full[day] = tax_full
+        self._tax_part[day] = tax_part
+        self._wholiday[day] = wholiday
+        self._allowance_wage[day] = allowance_wage
+
+    def _week_components(self, lo: int, hi: int) -> tuple:
+        """[lo, hi] 날짜들만으로 계산한 (세금, 주휴수당) (summarize_week / calculate_week_pay와 같은 규칙)"""
+        apply = False
+        wage = DEFAULT_MINIMUM_WAGE
+        for day in range(lo, hi + 1):
+            if self._wholiday[day]:
+                apply = True
+            if self._allowance_wage[day] is not None:
+                wage = self._allowance_wage[day]
+
+        full_time = sum(self._centihours[lo:hi + 1]) >= FULL_TIME_CENTIHOURS
+        tax_by_day = self._tax_full if full_time else self._tax_part
+        tax = sum(tax_by_day[lo:hi + 1])
+        allowance = pay_amount(8, wage, 1) if apply and full_time else 0
+        return tax, allowance
+
+    def _refresh_week(self, week: int):
+        lo, hi, _ = self._weeks[week]
+        tax, allowance = self._week_components(lo, hi)
+        old_tax, old_allowance = self._week_values[week]
+        self._week_tax.add(week, tax - old_tax)
+        self._week_allowance.add(week, allowance - old_allowance)
+        self._week_values[week] = (tax, allowance)
+
+    #적재 / 갱신
+
+    def load(self, rows, generation: int = None):
+        """
+        기간 전체 rows(날짜순)로 인덱스를 한 번에 구성 (기간 밖 row는 무시)
+        generation은 rows를 가져오기 전에 받은 generation() → 그 사이 mark_stale()이 있었으면
+        이번 요청에는 구성한 값을 쓰되 loaded로 표시하지 않음 (다음 요청이 다시 load)
+        """
+        by_day = {}
+        for record in compile_entries(rows):
+            if record.date is None:
+                continue
+            day = self._day(record.date)
+            if 0 <= day < self._n_days:
+                by_day.setdefault(day, []).append(record)
+
+        with self._lock:
+            self._reset_days()
+            for day, records in by_day.items():
+                self._set_day_values(day, records)
+            self._day_trees = [
+                FenwickTree([totals[k] for totals in self._day_totals]) for k in range(len(DAY_TOTAL_KEYS))
+            ]
+            self._week_values = [self._week_components(lo, hi) for lo, hi, _ in self._weeks]
+            self._week_tax = FenwickTree([tax for tax, _ in self._week_values])
+            self._week_allowance = FenwickTree([allowance for _, allowance in self._week_values])
+            self.loaded = generation is None or generation == self._generation
+            self.loaded_at = time.monotonic()
+
+    def generation(self) -> int:
+        """다시 가져오기 전에 받아 두었다가 set_day()에 넘기면, 그 사이 또 바뀐 날은 stale로 남겨 둠"""
+        return self._generation
+
+    def set_day(self, date_str: str, rows, generation: int = None):
+        """하루치 rows로 그날 값을 교체 → 그날 + 그 주만 O(log n) 갱신"""
+        day = self._day(date_str)
+        records = [r for r in compile_entries(rows) if r.date is None or r.date == date_str]
+        with self._lock:
+            old = self._day_totals[day]
+            self._set_day_values(day, records)
+            for tree, before, after in zip(self._day_trees, old, self._day_totals[day]):
+                if after != before:
+                    tree.add(day, after - before)
+            self._refresh_week(self._day_week[day])
+            if generation is None or generation == self._generation:
+                self._stale.discard(day)
+
+    def mark_stale(self, date_str: str = None):
+        """그날 값을 다시 가져와야 함으로 표시 (date_str=None이면 기간 전체 → 다시 load 필요)"""
+        with self._lock:
+            self._generation += 1
+            if date_str is None:
+                self.loaded = False
+                return
+            day = self._day(date_str)
+            if 0 <= day < self._n_days:
+                self._stale.add(day)
+
+    def stale_days(self, start_date: str = None, end_date: str = None) -> list:
+        lo = self._day(start_date) if start_date else 0
+        hi = self._day(end_date) if end_date else self._n_days - 1
+        with self._lock:
+            days = sorted(day for day in self._stale if lo <= day <= hi)
+        return [date.fromordinal(self._origin + day).isoformat() for day in days]
+
+    #조회
+
+    def query(self, start_date: str, end_date: str, mode: str = "standard") -> dict:
+        """start_date ~ end_date의 calculate_custom_pay 결과 (인덱스 기간 안이어야 함)"""
+        if mode not in MODES:
+            raise ValueError("Invalid mode")
+        if not self.covers(start_date, end_date):
+            raise ValueError(f"range {start_date} ~ {end_date} is outside the index {self.first_date} ~ {self.last_date}")
+
+        lo, hi = self._day(start_date), self._day(end_date)
+        if hi < lo:
+            return finalize_pay_totals({})
+
+        with self._lock:
+            acc = {key: tree.range_sum(lo, hi + 1) for key, tree in zip(DAY_TOTAL_KEYS, self._day_trees)}
+            gross = sum(acc.values())
+            if mode == "preview":
+                acc["net"] = gross
+                return finalize_pay_totals(acc)
+
+            tax = allowance = 0
+            first_week, last_week = self._day_week[lo], self._day_week[hi]
+            full_lo, full_hi = first_week, last_week + 1
+            for week in sorted({first_week, last_week}):
+                week_lo, week_hi, full = self._weeks[week]
+                if full and lo <= week_lo and week_hi <= hi:
+                    continue
+                # 범위 양 끝에 걸친 주: 범위 안 날짜만으로 계산
+                part_tax, part_allowance = self._week_components(max(lo, week_lo), min(hi, week_hi))
+                tax += part_tax
+                allowance += part_allowance
+                if week == first_week:
+                    full_lo = week + 1
+                if week == last_week:
+                    full_hi = week
+            tax += self._week_tax.range_sum(full_lo, full_hi)
+            allowance += self._week_allowance.range_sum(full_lo, full_hi)
+
+        acc["tax"] = tax
+        acc["weekly_allowance"] = allowance
+        acc["net"] = gross - tax
+        return finalize_pay_totals(acc)
+
+
+def index_bounds(start_date: str, end_date: str) -> tuple:
+    """범위를 포함하는 인덱스 기간 (시작 연도 1월 1일 ~ 끝 연도 12월 31일) → 같은 해 안의 조회는 인덱스 하나로"""
+    first = min(start_date, end_date)[:4]
+    last = max(start_date, end_date)[:4]
+    return f"{first}-01-01", f"{last}-12-31"
+
+
+#사용자별 인덱스 보관
+
+RANGE_INDEX_ENABLED = os.getenv("PAY_RANGE_INDEX") == "1" and invalidation_configured()
+RANGE_INDEX_TTL = float(os.getenv("PAY_RANGE_INDEX_TTL", "3600"))  # 적재 후 이 시간이 지나면 다시 load
+MAX_INDEXES = int(os.getenv("PAY_RANGE_INDEX_MAXSIZE", "256"))  # 인덱스를 들고 있는 최대 사용자 수
+
+_indexes = OrderedDict()  # user_id → PayRangeIndex (LRU)
+_indexes_lock = threading.Lock()
+
+
+def get_range_index(user_id: str, start_date: str, end_date: str) -> PayRangeIndex:
+    """
+    범위를 포함하는 user_id의 인덱스 (없거나 범위 밖이면 새로 만든 빈 인덱스, loaded=False)
+    RANGE_INDEX_TTL이 지난 인덱스는 loaded=False로 돌려서 다시 적재하게 함
+    호출한 쪽이 loaded가 아니면 index.first_date ~ last_date rows로 load()
+    """
+    with _indexes_lock:
+        index = _indexes.get(user_id)
+        if index is None or not index.covers(start_date, end_date):
+            first, last = index_bounds(start_date, end_date)
+            if index is not None:
+                # 기존 기간과 합쳐서 넓힘
+                first, last = min(first, index.first_date), max(last, index.last_date)
+            index = _indexes[user_id] = PayRangeIndex(first, last)
+        _indexes.move_to_end(user_id)
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    if index.loaded and time.monotonic() - index.loaded_at >= RANGE_INDEX_TTL:
+        index.mark_stale(None)
+    return index
+
+
+def clear_range_indexes():
+    with _indexes_lock:
+        _indexes.clear()
+
+
+def _on_entry_change(user_id, date):
+    with _indexes_lock:
+        if user_id is None:
+            _indexes.clear()
+            return
+        index = _indexes.get(user_id)
+    if index is not None:
+        index.mark_stale(date)
+
+
+add_change_listener(_on_entry_change)
+
+
+def calculate_custom_pay_indexed(user_id: str, start_date: str, end_date: str, mode: str = "standard") -> dict:
+    """calculate_custom_pay(user_id의 범위 안 entry, mode)와 같은 결과 (동기 Supabase 조회)"""
+    from utils.calculator import iter_entries_for_date_range
+
+    index = get_range_index(user_id, start_date, end_date)
+    if not index.loaded:
+        generation = index.generation()
+        index.load(iter_entries_for_date_range(index.first_date, index.last_date, user_id=user_id), generation)
+    for day in index.stale_days(start_date, end_date):
+        generation = index.generation()
+        index.set_day(day, iter_entries_for_date_range(day, day, user_id=user_id), generation)
+    return index.query(start_date, end_date, mode)
@@ -0,0 +1,402 @@
+import asyncio
+import contextvars
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from utils.metrics import counter
+from utils.result_cache import add_change_listener
+
+# Supabase 조회 지연 꼬리(p99) 보호: 시간 제한 / 재시도 / hedged 요청 / circuit breaker / 마지막 정상 결과
+
+"""코드 요약:
+페이지 조회의 .execute()에는 시간 제한 / 재시도 / 대체 경로가 없어서,
+PostgREST 응답 하나가 늦으면 요청 전체가 같이 멈추고 DB가 1분만 느려도 그대로 p99가 됨
+→ ResilientFetcher.call(fn): Supabase 호출 하나를
+  - 시도마다 PAY_FETCH_TIMEOUT초, 재시도까지 합쳐서 PAY_FETCH_DEADLINE초 안에 끝내고
+  - 일시적인 오류(시간 초과, 연결 오류, 5xx)면 PAY_FETCH_RETRIES번까지 지수 backoff로 다시 시도
+  - PAY_FETCH_HEDGE_AFTER초가 지나도 응답이 없으면 같은 요청을 하나 더 보내서 먼저 온 응답을 씀 (기본 끔)
+  - 연속 PAY_CIRCUIT_FAILURES번 실패하면 PAY_CIRCUIT_RESET초 동안 바로 실패 (circuit open)
+    → 그 뒤 요청 하나만 시험으로 보내서 성공하면 다시 정상 (half-open)
+  실패는 FetchError(FetchTimeout / CircuitOpenError)로 통일 → main.py가 503으로 응답
+  call_sync(fn)은 동기 클라이언트용 (시도별 시간 제한은 httpx 요청 hook으로 적용, hedged 요청 없음)
+→ LastGoodStore: /calculate의 마지막 정상 결과를 (user, 기간, mode)별로 PAY_STALE_MAX_AGE초까지 보관
+  Supabase 조회가 실패(FetchError)했을 때, 또는 circuit이 열려 있을 때는 기다리지 않고 바로
+  마지막 정상 결과를 stale 표시해서 반환 (circuit이 열려 있으면 다시 계산은 백그라운드에서)
+  (계산이 느린 것만으로는 stale을 주지 않음, i_entry 변경 알림이 오면 결과 캐시와 같은 규칙으로 지움)
+
+오류 / 지연 주입은 benchmarks/fake_supabase.py (error_rate, slow_rate 등), 확인용 스크립트는 benchmarks/bench_resilience.py
+상태는 /cache/stats의 "fetch", 횟수는 /metrics의 pay_fetch_* / pay_stale_* 카운터"""
+
+FETCH_TIMEOUT = float(os.getenv("PAY_FETCH_TIMEOUT", "5"))
+FETCH_DEADLINE = float(os.getenv("PAY_FETCH_DEADLINE", "10"))
+FETCH_RETRIES = int(os.getenv("PAY_FETCH_RETRIES", "2"))
+FETCH_BACKOFF = float(os.getenv("PAY_FETCH_BACKOFF", "0.1"))
+HEDGE_AFTER = float(os.getenv("PAY_FETCH_HEDGE_AFTER", "0"))  # 0이면 hedged 요청 안 함
+CIRCUIT_FAILURES = int(os.getenv("PAY_CIRCUIT_FAILURES", "5"))
+CIRCUIT_RESET = float(os.getenv("PAY_CIRCUIT_RESET", "30"))
+STALE_MAXSIZE = int(os.getenv("PAY_STALE_MAXSIZE", "1024"))
+STALE_MAX_AGE = float(os.getenv("PAY_STALE_MAX_AGE", "300"))  # 이보다 오래된 결과는 대신 주지 않음 (0이면 stale 응답 끔)
+
+FETCH_ATTEMPTS = counter("pay_fetch_attempts_total", "Supabase 호출 시도 수", ("result",))
+FETCH_HEDGES = counter("pay_fetch_hedges_total", "응답이 늦어서 같은 요청을 하나 더 보낸 횟수")
+CIRCUIT_OPENED = counter("pay_circuit_opened_total", "연속 실패로 circuit이 열린 횟수")
+STALE_SERVED = counter("pay_stale_served_total", "마지막 정상 결과(stale)로 응답한 /calculate 요청 수", ("reason",))
+
+
+class FetchError(Exception):
+    """Supabase 조회 실패 (재시도 / 시간 제한을 다 써도 안 됨)"""
+
+
+class FetchTimeout(FetchError):
+    pass
+
+
+class CircuitOpenError(FetchError):
+    pass
+
+
+def is_transient(exc: BaseException) -> bool:
+    """다시 시도할 만한 오류인지 (시간 초과, 연결 오류, 서버 쪽 5xx / PostgreSQL 시스템 오류)"""
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    if type(exc).__module__.startswith(("httpx", "httpcore")):
+        import httpx
+
+        if isinstance(exc, httpx.HTTPStatusError):
+            return exc.response.status_code >= 500
+        return isinstance(exc, httpx.TransportError)
+    # postgrest APIError: code는 HTTP 상태 또는 PostgreSQL / PostgREST 오류 코드
+    code = str(getattr(exc, "code", "") or "")
+    return code.startswith(("5", "08", "PGRST00"))
+
+
+class CircuitBreaker:
+    """연속 failures번 실패하면 reset_after초 동안 열림, 그 뒤 시험 요청 하나가 성공하면 닫힘"""
+
+    def __init__(self, failures: int = CIRCUIT_FAILURES, reset_after: float = CIRCUIT_RESET):
+        self.failures = failures
+        self.reset_after = reset_after
+        self.state = "closed"
+        self.opened = 0
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """열려 있으면 CircuitOpenError (half-open이면 시험 요청 하나만 통과)"""
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_after:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return
+            raise CircuitOpenError("Supabase circuit is open")
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive = 0
+            self._probing = False
+            self.state = "closed"
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive += 1
+            if self.state == "half_open" or (self.state == "closed" and self._consecutive >= self.failures):
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self.opened += 1
+                CIRCUIT_OPENED.inc(1)
+            self._probing = False
+
+    def release_probe(self):
+        """시험 요청이 결과 없이 끝남(취소 등) → 성공 / 실패로 치지 않고 다음 요청이 다시 시험하게 함"""
+        with self._lock:
+            self._probing = False
+
+    def is_open(self) -> bool:
+        return self.state == "open"
+
+
+class ResilientFetcher:
+    def __init__(self, timeout: float = FETCH_TIMEOUT, deadline: float = FETCH_DEADLINE,
+                 retries: int = FETCH_RETRIES, backoff: float = FETCH_BACKOFF, hedge_after: float = HEDGE_AFTER,
+                 breaker: CircuitBreaker = None):
+        self.timeout = timeout
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff = backoff
+        self.hedge_after = hedge_after
+        self.breaker = breaker or CircuitBreaker()
+        self.calls = 0
+        self.retried = 0
+        self.hedges = 0
+        self.failed = 0
+
+    async def call(self, fn):
+        """fn() (코루틴 함수) 결과, 실패하면 FetchError"""
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            remaining = deadline - loop.time()
+            try:
+                result = await self._first_response(fn, min(self.timeout, remaining))
+            except Exception as exc:
+                delay = self._after_failure(exc, attempt, deadline - loop.time())
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # 요청이 취소됨(CancelledError 등) → half-open 시험 요청을 잡고 있으면 계속 열린 채로 남으므로 풀어 줌
+                self.breaker.release_probe()
+                raise
+            FETCH_ATTEMPTS.inc(1, "ok")
+            self.breaker.record_success()
+            return result
+
+    def call_sync(self, fn):
+        """
+        동기 버전 (hedged 요청 없음)
+        시도마다 min(timeout, 남은 deadline)을 attempt_timeout()으로 알려 줌
+        → 동기 Supabase 클라이언트의 httpx 요청 hook(apply_attempt_timeout)이 요청 timeout으로 적용
+        """
+        self.calls += 1
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            remaining = deadline - time.monotonic()
+            token = _attempt_timeout.set(max(0.001, min(self.timeout, remaining)))
+            try:
+                result = fn()
+            except Exception as exc:
+                delay = self._after_failure(exc, attempt, deadline - time.monotonic())
+                attempt += 1
+                time.sleep(delay)
+                continue
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+            finally:
+                _attempt_timeout.reset(token)
+            FETCH_ATTEMPTS.inc(1, "ok")
+            self.breaker.record_success()
+            return result
+
+    def _after_failure(self, exc: Exception, attempt: int, remaining: float) -> float:
+        """실패 기록 → 다시 시도할 대기 시간 반환, 더 시도하지 않으면 FetchError로 raise"""
+        if not is_transient(exc):
+            # 잘못된 쿼리(4xx) 등 → circuit과 무관, 다시 시도하지 않음
+            # (서버 상태는 알 수 없으므로 성공으로 치지 않고, half-open 시험 요청이었으면 자리만 풀어 줌)
+            FETCH_ATTEMPTS.inc(1, "error")
+            self.breaker.release_probe()
+            raise exc
+        timed_out = isinstance(exc, (TimeoutError, asyncio.TimeoutError))
+        FETCH_ATTEMPTS.inc(1, "timeout" if timed_out else "error")
+        self.breaker.record_failure()
+
+        delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+        if attempt >= self.retries or remaining <= delay or self.breaker.is_open():
+            self.failed += 1
+            error = FetchTimeout if timed_out else FetchError
+            raise error(f"Supabase fetch failed after {attempt + 1} attempt(s): {exc!r}") from exc
+        self.retried += 1
+        return delay
+
+    async def _first_response(self, fn, timeout: float):
+        """fn() 하나 시작, hedge_after초 안에 안 끝나면 하나 더 → 먼저 성공한 결과 (둘 다 실패하면 마지막 오류)"""
+        loop = asyncio.get_running_loop()
+        end = loop.time() + timeout
+        tasks = [asyncio.ensure_future(fn())]
+        try:
+            if 0 < self.hedge_after < timeout:
+                done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+                if not done:
+                    self.hedges += 1
+                    FETCH_HEDGES.inc(1)
+                    tasks.append(asyncio.ensure_future(fn()))
+
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, end - loop.time()), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError(f"no response within {timeout:.3f}s")
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                    # 취소된 쪽 오류를 꺼내 두어서 "exception was never retrieved" 경고 방지
+                    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "retried": self.retried,
+            "hedges": self.hedges,
+            "failed": self.failed,
+            "circuit": self.breaker.state,
+            "circuit_opened": self.breaker.opened,
+        }
+
+
+# call_sync가 시도마다 정하는 시간 제한(초), 동기 httpx 요청 hook이 읽음
+_attempt_timeout = contextvars.ContextVar("pay_fetch_attempt_timeout", default=None)
+
+
+def attempt_timeout():
+    """지금 call_sync 시도의 남은 시간(초), call_sync 밖이면 None"""
+    return _attempt_timeout.get()
+
+
+def apply_attempt_timeout(request):
+    """httpx 요청 event hook: call_sync 안에서 보내는 요청의 timeout을 남은 시간으로 줄임"""
+    timeout = _attempt_timeout.get()
+    if timeout is None:
+        return
+    current = request.extensions.get("timeout") or {}
+    request.extensions["timeout"] = {
+        name: timeout if current.get(name) is None else min(current[name], timeout)
+        for name in ("connect", "read", "write", "pool")
+    }
+
+
+_fetcher = None
+
+
+def get_fetcher() -> ResilientFetcher:
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = ResilientFetcher()
+    return _fetcher
+
+
+def set_fetcher(fetcher: ResilientFetcher):
+    """설정 교체 (테스트 / 벤치마크용)"""
+    global _fetcher
+    _fetcher = fetcher
+
+
+#마지막 정상 결과 (Supabase 장애 때만 대신 줌)
+
+class LastGoodStore:
+    """(user, 기간, mode) → (계산 시각, 결과), 결과 캐시와 같은 규칙으로 i_entry 변경 때 지움"""
+
+    def __init__(self, maxsize: int = STALE_MAXSIZE, max_age: float = STALE_MAX_AGE):
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self._data = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple):
+        """(결과, 경과 초), 없거나 max_age보다 오래됐으면 None"""
+        item = self._data.get(key)
+        if item is None:
+            return None
+        age = time.time() - item[0]
+        if age > self.max_age:
+            return None
+        return item[1], age
+
+    def generation(self) -> int:
+        return self._generation
+
+    def put(self, key: tuple, result, generation: int = None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return  # 계산하는 동안 i_entry가 바뀜 → 이미 지워진 결과를 되살리지 않음
+            self._data[key] = (time.time(), result)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, user_id=None, date: str = None) -> int:
+        with self._lock:
+            self._generation += 1
+            stale = [
+                key for key in self._data
+                if (user_id is None or key[0] is None or key[0] == user_id)
+                and (date is None or key[1] <= date <= key[2])
+            ]
+            for key in stale:
+                del self._data[key]
+            return len(stale)
+
+
+_last_good = LastGoodStore()
+
+
+def get_last_good() -> LastGoodStore:
+    return _last_good
+
+
+def _on_entry_change(user_id, date):
+    _last_good.invalidate(user_id=user_id, date=date)
+
+
+add_change_listener(_on_entry_change)
+
+
+def serve_stale(key: tuple, exc: FetchError, store: LastGoodStore = None):
+    """조회 실패(exc) 대신 줄 마지막 정상 결과 (결과, 경과 초), 없으면 None"""
+    stale = (store or get_last_good()).get(key)
+    if stale is not None:
+        STALE_SERVED.inc(1, "circuit_open" if isinstance(exc, CircuitOpenError) else "error")
+    return stale
+
+
+_refreshing = set()  # 백그라운드에서 다시 계산 중인 task (끝나기 전에 GC되지 않도록)
+
+
+async def with_stale_fallback(key: tuple, compute, store: LastGoodStore = None,
+                              breaker: CircuitBreaker = None) -> tuple:
+    """
+    compute (awaitable) 결과 → (결과, None)
+    circuit이 열려 있고 마지막 정상 결과가 있으면 기다리지 않고 바로 (마지막 결과, 경과 초),
+    compute는 백그라운드에서 계속 (circuit이 half-open이 되면 그게 시험 요청, 성공하면 store 갱신)
+    compute가 FetchError로 실패하고 마지막 정상 결과가 있으면 → (마지막 결과, 경과 초), 없으면 그대로 raise
+    느리기만 한 계산은 기다림 (시간 제한은 ResilientFetcher의 deadline, 계산 시간은 stale 기준에 넣지 않음)
+    """
+    store = store or get_last_good()
+    breaker = breaker or get_fetcher().breaker
+    generation = store.generation()
+
+    stale = store.get(key) if breaker.is_open() else None
+    if stale is not None:
+        task = asyncio.ensure_future(compute)
+        _refreshing.add(task)
+
+        def remember(t):
+            _refreshing.discard(t)
+            if not t.cancelled() and t.exception() is None:
+                store.put(key, t.result(), generation)
+
+        task.add_done_callback(remember)
+        STALE_SERVED.inc(1, "circuit_open")
+        return stale
+
+    try:
+        result = await compute
+    except FetchError as exc:
+        stale = serve_stale(key, exc, store)
+        if stale is None:
+            raise
+        return stale
+    store.put(key, result, generation)
+    return result, None
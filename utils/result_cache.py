@@ -0,0 +1,225 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# /calculate 계산 결과 캐시 (+ i_entry 변경 시 무효화)
+
+"""코드 요약:
+대시보드가 같은 (user, start_date, end_date, mode)로 /calculate를 계속 부르는데,
+매번 Supabase에서 다시 가져와서 처음부터 계산하고 있었음
+→ 계산 결과를 프로세스 안 LRU + TTL 캐시에 보관하고 hit/miss 개수를 셈
+→ i_entry가 바뀌면(INSERT/UPDATE/DELETE) 그 사용자 + 그 날짜가 포함된 범위의 결과만 지움
+  - Supabase realtime 변경 알림 구독 (start_realtime_invalidation, PAY_CACHE_REALTIME=1일 때)
+  - 또는 Database Webhook / 테스트용 가짜 백엔드가 handle_entry_change(payload)를 직접 호출
+
+ResultCache가 인터페이스 → 나중에 Redis 같은 공유 백엔드를 붙이려면 같은 메서드를 구현하면 됨
+set_result_cache()로 교체, PAY_CACHE_BACKEND=none이면 캐시 사용 안 함
+PAY_CACHE_BACKEND를 지정하지 않으면 변경 알림 경로(PAY_CACHE_REALTIME=1 또는 PAY_WEBHOOK_SECRET)가 있을 때만 memory"""
+
+
+def cache_key(user_id, start_date: str, end_date: str, mode: str) -> tuple:
+    # engine은 결과가 같으므로 키에서 제외
+    return (user_id, start_date, end_date, mode)
+
+
+class ResultCache:
+    """캐시 백엔드 인터페이스 (아무것도 저장하지 않는 기본 구현 = 캐시 끔)"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: tuple):
+        self.misses += 1
+        return None
+
+    def generation(self) -> int:
+        """계산 시작 전에 받아 두었다가 set()에 넘기면, 그 사이 무효화가 있었을 때 저장을 건너뜀"""
+        return 0
+
+    def set(self, key: tuple, value: dict, generation: int = None):
+        pass
+
+    def invalidate(self, user_id=None, date: str = None) -> int:
+        """user_id/date에 해당하는 결과 삭제 (둘 다 None이면 전부), 지운 개수 반환"""
+        return 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "invalidations": self.invalidations,
+            "size": 0,
+        }
+
+
+class InMemoryResultCache(ResultCache):
+    """프로세스 안 LRU + TTL 캐시"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        super().__init__()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evictions = 0
+        self._data = OrderedDict()  # key → (저장 시각, value)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and time.monotonic() - item[0] < self.ttl:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[1]
+            if item is not None:
+                del self._data[key]  # TTL 만료
+            self.misses += 1
+            return None
+
+    def generation(self) -> int:
+        return self._generation
+
+    def set(self, key: tuple, value: dict, generation: int = None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return  # 계산하는 동안 i_entry가 바뀜 → 오래된 결과일 수 있어서 저장 안 함
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id=None, date: str = None) -> int:
+        with self._lock:
+            self._generation += 1
+            if user_id is None and date is None:
+                removed = len(self._data)
+                self._data.clear()
+            else:
+                stale = [
+                    key for key in self._data
+                    # 사용자 지정 없이(None) 계산한 전체 범위 결과는 누구 entry가 바뀌어도 영향 받음
+                    if (user_id is None or key[0] is None or key[0] == user_id)
+                    and (date is None or key[1] <= date <= key[2])
+                ]
+                for key in stale:
+                    del self._data[key]
+                removed = len(stale)
+            self.invalidations += removed
+            return removed
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats.update(size=len(self._data), maxsize=self.maxsize, ttl=self.ttl, evictions=self.evictions)
+        return stats
+
+
+def invalidation_configured() -> bool:
+    """i_entry 변경 알림을 받을 경로가 있는지 (realtime 구독 또는 비밀값이 설정된 webhook)"""
+    return os.getenv("PAY_CACHE_REALTIME") == "1" or bool(os.getenv("PAY_WEBHOOK_SECRET"))
+
+
+def _create_cache_from_env() -> ResultCache:
+    # 변경 알림 없이 캐시하면 수정이 TTL 동안 안 보이므로, 알림 경로가 없으면 직접 켰을 때만 사용
+    backend = os.getenv("PAY_CACHE_BACKEND", "memory" if invalidation_configured() else "none")
+    if backend == "none":
+        return ResultCache()
+    if backend == "memory":
+        return InMemoryResultCache(
+            maxsize=int(os.getenv("PAY_CACHE_MAXSIZE", "1024")),
+            ttl=float(os.getenv("PAY_CACHE_TTL", "60")),
+        )
+    raise ValueError(f"Unknown PAY_CACHE_BACKEND: {backend}")
+
+
+_cache = None
+
+
+def get_result_cache() -> ResultCache:
+    global _cache
+    if _cache is None:
+        _cache = _create_cache_from_env()
+    return _cache
+
+
+def set_result_cache(cache: ResultCache):
+    """캐시 백엔드 교체 (공유 캐시 구현이나 테스트용)"""
+    global _cache
+    _cache = cache
+
+
+#i_entry 변경 → 캐시 무효화
+
+# 결과 캐시 말고도 i_entry 변경을 알아야 하는 곳(주 단위 합계 저장소 등)이 등록하는 콜백
+# callback(user_id, date), row 정보가 없으면 (None, None) = 전부
+_change_listeners = []
+
+
+def add_change_listener(callback):
+    if callback not in _change_listeners:
+        _change_listeners.append(callback)
+
+
+def remove_change_listener(callback):
+    if callback in _change_listeners:
+        _change_listeners.remove(callback)
+
+
+def _changed_records(payload: dict) -> list:
+    # realtime(postgres_changes) / Database Webhook 둘 다 처리
+    # realtime: {"data": {"record": {...}, "old_record": {...}, "type": "UPDATE", ...}}
+    # webhook : {"type": "UPDATE", "table": "i_entry", "record": {...}, "old_record": {...}}
+    data = payload.get("data", payload)
+    records = []
+    for key in ("record", "old_record", "new", "old"):
+        record = data.get(key)
+        if record:
+            records.append(record)
+    return records
+
+
+def handle_entry_change(payload: dict, cache: ResultCache = None) -> int:
+    """
+    i_entry 변경 알림 하나 처리 → 바뀐 row(변경 전/후)의 사용자·날짜가 포함된 결과 삭제
+    payload에 row 정보가 없으면 전부 삭제, 지운 개수 반환
+    등록된 change listener에도 같은 (user_id, date)를 알림
+    """
+    cache = cache or get_result_cache()
+    changes = [(record.get("userId"), record.get("date")) for record in _changed_records(payload)]
+    if not changes:
+        changes = [(None, None)]
+
+    removed = 0
+    for user_id, date in changes:
+        for callback in _change_listeners:
+            callback(user_id, date)
+        removed += cache.invalidate(user_id=user_id, date=date)
+    return removed
+
+
+async def start_realtime_invalidation():
+    """
+    Supabase realtime으로 i_entry 변경을 구독해서 handle_entry_change 호출
+    반환한 (client, channel)은 앱 종료 때 stop_realtime_invalidation에 넘김
+    """
+    from supabase import acreate_client
+
+    from utils.supabase_client import get_supabase_settings
+
+    url, key = get_supabase_settings()
+    client = await acreate_client(url, key)
+    channel = client.channel("i_entry-changes")
+    channel.on_postgres_changes("*", schema="public", table="i_entry", callback=handle_entry_change)
+    await channel.subscribe()
+    return client, channel
+
+
+async def stop_realtime_invalidation(subscription):
+    client, channel = subscription
+    await client.remove_channel(channel)
@@ -0,0 +1,92 @@
+import asyncio
+import os
+
+from utils.metrics import counter
+from utils.result_cache import add_change_listener
+
+# 동시에 들어온 같은 조회/계산 합치기 (single-flight)
+
+"""코드 요약:
+교대 시간 / 급여일에는 같은 범위의 /calculate가 같은 순간에 수십 개씩 들어오는데,
+결과 캐시는 첫 계산이 끝난 뒤에야 채워지므로 그 사이에 온 요청은 전부 각자 Supabase를 조회하고 다시 계산했음
+→ 같은 키로 진행 중인 작업이 있으면 새로 시작하지 않고 그 작업의 결과를 같이 기다림
+  - "calculate": /calculate 한 번의 조회 + 계산 전체 (키 = user, 기간, mode, engine)
+  - "fetch"    : i_entry 페이지 조회 하나 (키 = 쿼리 조건 전체, /calculate/batch, /calculate/export 등도 공유)
+→ 작업은 asyncio.shield로 감싸서, 먼저 온 요청이 끊겨도 같이 기다리는 요청에는 결과가 그대로 감
+→ 진행 중이던 작업이 끝나면 바로 잊음 (결과를 보관하지 않으므로 캐시처럼 오래된 값을 주지 않음)
+→ i_entry 변경 알림(handle_entry_change)이 오면 진행 중인 작업에 더 이상 합류하지 않음
+  (변경 전에 시작한 조회 결과를 변경 후에 온 요청이 받지 않도록, 이미 기다리던 요청은 그대로 받음)
+
+합친 요청 수는 /metrics의 pay_singleflight_* 카운터와 stats()로 확인
+PAY_SINGLE_FLIGHT=0이면 합치지 않음"""
+
+SINGLE_FLIGHT_ENABLED = os.getenv("PAY_SINGLE_FLIGHT", "1") != "0"
+
+CALLS = counter("pay_singleflight_calls_total", "single-flight를 거친 요청 수", ("flight",))
+COALESCED = counter("pay_singleflight_coalesced_total", "진행 중인 작업에 합류한 요청 수 (새로 실행하지 않음)", ("flight",))
+
+
+class SingleFlight:
+    def __init__(self, name: str, enabled: bool = None):
+        self.name = name
+        self.enabled = SINGLE_FLIGHT_ENABLED if enabled is None else enabled
+        self.calls = 0
+        self.coalesced = 0
+        self._inflight = {}  # key → 실행 중인 Task
+
+    async def do(self, key, fn):
+        """key로 진행 중인 작업이 있으면 그 결과를, 없으면 fn()을 실행해서 결과를 반환"""
+        if not self.enabled:
+            return await fn()
+
+        self.calls += 1
+        CALLS.inc(1, self.name)
+        task = self._inflight.get(key)
+        # 다른 이벤트 루프에서 만든 작업은 기다릴 수 없으므로 새로 실행 (TestClient 등 루프가 바뀌는 경우)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._finished(key, t))
+        else:
+            self.coalesced += 1
+            COALESCED.inc(1, self.name)
+        return await asyncio.shield(task)
+
+    def _finished(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # 기다리던 요청이 모두 끊긴 경우 "exception was never retrieved" 경고 방지
+
+    def forget(self):
+        """진행 중인 작업에 더 이상 합류하지 않게 함 (작업 자체와 이미 기다리는 요청은 그대로)"""
+        self._inflight.clear()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
+
+
+_flights = {}
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    flight = _flights.get(name)
+    if flight is None:
+        flight = _flights[name] = SingleFlight(name)
+    return flight
+
+
+def single_flight_stats() -> dict:
+    return {name: flight.stats() for name, flight in _flights.items()}
+
+
+def _on_entry_change(user_id, date):
+    for flight in _flights.values():
+        flight.forget()
+
+
+add_change_listener(_on_entry_change)
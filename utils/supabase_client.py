@@ -1,26 +1,73 @@
-from supabase import create_client
 import os
-from dotenv import load_dotenv
 
-# .env 파일을 불러와서 환경변수 등록
-load_dotenv()
+# Supabase 클라이언트는 처음 사용할 때 한 번만 생성해서 공유 (import 시점에는 I/O 없음)
+# → supabase 패키지 import, .env 파일 읽기, 클라이언트 생성 모두 get_supabase_client() 첫 호출 때 수행
+_client = None
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+# 동기 PostgREST 요청 하나의 시간 제한(초), async_supabase.REQUEST_TIMEOUT과 같은 환경변수
+# 재시도 / circuit breaker는 utils/resilience.py (call_sync), call_sync 안에서는 남은 deadline으로 더 줄어듦
+REQUEST_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "30"))
 
-# Supabase 클라이언트 생성
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+def get_supabase_settings() -> tuple:
+    """
+    .env 파일을 불러와서 (SUPABASE_URL, SUPABASE_KEY) 반환.
+    이미 설정된 환경변수는 덮어쓰지 않으므로, 테스트/벤치마크에서 로컬 가짜 서버 주소를 넣어둘 수 있음.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY")
+
+
+def get_supabase_client():
+    """
+    프로세스 전체에서 공유하는 Supabase 클라이언트를 반환.
+    처음 호출될 때 한 번만 생성하고, 이후에는 같은 객체를 재사용함.
+    """
+    global _client
+    if _client is None:
+        from supabase import ClientOptions, create_client
+
+        url, key = get_supabase_settings()
+        _client = create_client(url, key, options=ClientOptions(postgrest_client_timeout=REQUEST_TIMEOUT))
+        _install_attempt_timeout(_client)
+    return _client
+
+
+def _install_attempt_timeout(client):
+    """PostgREST 세션(httpx.Client)에 요청 hook 추가 → call_sync의 남은 deadline이 요청 timeout이 됨"""
+    from utils.resilience import apply_attempt_timeout
+
+    session = client.postgrest.session
+    hooks = session.event_hooks
+    session.event_hooks = {**hooks, "request": [*hooks.get("request", []), apply_attempt_timeout]}
+
+
+def reset_supabase_client():
+    """공유 클라이언트를 버림. 다음 get_supabase_client() 호출 때 새로 생성됨."""
+    global _client
+    _client = None
+
+
+def __getattr__(name):
+    # 예전 코드 호환용: `from utils.supabase_client import supabase` 도 지연 생성으로 동작
+    if name == "supabase":
+        return get_supabase_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 
 
 if __name__ == "__main__":
+    SUPABASE_URL, SUPABASE_KEY = get_supabase_settings()
+
     print("✅ Supabase 연결 테스트 시작")
     print("URL:", SUPABASE_URL)
     print("KEY 앞부분:", SUPABASE_KEY[:10])
 
     try:
-        res = supabase.table("i_entry").select("*").limit(1).execute()
+        res = get_supabase_client().table("i_entry").select("*").limit(1).execute()
         print("데이터 조회 성공 ✅", res.data)
     except Exception as e:
         print("❌ 에러 발생:", e)
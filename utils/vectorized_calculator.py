@@ -0,0 +1,159 @@
+from utils.calculator import (
+    DEFAULT_MINIMUM_WAGE,
+    FLAG_HOLIDAY,
+    FLAG_NIGHT,
+    FLAG_OVERTIME,
+    FLAG_WAGE_SET,
+    FLAG_WHOLIDAY,
+    FULL_TIME_CENTIHOURS,
+    FULL_TIME_TAX,
+    NIGHT_END_MINUTES,
+    NIGHT_START_MINUTES,
+    PART_TIME_TAX,
+    compile_entries,
+)
+
+# numpy는 선택 의존성: 없으면 engine="numpy"만 못 쓰고 기본(python) 엔진은 그대로 동작
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# NumPy 벡터화 급여 계산 엔진 (calculate_custom_pay(..., engine="numpy"))
+
+"""코드 요약:
+월말 정산처럼 entry가 아주 많을 때 row마다 파이썬으로 돌리는 대신,
+ShiftRecord들을 컬럼 배열(시작/종료 분, 시급, 플래그, 주차 id)로 바꾼 뒤
+기본급 / 야간 / 연장 / 공휴일 / 주휴 / 세금을 배열 연산 + 주차별 그룹 합계로 한 번에 계산
+
+결과는 파이썬 엔진(calculator.calculate_custom_pay)과 정수 단위까지 완전히 같아야 함
+→ 파이썬 엔진과 같은 정수 연산(step2-2): 근무시간은 centihours(1/100시간), 금액은 (정수 × 시급) // 분모
+→ int64 배열이라 float 오차가 없고, 주간 근무시간 합계도 정수라 더하는 순서와 상관없음
+→ 시급이 정수가 아닌 row가 있으면 Fraction 계산이 필요해서 파이썬 엔진으로 계산"""
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("numpy가 설치되어 있지 않아 engine='numpy'를 사용할 수 없음 (pip install numpy)")
+
+
+def _empty_result() -> dict:
+    return {
+        "base": 0,
+        "night": 0,
+        "overtime": 0,
+        "holiday": 0,
+        "weekly_allowance": 0,
+        "tax": 0,
+        "gross_with_allowance": 0,
+        "net_with_allowance": 0,
+    }
+
+
+def build_columns(records: list) -> dict:
+    """
+    ShiftRecord 리스트 → 컬럼 배열 dict (주차 id는 처음 등장한 순서대로 0, 1, 2 ...)
+    시급이 전부 정수일 때만 만듦 (아니면 None)
+    """
+    if not all(type(r.wage) is int for r in records):
+        return None
+
+    n = len(records)
+    week_index = {}
+    week_ids = np.empty(n, dtype=np.int64)
+    for i, r in enumerate(records):
+        week_ids[i] = week_index.setdefault(r.week_key, len(week_index))
+
+    return {
+        "start": np.fromiter((r.start for r in records), dtype=np.int64, count=n),
+        "end": np.fromiter((r.end for r in records), dtype=np.int64, count=n),
+        "wage": np.fromiter((r.wage for r in records), dtype=np.int64, count=n),
+        "flags": np.fromiter((r.flags for r in records), dtype=np.int64, count=n),
+        "week_ids": week_ids,
+        "n_weeks": len(week_index),
+    }
+
+
+def calculate_custom_pay_numpy(entries: list, mode: str = "standard") -> dict:
+    _require_numpy()
+
+    records = compile_entries(entries)
+    if not records:
+        return _empty_result()
+    if mode not in ("standard", "preview"):
+        raise ValueError("Invalid mode")
+
+    cols = build_columns(records)
+    if cols is None:
+        from utils.calculator import calculate_custom_pay
+
+        return calculate_custom_pay(records, mode=mode, engine="python")
+    wage, flags = cols["wage"], cols["flags"]
+
+    # 근무시간 (1/100시간 단위 정수, calculator.centihours와 같은 반올림)
+    centihours = ((cols["end"] - cols["start"]) * 10 + 3) // 6
+
+    # 기본급: 근무시간 × 시급
+    base = centihours * wage // 100
+
+    # 야간수당: 22:00~06:00(다음날)과 겹치는 분 / 60 × 시급 × 0.5
+    overlap = np.minimum(cols["end"], NIGHT_END_MINUTES) - np.maximum(cols["start"], NIGHT_START_MINUTES)
+    night = np.where(flags & FLAG_NIGHT, np.clip(overlap, 0, None) * wage // 120, 0)
+
+    # 연장수당: 8시간 초과분 × 시급 × 0.5
+    overtime_centihours = np.maximum(0, centihours - 800)
+    overtime = np.where(flags & FLAG_OVERTIME, overtime_centihours * wage // 200, 0)
+
+    # 공휴일수당: 근무시간 × 시급 × 0.5
+    holiday = np.where(flags & FLAG_HOLIDAY, centihours * wage // 200, 0)
+
+    gross = base + night + overtime + holiday
+
+    if mode == "standard":
+        week_ids, n_weeks = cols["week_ids"], cols["n_weeks"]
+
+        # 주차별 총 근무시간 (정수 합계)
+        weekly_centihours = np.zeros(n_weeks, dtype=np.int64)
+        np.add.at(weekly_centihours, week_ids, centihours)
+        full_week = weekly_centihours >= FULL_TIME_CENTIHOURS
+
+        # 주휴수당: 그 주에 wHoliday row가 있고 15시간 이상이면 마지막 wHoliday row의 시급 × 8
+        wholiday = (flags & FLAG_WHOLIDAY) != 0
+        apply = np.bincount(week_ids, weights=wholiday, minlength=n_weeks) > 0
+        wage_rows = np.flatnonzero(wholiday & ((flags & FLAG_WAGE_SET) != 0))
+        last_row = np.full(n_weeks, -1, dtype=np.int64)
+        np.maximum.at(last_row, week_ids[wage_rows], wage_rows)
+        allowance_wage = np.where(last_row >= 0, wage[last_row], DEFAULT_MINIMUM_WAGE)
+        allowance = np.where(apply & full_week, allowance_wage * 8, 0)
+
+        # 세금: 주 15시간 이상 9%, 미만 3.3% (row별 총급여 기준)
+        full_row = full_week[week_ids]
+        tax = np.where(
+            full_row,
+            gross * FULL_TIME_TAX[0] // FULL_TIME_TAX[1],
+            gross * PART_TIME_TAX[0] // PART_TIME_TAX[1],
+        )
+
+        total_weekly_allowance = int(allowance.sum())
+        total_tax = int(tax.sum())
+    else:
+        total_weekly_allowance = 0
+        total_tax = 0
+
+    total_base = int(base.sum())
+    total_night = int(night.sum())
+    total_overtime = int(overtime.sum())
+    total_holiday = int(holiday.sum())
+    total_gross = int(gross.sum())
+
+    return {
+        "base": total_base,
+        "night": total_night,
+        "overtime": total_overtime,
+        "holiday": total_holiday,
+        "weekly_allowance": total_weekly_allowance,
+        "tax": total_tax,
+        "gross_with_allowance": total_gross + total_weekly_allowance,
+        "net_with_allowance": total_gross - total_tax + total_weekly_allowance,
+    }
@@ -0,0 +1,372 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+from utils.calculator import (
+    AUTO_HOLIDAY_FLAG,
+    MODES,
+    PAY_TOTAL_KEYS,
+    add_pay_totals,
+    calculate_week_pay,
+    compile_entries,
+    finalize_pay_totals,
+    group_entries_by_week,
+    week_key_for_date,
+)
+from utils.result_cache import add_change_listener
+
+# 주 단위 급여 합계 저장소 (변경된 주만 다시 계산)
+
+"""코드 요약:
+shift 하나를 고쳐도 calculate_custom_pay는 범위 안의 모든 주를 처음부터 다시 계산함
+그런데 주휴수당·세율은 그 주의 entry에만 의존하므로 주마다 결과가 독립적
+→ (사용자, 주차 키(group_entries_by_week와 같은 "%Y-%W"), mode)별 합계
+  (base, night, overtime, holiday, weekly_allowance, tax, net, hours)를 저장해 두고
+→ i_entry가 바뀌면 그 주만 dirty로 표시 (result_cache.handle_entry_change → change listener)
+→ 범위 계산은 깨끗한 주는 저장된 합계를 더하고, 없거나 dirty인 주만 Supabase에서 가져와 다시 계산
+
+범위 양 끝에 걸친 일부 주(월요일~일요일 중 일부만 범위 안)는 calculate_custom_pay와 같은 결과가 되도록
+범위 안 entry만으로 그때그때 계산하고 저장하지 않음
+
+user_id=None(전체 사용자)으로 계산한 합계는 ALL_USERS 키로 저장, 누구 entry가 바뀌어도 같이 dirty
+WeekStore(저장 안 함) / InMemoryWeekStore / SQLiteWeekStore(로컬 파일, 오프라인 테스트용)
+PAY_WEEK_STORE=none|memory|sqlite (기본 none)
+sqlite 파일 경로는 PAY_WEEK_STORE_PATH (기본 $XDG_CACHE_HOME 또는 ~/.cache 아래 pay-api/week_totals.sqlite3)
+
+변경 알림을 놓치거나 계산 규칙이 바뀌어도 예전 합계가 계속 쓰이지 않도록
+- 합계마다 규칙 버전(RULES_VERSION + PAY_WEEK_STORE_SALT + 공휴일 자동 판정 여부)을 같이 저장 → 다르면 없는 것으로 봄
+  계산 규칙을 바꾸는 커밋은 RULES_VERSION을 올리고, 배포마다 바꾸려면 PAY_WEEK_STORE_SALT(기본 PAY_ETAG_SALT)
+- PAY_WEEK_STORE_TTL초(기본 3600)가 지난 합계도 없는 것으로 보고 다시 계산"""
+
+ALL_USERS = ""  # user_id=None(전체 사용자) 계산 결과를 저장할 때 쓰는 키
+WEEK_TOTAL_KEYS = PAY_TOTAL_KEYS + ("hours",)
+
+RULES_VERSION = 2  # 2: 정수 반올림(centihours) 계산으로 바뀜 → 이전 float 합계는 쓰지 않음
+WEEK_STORE_SALT = os.getenv("PAY_WEEK_STORE_SALT", os.getenv("PAY_ETAG_SALT", ""))
+WEEK_STORE_TTL = float(os.getenv("PAY_WEEK_STORE_TTL", "3600"))
+
+
+def rules_version() -> str:
+    """저장된 합계를 계산한 규칙 (다르면 저장된 합계를 쓰지 않음)"""
+    return f"{RULES_VERSION}|{WEEK_STORE_SALT}|{int(AUTO_HOLIDAY_FLAG)}"
+
+
+def default_store_path() -> str:
+    cache_dir = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_dir, "pay-api", "week_totals.sqlite3")
+
+
+#주차 키 ↔ 날짜 범위
+
+def week_date_range(week_key: str) -> tuple:
+    """
+    "%Y-%W" 주차 키 → (첫 날짜, 마지막 날짜) date
+    월요일 시작, 연도가 바뀌는 주는 연도별로 나뉨 (00주는 1월 1일 ~ 첫 월요일 전날)
+    """
+    year, week = (int(part) for part in week_key.split("-"))
+    jan1 = date(year, 1, 1)
+    first_monday = jan1 + timedelta(days=(7 - jan1.weekday()) % 7)
+    if week == 0:
+        return jan1, first_monday - timedelta(days=1)
+    monday = first_monday + timedelta(weeks=week - 1)
+    return monday, min(monday + timedelta(days=6), date(year, 12, 31))
+
+
+def week_spans(start_date: str, end_date: str) -> list:
+    """
+    범위를 주차별로 나눔 → [(week_key, 범위 안 첫 날짜, 마지막 날짜, 주 전체가 범위 안인지), ...]
+    날짜는 "YYYY-MM-DD" 문자열
+    """
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    spans = []
+    day = start
+    while day <= end:
+        week_key = day.strftime("%Y-%W")
+        first, last = week_date_range(week_key)
+        spans.append((week_key, day.isoformat(), min(last, end).isoformat(), day == first and last <= end))
+        day = last + timedelta(days=1)
+    return spans
+
+
+#저장소
+
+class WeekStore:
+    """주 단위 합계 저장소 인터페이스 (아무것도 저장하지 않는 기본 구현 = 사용 안 함)"""
+
+    enabled = False  # False면 /calculate는 저장소를 거치지 않고 기존 스트리밍 계산
+
+    def get(self, user_id: str, week_key: str, mode: str):
+        """저장된 합계 dict (없거나 dirty면 None)"""
+        return None
+
+    def generation(self) -> int:
+        """계산 시작 전에 받아 두었다가 put()에 넘기면, 그 사이 dirty 표시가 있었을 때 저장을 건너뜀"""
+        return 0
+
+    def put(self, user_id: str, week_key: str, mode: str, totals: dict, generation: int = None):
+        pass
+
+    def mark_dirty(self, user_id: str = None, date: str = None) -> int:
+        """user_id의 date가 속한 주를 dirty로 (둘 다 None이면 전부), 표시한 개수 반환"""
+        return 0
+
+    def dirty_weeks(self) -> list:
+        """dirty인 (user_id, week_key, mode) 목록"""
+        return []
+
+
+class InMemoryWeekStore(WeekStore):
+    enabled = True
+
+    def __init__(self, ttl: float = WEEK_STORE_TTL, rules: str = None):
+        self.ttl = ttl
+        self.rules = rules or rules_version()
+        self._data = {}  # (user_id, week_key, mode) → (저장 시각, 규칙 버전, 합계 dict)
+        self._dirty = set()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id, week_key, mode):
+        key = (user_id, week_key, mode)
+        with self._lock:
+            if key in self._dirty:
+                return None
+            item = self._data.get(key)
+            if item is None or item[1] != self.rules or time.time() - item[0] >= self.ttl:
+                return None
+            return dict(item[2])
+
+    def generation(self):
+        return self._generation
+
+    def put(self, user_id, week_key, mode, totals, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            key = (user_id, week_key, mode)
+            self._data[key] = (time.time(), self.rules, {name: totals[name] for name in WEEK_TOTAL_KEYS})
+            self._dirty.discard(key)
+
+    def mark_dirty(self, user_id=None, date=None):
+        week_key = week_key_for_date(date) if date else None
+        with self._lock:
+            self._generation += 1
+            marked = [
+                key for key in self._data
+                if (user_id is None or key[0] in (user_id, ALL_USERS))
+                and (week_key is None or key[1] == week_key)
+            ]
+            self._dirty.update(marked)
+            return len(marked)
+
+    def dirty_weeks(self):
+        with self._lock:
+            return sorted(self._dirty)
+
+
+class SQLiteWeekStore(WeekStore):
+    """로컬 SQLite 파일에 저장 (path=":memory:"면 메모리 DB)"""
+
+    enabled = True
+
+    def __init__(self, path: str = ":memory:", ttl: float = WEEK_STORE_TTL, rules: str = None):
+        self.path = path
+        self.ttl = ttl
+        self.rules = rules or rules_version()
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        columns = ", ".join(f"{name} INTEGER NOT NULL" for name in PAY_TOTAL_KEYS)
+        with self._lock, self._conn:
+            existing = {row[1] for row in self._conn.execute("PRAGMA table_info(week_totals)")}
+            if existing and "rules" not in existing:
+                # 규칙 버전이 없던 예전 파일 (float 계산 합계) → 버리고 새로 만듦
+                self._conn.execute("DROP TABLE week_totals")
+            self._conn.execute(
+                f"""CREATE TABLE IF NOT EXISTS week_totals (
+                    user_id TEXT NOT NULL,
+                    week_key TEXT NOT NULL,
+                    mode TEXT NOT NULL,
+                    {columns},
+                    hours REAL NOT NULL,
+                    rules TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    dirty INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user_id, week_key, mode)
+                )"""
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS week_store_meta (generation INTEGER NOT NULL)")
+            if self._conn.execute("SELECT COUNT(*) FROM week_store_meta").fetchone()[0] == 0:
+                self._conn.execute("INSERT INTO week_store_meta VALUES (0)")
+
+    def get(self, user_id, week_key, mode):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(WEEK_TOTAL_KEYS)} FROM week_totals "
+                "WHERE user_id = ? AND week_key = ? AND mode = ? AND dirty = 0 AND rules = ? AND stored_at > ?",
+                (user_id, week_key, mode, self.rules, time.time() - self.ttl),
+            ).fetchone()
+        return dict(zip(WEEK_TOTAL_KEYS, row)) if row is not None else None
+
+    def generation(self):
+        with self._lock:
+            return self._conn.execute("SELECT generation FROM week_store_meta").fetchone()[0]
+
+    def put(self, user_id, week_key, mode, totals, generation=None):
+        with self._lock, self._conn:
+            current = self._conn.execute("SELECT generation FROM week_store_meta").fetchone()[0]
+            if generation is not None and generation != current:
+                return
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO week_totals "
+                f"(user_id, week_key, mode, {', '.join(WEEK_TOTAL_KEYS)}, rules, stored_at, dirty) "
+                f"VALUES (?, ?, ?, {', '.join('?' for _ in WEEK_TOTAL_KEYS)}, ?, ?, 0)",
+                (user_id, week_key, mode, *(totals[name] for name in WEEK_TOTAL_KEYS), self.rules, time.time()),
+            )
+
+    def mark_dirty(self, user_id=None, date=None):
+        conditions, params = ["dirty = 0"], []
+        if user_id is not None:
+            conditions.append("user_id IN (?, ?)")
+            params += [user_id, ALL_USERS]
+        if date:
+            conditions.append("week_key = ?")
+            params.append(week_key_for_date(date))
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE week_store_meta SET generation = generation + 1")
+            cursor = self._conn.execute(f"UPDATE week_totals SET dirty = 1 WHERE {' AND '.join(conditions)}", params)
+            return cursor.rowcount
+
+    def dirty_weeks(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_id, week_key, mode FROM week_totals WHERE dirty = 1 ORDER BY user_id, week_key, mode"
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _create_store_from_env() -> WeekStore:
+    backend = os.getenv("PAY_WEEK_STORE", "none")
+    if backend == "none":
+        return WeekStore()
+    if backend == "memory":
+        return InMemoryWeekStore()
+    if backend == "sqlite":
+        return SQLiteWeekStore(os.getenv("PAY_WEEK_STORE_PATH") or default_store_path())
+    raise ValueError(f"Unknown PAY_WEEK_STORE: {backend}")
+
+
+_store = None
+
+
+def get_week_store() -> WeekStore:
+    global _store
+    if _store is None:
+        _store = _create_store_from_env()
+    return _store
+
+
+def set_week_store(store: WeekStore):
+    """저장소 교체 (테스트용 SQLite 등)"""
+    global _store
+    _store = store
+
+
+def _on_entry_change(user_id, date):
+    if _store is not None:
+        _store.mark_dirty(user_id, date)
+
+
+add_change_listener(_on_entry_change)
+
+
+#범위 계산 (저장된 주 + 다시 계산할 주)
+
+class RangePlan:
+    """
+    plan_range 결과
+    cached: {week_key: 저장된 합계}, pending: 다시 계산할 week span 목록,
+    fetch_ranges: pending을 이어지는 날짜끼리 합친 (첫 날짜, 마지막 날짜) 조회 범위
+    """
+
+    __slots__ = ("user_id", "mode", "spans", "cached", "pending", "fetch_ranges", "generation")
+
+    def __init__(self, user_id, mode, spans, cached, pending, fetch_ranges, generation):
+        self.user_id = user_id
+        self.mode = mode
+        self.spans = spans
+        self.cached = cached
+        self.pending = pending
+        self.fetch_ranges = fetch_ranges
+        self.generation = generation
+
+
+def plan_range(user_id, start_date: str, end_date: str, mode: str = "standard", store: WeekStore = None) -> RangePlan:
+    if mode not in MODES:
+        raise ValueError("Invalid mode")
+    store = store or get_week_store()
+    store_user = ALL_USERS if user_id is None else user_id
+    generation = store.generation()  # 계산 도중 dirty 표시가 생기면 저장하지 않도록
+
+    spans = week_spans(start_date, end_date)
+    cached, pending = {}, []
+    for span in spans:
+        week_key, _, _, full = span
+        totals = store.get(store_user, week_key, mode) if full else None
+        if totals is not None:
+            cached[week_key] = totals
+        else:
+            pending.append(span)
+
+    fetch_ranges = []
+    for _, first, last, _ in pending:
+        if fetch_ranges and date.fromisoformat(fetch_ranges[-1][1]) + timedelta(days=1) == date.fromisoformat(first):
+            fetch_ranges[-1] = (fetch_ranges[-1][0], last)
+        else:
+            fetch_ranges.append((first, last))
+
+    return RangePlan(user_id, mode, spans, cached, pending, fetch_ranges, generation)
+
+
+def complete_range(plan: RangePlan, rows, store: WeekStore = None) -> dict:
+    """
+    plan.fetch_ranges로 가져온 rows로 pending 주를 계산해서 저장(범위가 주 전체인 것만)하고
+    저장된 주와 합쳐 calculate_custom_pay와 같은 형식의 결과 반환
+    """
+    store = store or get_week_store()
+    store_user = ALL_USERS if plan.user_id is None else plan.user_id
+    grouped = group_entries_by_week(compile_entries(rows))
+
+    acc = {}
+    for week_key, _, _, full in plan.spans:
+        totals = plan.cached.get(week_key)
+        if totals is None:
+            weekly_rows = grouped.get(week_key, [])
+            totals = calculate_week_pay(weekly_rows, plan.mode, week_key)
+            if full:
+                store.put(store_user, week_key, plan.mode, totals, plan.generation)
+        add_pay_totals(acc, totals)
+    return finalize_pay_totals(acc)
+
+
+def calculate_custom_pay_materialized(user_id, start_date: str, end_date: str, mode: str = "standard",
+                                      store: WeekStore = None) -> dict:
+    """
+    calculate_custom_pay(범위 안 entry, mode)와 같은 결과
+    저장소에 깨끗한 주는 다시 조회/계산하지 않음 (user_id=None이면 전체 사용자)
+    """
+    from utils.calculator import iter_entries_for_date_range
+
+    store = store or get_week_store()
+    plan = plan_range(user_id, start_date, end_date, mode, store)
+    rows = []
+    for first, last in plan.fetch_ranges:
+        rows.extend(iter_entries_for_date_range(first, last, user_id=user_id))
+    return complete_range(plan, rows, store)